@@ -0,0 +1,77 @@
+# -*- encoding: utf8 -*-
+
+"""
+Benchmark ``trie.break_words``, which slices each word once at its breaks,
+against building the pieces one character at a time with a check of each
+offset in the list of breaks, as it used to.
+
+Usage: python benchmarks/bench_break_words.py [n_words] [repeat]
+
+The wordlist (one million words by default) is made of the words of the CMU
+pronouncing dictionary in ``linguistica.datasets`` with suffixes added.
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+from linguistica import trie
+from linguistica.datasets import cmudict
+
+SUFFIXES = ['', 's', 'ed', 'ing', 'er', 'ers', 'ly', 'ness', 'ful', 'less',
+            'able', 'ment', 'ments', 'ist', 'ists', 'ism', 'ize', 'ized']
+
+
+def break_words_by_character(wordlist, break_dict):
+    broken_words = dict()
+
+    for i, this_word in enumerate(wordlist):
+        broken_words[this_word] = list()
+        break_list = sorted(break_dict[i])
+
+        if not break_list:
+            broken_words[this_word].append(this_word)
+        else:
+            this_piece = ''
+            for x in range(len(this_word)):
+                this_piece += this_word[x]
+                if x + 1 in break_list:
+                    broken_words[this_word].append(this_piece)
+                    this_piece = ''
+            if this_piece:
+                broken_words[this_word].append(this_piece)
+
+    return broken_words
+
+
+def main():
+    n_words = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with open(cmudict, encoding='utf8', errors='ignore') as f:
+        words = sorted({line.split()[0].lower() for line in f
+                        if line[:1].isalpha()})
+    wordlist = sorted({word + suffix for suffix in SUFFIXES
+                       for word in words})[:n_words]
+
+    break_dict = trie.find_breaks(wordlist, 4)
+    assert break_words_by_character(wordlist, break_dict) == \
+        trie.break_words(wordlist, break_dict)
+
+    n_breaks = sum(len(breaks) for breaks in break_dict.values())
+    print('{} words, {} breaks'.format(len(wordlist), n_breaks))
+
+    results = list()
+    for function in (break_words_by_character, trie.break_words):
+        seconds = min(timeit.repeat(lambda: function(wordlist, break_dict),
+                                    number=1, repeat=repeat))
+        results.append(seconds)
+        print('{:<28} {:8.3f} s'.format(function.__name__, seconds))
+
+    print('speedup: {:.2f}x'.format(results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# -*- encoding: utf8 -*-
+
+"""
+Benchmark ``phon.make_word_ngrams``, which counts phone ngrams with
+``numpy.bincount`` over one array of phone ids, against counting them with
+a ``Counter`` for each phone ngram of each word, as it used to.
+
+Usage: python benchmarks/bench_phon.py [wordlist_file] [repeat]
+
+The wordlist file (one word per line, followed by its count and phones)
+defaults to the CMU pronouncing dictionary in ``linguistica.datasets``.
+Phone ngrams are counted both for the phones and for the letters of words.
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+from collections import Counter
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+from linguistica.datasets import cmudict
+from linguistica.phon import make_word_ngrams
+
+
+def make_word_ngrams_with_counters(word_unigram_counter,
+                                   words_to_phones=None):
+    uniphone_counter = Counter()
+    biphone_counter = Counter()
+    triphone_counter = Counter()
+
+    for word, freq in word_unigram_counter.items():
+        if not words_to_phones:
+            word = '#' + word + '#'  # add word boundaries
+            uniphones = list(word)
+        else:
+            uniphones = ['#'] + words_to_phones[word] + ['#']
+
+        biphones = zip(*[uniphones[i:] for i in range(2)])
+        triphones = zip(*[uniphones[i:] for i in range(3)])
+
+        for uniphone in uniphones:
+            uniphone_counter[uniphone] += freq
+
+        for biphone in biphones:
+            biphone_counter[biphone] += freq
+
+        for triphone in triphones:
+            triphone_counter[triphone] += freq
+
+    return (dict(uniphone_counter), dict(biphone_counter),
+            dict(triphone_counter))
+
+
+def main():
+    wordlist_path = sys.argv[1] if len(sys.argv) > 1 else cmudict
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    word_unigram_counter = dict()
+    words_to_phones = dict()
+    with open(wordlist_path, encoding='utf8', errors='ignore') as f:
+        for line in f:
+            line_split = line.split()
+            if len(line_split) < 3:
+                continue
+            word = line_split[0].lower()
+            word_unigram_counter[word] = int(line_split[1])
+            words_to_phones[word] = line_split[2:]
+    print('{}: {} words'.format(wordlist_path, len(word_unigram_counter)))
+
+    for name, phones in (('phones', words_to_phones), ('letters', None)):
+        assert make_word_ngrams_with_counters(word_unigram_counter, phones) \
+            == make_word_ngrams(word_unigram_counter, phones)
+
+        results = list()
+        for function in (make_word_ngrams_with_counters, make_word_ngrams):
+            seconds = min(timeit.repeat(
+                lambda: function(word_unigram_counter, phones),
+                number=1, repeat=repeat))
+            results.append(seconds)
+            print('{:<8} {:<32} {:8.3f} s'.format(name, function.__name__,
+                                                  seconds))
+
+        print('{:<8} speedup: {:.2f}x'.format(name, results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
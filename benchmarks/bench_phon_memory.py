@@ -0,0 +1,154 @@
+# -*- encoding: utf8 -*-
+
+"""
+Benchmark the memory of the phonology objects: the slotted ``phon.Phone``
+and ``phon.Biphone`` records and the ``phon.Word`` views into the arrays of
+a ``phon.WordPhonology``, against plain objects with a ``__dict__`` each and
+a list of phones for each word, as they used to be.
+
+Usage: python benchmarks/bench_phon_memory.py [wordlist_file]
+
+The wordlist file (one word per line, followed by its count and phones)
+defaults to the CMU pronouncing dictionary in ``linguistica.datasets``.
+Memory is measured with ``tracemalloc`` (Python 3) as the bytes allocated
+and still held after each dict is made; on Python 2, nothing is measured.
+"""
+
+from __future__ import division, print_function
+
+import gc
+import sys
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+from linguistica import phon
+from linguistica.datasets import cmudict
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+class Phone:
+    def __init__(self, spelling, count, freq):
+        self.spelling = spelling
+        self.count = count
+        self.frequency = freq
+        self.plog = phon.plog(self.frequency)
+
+
+# noinspection PyPep8Naming
+class Biphone:
+    def __init__(self, phone1, phone2, count, freq):
+        self.phone1 = phone1
+        self.phone2 = phone2
+
+        self.spelling = (self.phone1.spelling, self.phone2.spelling)
+        self.count = count
+        self.frequency = freq
+        self.MI = self.phone1.plog + self.phone2.plog - \
+            phon.plog(self.frequency)
+        self.weighted_MI = self.MI * self.count
+
+
+class Word:
+    def __init__(self, spelling, phones, count, freq, phone_dict,
+                 biphone_dict):
+        self.spelling = spelling
+        self.phones = phones
+        self.count = count
+        self.frequency = freq
+
+        self.unigram_plog = sum(phone_dict[phone].plog
+                                for phone in self.phones[1:])
+        self.avg_unigram_plog = self.unigram_plog / (len(self.phones) - 1)
+
+        _bigram_plog = self.unigram_plog
+        for biphone in zip(*[self.phones[i:] for i in range(2)]):
+            if biphone in biphone_dict:
+                _bigram_plog -= biphone_dict[biphone].MI
+        self.bigram_plog = _bigram_plog
+
+        self.avg_bigram_plog = self.bigram_plog / (len(self.phones) - 1)
+
+
+def make_phone_dict_of_objects(phone_unigram_counter):
+    total_count = sum(phone_unigram_counter.values())
+    return {phone: Phone(phone, count, count / total_count)
+            for phone, count in phone_unigram_counter.items()}
+
+
+def make_biphone_dict_of_objects(phone_bigram_counter, phone_dict):
+    total_count = sum(phone_bigram_counter.values())
+    return {biphone: Biphone(phone_dict[biphone[0]], phone_dict[biphone[1]],
+                             count, count / total_count)
+            for biphone, count in phone_bigram_counter.items()}
+
+
+def make_word_dict_of_objects(word_unigram_counter, phone_dict, biphone_dict,
+                              words_to_phones):
+    total_count = sum(word_unigram_counter.values())
+    return {word: Word(word, ['#'] + words_to_phones[word] + ['#'], count,
+                       count / total_count, phone_dict, biphone_dict)
+            for word, count in word_unigram_counter.items()}
+
+
+def held_bytes(function, *args):
+    """
+    Return the result of *function* and the bytes it allocated and still
+    holds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    if tracemalloc is None:
+        print('tracemalloc (Python 3) is needed to measure memory')
+        return
+
+    wordlist_path = sys.argv[1] if len(sys.argv) > 1 else cmudict
+
+    word_unigram_counter = dict()
+    words_to_phones = dict()
+    with open(wordlist_path, encoding='utf8', errors='ignore') as f:
+        for line in f:
+            line_split = line.split()
+            if len(line_split) < 3:
+                continue
+            word = line_split[0].lower()
+            word_unigram_counter[word] = int(line_split[1])
+            words_to_phones[word] = line_split[2:]
+    n_words = len(word_unigram_counter)
+    print('{}: {} word types'.format(wordlist_path, n_words))
+
+    phone_unigram_counter, phone_bigram_counter, _ = phon.make_word_ngrams(
+        word_unigram_counter, words_to_phones)
+
+    for name, make_phone_dict, make_biphone_dict, make_word_dict in (
+            ('objects', make_phone_dict_of_objects,
+             make_biphone_dict_of_objects, make_word_dict_of_objects),
+            ('records', phon.make_phone_dict, phon.make_biphone_dict,
+             phon.make_word_dict)):
+        phone_dict, phone_bytes = held_bytes(make_phone_dict,
+                                             phone_unigram_counter)
+        biphone_dict, biphone_bytes = held_bytes(
+            make_biphone_dict, phone_bigram_counter, phone_dict)
+        word_dict, word_bytes = held_bytes(
+            make_word_dict, word_unigram_counter, phone_dict, biphone_dict,
+            words_to_phones)
+
+        print('{:<8} phones {:>10,} B   biphones {:>10,} B   words {:>12,} B'
+              '   {:8.1f} B per word type'.format(
+                  name, phone_bytes, biphone_bytes, word_bytes,
+                  word_bytes / n_words))
+        del phone_dict, biphone_dict, word_dict
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# -*- encoding: utf8 -*-
+
+"""
+Benchmark the memory of the morphological signature objects as dicts and
+sets of strings and tuples (as ``signature.IncrementalSignatures`` makes
+them) against ``signature_store.SignatureStore``, which keeps them as
+arrays of integer ids.
+
+Usage: python benchmarks/bench_signature_store.py [wordlist_file]
+
+The wordlist file (one word per line, optionally followed by its count)
+defaults to the CMU pronouncing dictionary in ``linguistica.datasets``.
+Memory is measured with ``tracemalloc`` (Python 3); on Python 2, only the
+time to load the store is reported.
+"""
+
+from __future__ import division, print_function
+
+import gc
+import sys
+import time
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+from linguistica import signature
+from linguistica.datasets import cmudict
+from linguistica.signature_store import SignatureStore
+from linguistica.util import PARAMETERS
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+OBJECT_NAMES = ('stems_to_words', 'signatures_to_stems', 'stems_to_signatures',
+                'words_to_signatures', 'signatures_to_words',
+                'words_to_sigtransforms', 'signatures',
+                'affixes_to_signatures', 'words_in_signatures', 'affixes',
+                'stems')
+
+
+def traced_bytes():
+    gc.collect()
+    if tracemalloc is None:
+        return 0
+    return tracemalloc.get_traced_memory()[0]
+
+
+def make_signature_objects(wordlist):
+    """
+    Return the dict of the names of the signature objects of *wordlist* to
+    the objects, as dicts and sets.
+    """
+    signatures = signature.IncrementalSignatures(
+        PARAMETERS['min_stem_length'], PARAMETERS['max_affix_length'],
+        PARAMETERS['suffixing'], PARAMETERS['min_sig_count'])
+    signatures.update(wordlist)
+    return {name: getattr(signatures, name) for name in OBJECT_NAMES}
+
+
+def main():
+    wordlist_path = sys.argv[1] if len(sys.argv) > 1 else cmudict
+
+    with open(wordlist_path, encoding='utf8', errors='ignore') as f:
+        wordlist = sorted({line.split()[0].lower() for line in f
+                           if line[:1].isalpha()})
+    print('{}: {} word types'.format(wordlist_path, len(wordlist)))
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    start = traced_bytes()
+    objects = make_signature_objects(wordlist)
+    dict_bytes = traced_bytes() - start
+
+    start = traced_bytes()
+    seconds = time.time()
+    store = SignatureStore()
+    store.load(objects['stems_to_words'], objects['signatures_to_stems'],
+               objects['words_to_sigtransforms'])
+    seconds = time.time() - seconds
+    store_bytes = traced_bytes() - start
+
+    assert all(getattr(store, name) == objects[name] for name in OBJECT_NAMES)
+
+    print('{} stems, {} signatures'.format(len(store.stems),
+                                           len(store.signatures)))
+    if tracemalloc is None:
+        print('SignatureStore loaded in {:.2f} s'.format(seconds))
+        return
+
+    print('{:<24} {:8.1f} MB'.format('dicts and sets', dict_bytes / 1e6))
+    print('{:<24} {:8.1f} MB (loaded in {:.2f} s)'.format(
+        'SignatureStore', store_bytes / 1e6, seconds))
+    print('memory ratio: {:.1f}x'.format(dict_bytes / store_bytes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# -*- encoding: utf8 -*-
+
+"""
+Benchmark the one-pass ``util.Tokenizer`` against ``util.fix_punctuations``
+followed by ``strip()``, ``lower()`` and ``split()``, as ngram counting
+used to tokenize each line.
+
+Usage: python benchmarks/bench_tokenizer.py [corpus_file] [repeat]
+
+The corpus file defaults to the Brown corpus in ``linguistica.datasets``.
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+from linguistica.datasets import brown
+from linguistica.util import (Tokenizer, fix_punctuations)
+
+
+def tokenize_with_fix_punctuations(lines):
+    return [fix_punctuations(line).strip().lower().split() for line in lines]
+
+
+def tokenize_with_tokenizer(lines):
+    tokenize = Tokenizer()
+    return [tokenize(line) for line in lines]
+
+
+def main():
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else brown
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with open(corpus_path, encoding='utf8') as f:
+        lines = f.readlines()
+
+    assert tokenize_with_fix_punctuations(lines) == \
+        tokenize_with_tokenizer(lines)
+
+    n_bytes = sum(len(line) for line in lines)
+    print('{}: {} lines, {:.1f} MB'.format(
+        corpus_path, len(lines), n_bytes / 1e6))
+
+    results = list()
+    for function in (tokenize_with_fix_punctuations, tokenize_with_tokenizer):
+        seconds = min(timeit.repeat(lambda: function(lines), number=1,
+                                    repeat=repeat))
+        results.append(seconds)
+        print('{:<32} {:8.3f} s {:8.1f} MB/s'.format(
+            function.__name__, seconds, n_bytes / 1e6 / seconds))
+
+    print('speedup: {:.2f}x'.format(results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
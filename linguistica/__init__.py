@@ -1,26 +1,61 @@
 # -*- encoding: utf8 -*-
 
+from linguistica.cache import SIZE_LIMIT as CACHE_SIZE_LIMIT
 from linguistica.release import __version__
-from linguistica.util import ENCODING
+from linguistica.util import (ENCODING, PUNCTUATIONS)
 from linguistica.lexicon import Lexicon
 
 
 assert type(__version__) is str
 
 
-def read_corpus(file_path, encoding=ENCODING, **kwargs):
+def read_corpus(file_path, encoding=ENCODING, n_jobs=1,
+                punctuations=PUNCTUATIONS, ngram_memory_budget=0,
+                ngram_memory_limit=0, cache_dir=None,
+                cache_size_limit=CACHE_SIZE_LIMIT, **kwargs):
     """
-    Create a Linguistica object with a corpus data file.
+    Create a Linguistica object with a corpus data file, or several of them.
 
-    :param file_path: path of input corpus file
-    :param encoding: encoding of the file at *file_path*. Default: ``'utf8'``
+    :param file_path: path of input corpus file, or of a directory of them,
+        or a glob pattern such as ``'path/to/*.txt.gz'``. The files of a
+        directory or a glob pattern are read in sorted order. Compressed
+        files (``.gz``, ``.bz2``, and ``.xz``) are decompressed as streams.
+    :param encoding: encoding of the file(s) at *file_path*.
+        Default: ``'utf8'``
+    :param n_jobs: number of worker processes for counting word ngrams,
+        which count shards of the files in parallel, and for morphological
+        signatures, which are induced for groups of words in parallel;
+        a value below 1 means as many as there are CPUs. Default: ``1``
+    :param punctuations: characters which are word tokens of their own.
+        Default: ``'.,;!?:)('``
+    :param ngram_memory_budget: if positive, word bigrams and trigrams are
+        counted approximately in about this many bytes, and only those with
+        estimated counts of at least ``min_context_count`` are kept
+        (see ``ngram.count()``). Default: ``0`` (exact counts)
+    :param ngram_memory_limit: if positive, word bigram and trigram tables
+        over this many bytes are spilled to temporary files and merged at the
+        end, with exact counts (see ``ngram.count()``). With *n_jobs* above
+        1, the limit applies to each worker process, not to the merge of
+        their results (see ``ngram.count_parallel()``). Default: ``0``
+        (no limit)
+    :param cache_dir: if given, the directory of a persistent cache of
+        results (see ``cache.ResultCache``), which are reused for a file
+        with the same content and parameters. Default: ``None`` (no cache)
+    :param cache_size_limit: bytes of the cache at *cache_dir*, beyond
+        which the least recently used results are removed.
+        Default: ``1 << 30`` (1 GB)
     :param kwargs: keyword arguments for parameters and their values.
     """
     return Lexicon(file_path=file_path, wordlist_file=False, encoding=encoding,
-                   **kwargs)
+                   n_jobs=n_jobs, punctuations=punctuations,
+                   ngram_memory_budget=ngram_memory_budget,
+                   ngram_memory_limit=ngram_memory_limit, cache_dir=cache_dir,
+                   cache_size_limit=cache_size_limit, **kwargs)
 
 
-def read_wordlist(file_path, encoding=ENCODING, **kwargs):
+def read_wordlist(file_path, encoding=ENCODING, n_jobs=1, cache_dir=None,
+                  cache_size_limit=CACHE_SIZE_LIMIT, compile_wordlist=True,
+                  compile_next_to_file=False, **kwargs):
     """
     Create a Linguistica object with a wordlist file.
 
@@ -28,31 +63,64 @@ def read_wordlist(file_path, encoding=ENCODING, **kwargs):
         one word type (and, optionally, a whitespace plus the token count
         for that word).
     :param encoding: encoding of the file at *file_path*. Default: ``'utf8'``
+    :param n_jobs: number of worker processes for morphological signatures,
+        as in ``read_corpus()``. Default: ``1``
+    :param cache_dir: directory of a persistent cache of results,
+        as in ``read_corpus()``. Default: ``None`` (no cache)
+    :param cache_size_limit: bytes of the cache at *cache_dir*,
+        as in ``read_corpus()``. Default: ``1 << 30`` (1 GB)
+    :param compile_wordlist: whether to read the wordlist from a compiled
+        binary form with memory mapping (see ``wordlist_file``), which is
+        made when the file is first read and kept in the cache at
+        *cache_dir*. Without *cache_dir* (and *compile_next_to_file*),
+        nothing is written and the file is parsed. Default: ``True``
+    :param compile_next_to_file: whether to keep the compiled form next to
+        the file (with the suffix ``.lxw``) instead. Default: ``False``
     :param kwargs: keyword arguments for parameters and their values.
     """
     return Lexicon(file_path=file_path, wordlist_file=True, encoding=encoding,
-                   **kwargs)
+                   n_jobs=n_jobs, cache_dir=cache_dir,
+                   cache_size_limit=cache_size_limit,
+                   compile_wordlist=compile_wordlist,
+                   compile_next_to_file=compile_next_to_file, **kwargs)
 
 
-def from_corpus(corpus_object, **kwargs):
+def from_corpus(corpus_object, punctuations=PUNCTUATIONS,
+                ngram_memory_budget=0, ngram_memory_limit=0, n_jobs=1,
+                **kwargs):
     """
     Create a Linguistica object with a corpus object.
 
     :param corpus_object: either a long string of text
-        (with spaces separating word tokens) or a list of strings as word
-        tokens
+        (with spaces separating word tokens) or an iterable of strings
+        (e.g., a list of word tokens, or a generator of lines of text).
+        The strings of an iterable are not joined in memory; word ngrams
+        span the boundaries between them.
+    :param punctuations: characters which are word tokens of their own.
+        Default: ``'.,;!?:)('``
+    :param ngram_memory_budget: bytes for approximate counting of word
+        bigrams and trigrams, as in ``read_corpus()``. Default: ``0``
+    :param ngram_memory_limit: bytes of word bigram and trigram tables kept
+        in memory, as in ``read_corpus()``. Default: ``0``
+    :param n_jobs: number of worker processes for morphological signatures,
+        as in ``read_corpus()``. Default: ``1``
     :param kwargs: keyword arguments for parameters and their values.
     """
-    return Lexicon(corpus_object=corpus_object, wordlist_file=False, **kwargs)
+    return Lexicon(corpus_object=corpus_object, wordlist_file=False,
+                   n_jobs=n_jobs, punctuations=punctuations,
+                   ngram_memory_budget=ngram_memory_budget,
+                   ngram_memory_limit=ngram_memory_limit, **kwargs)
 
 
-def from_wordlist(wordlist_object, **kwargs):
+def from_wordlist(wordlist_object, n_jobs=1, **kwargs):
     """
     Create a Linguistica object with a wordlist object.
 
     :param wordlist_object: either a dict of word types (as strings) mapped to
         their token counts or an iterable of word types (as strings).
+    :param n_jobs: number of worker processes for morphological signatures,
+        as in ``read_corpus()``. Default: ``1``
     :param kwargs: keyword arguments for parameters and their values.
     """
     return Lexicon(wordlist_object=wordlist_object, wordlist_file=False,
-                   **kwargs)
+                   n_jobs=n_jobs, **kwargs)
@@ -4,7 +4,9 @@
 import sys
 
 import linguistica as lxa
+from linguistica.cache import main as cache_main
 from linguistica.cli import main as cli_main
+from linguistica.sweep import main as sweep_main
 
 try:
     from linguistica.gui import main as gui_main
@@ -20,7 +22,7 @@ def main():
     # --------------------------------------------------------------------------
     # ensure lxa_mode is one of the modes in MODES
 
-    MODES = {'cli', 'gui'}
+    MODES = {'cli', 'gui', 'cache', 'sweep'}
 
     try:
         lxa_mode = sys.argv[1].lower()
@@ -55,6 +57,18 @@ def main():
     if lxa_mode == 'cli':
         cli_main()
 
+    # --------------------------------------------------------------------------
+    # inspect and prune the cache of results
+
+    if lxa_mode == 'cache':
+        cache_main(sys.argv[2:])
+
+    # --------------------------------------------------------------------------
+    # sweep the signature parameters over a grid of values
+
+    if lxa_mode == 'sweep':
+        sweep_main(sys.argv[2:])
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,311 @@
+# -*- encoding: utf8 -*-
+
+from __future__ import print_function
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+import six
+
+from linguistica.release import __version__
+
+# where the command line interface looks for a cache by default
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'linguistica')
+
+SIZE_LIMIT = 1 << 30  # in bytes
+CHUNK_SIZE = 1 << 20  # in bytes, for hashing files
+
+RESULT_SUFFIX = '.pickle'
+WORDLIST_SUFFIX = '.lxw'  # compiled wordlists (see wordlist_file)
+METADATA_SUFFIX = '.json'
+
+# the suffixes of the files of cache entries, other than their metadata
+DATA_SUFFIXES = (RESULT_SUFFIX, WORDLIST_SUFFIX)
+
+_replace = getattr(os, 'replace', os.rename)  # no os.replace() in Python 2
+
+
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_atomically(file_path, dump, mode='wb'):
+    """
+    Write the file at *file_path* with the function *dump* of a file
+    object, through a temporary file in the same directory, so that no
+    other process ever sees a partially written file. The file gets the
+    permissions of a new file under the current umask.
+    """
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_path)), suffix='.tmp')
+    os.close(file_descriptor)
+    try:
+        with open(temp_path, mode) as f:
+            dump(f)
+        os.chmod(temp_path, 0o666 & ~_current_umask())
+        _replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def file_digest(file_path):
+    """
+    Return the SHA-256 hex digest of the content of the file at *file_path*.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def files_digest(file_paths):
+    """
+    Return the SHA-256 hex digest of the contents of the files at
+    *file_paths*, in order. For one file, it is the same as
+    ``file_digest()``.
+    """
+    if len(file_paths) == 1:
+        return file_digest(file_paths[0])
+
+    sha256 = hashlib.sha256()
+    for file_path in file_paths:
+        sha256.update(file_digest(file_path).encode('ascii'))
+    return sha256.hexdigest()
+
+
+def make_key(module, content_digest, parameters):
+    """
+    Return the cache key of the results of *module* for the input whose
+    content has the digest *content_digest*, with the dict *parameters*
+    of everything else the results depend on.
+    The version of Linguistica is part of the key.
+    """
+    key_object = [module, content_digest, __version__,
+                  sorted(parameters.items())]
+    key_str = json.dumps(key_object, sort_keys=True)
+    return hashlib.sha256(key_str.encode('utf8')).hexdigest()
+
+
+def parse_size(size_str):
+    """
+    Parse a number of bytes such as ``'1000'``, ``'500M'``, or ``'2G'``.
+    """
+    size_str = size_str.strip().upper().rstrip('B')
+    for i, unit in enumerate('KMGT', 1):
+        if size_str.endswith(unit):
+            return int(float(size_str[:-1]) * 1024 ** i)
+    return int(size_str)
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return '{:.0f} {}'.format(size, unit)
+        size /= 1024.
+    return '{:.1f} TB'.format(size)
+
+
+class ResultCache:
+    """
+    A persistent, content-addressed cache of Linguistica results in
+    *directory*.
+
+    Each entry is the pickled results of one module, keyed by
+    ``make_key()``, or a compiled wordlist (see ``wordlist_file``), with a
+    JSON file of metadata next to it. When the entries take more than
+    *size_limit* bytes, the least recently used ones are removed.
+    """
+
+    def __init__(self, directory=CACHE_DIR, size_limit=SIZE_LIMIT):
+        self.directory = os.path.abspath(directory)
+        self.size_limit = size_limit
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key):
+        """
+        Return the cached results of *key*, or None if there are none.
+        """
+        result_path = self._path(key, RESULT_SUFFIX)
+        try:
+            with open(result_path, 'rb') as f:
+                results = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        try:
+            os.utime(result_path, None)  # mark as recently used
+        except OSError:
+            pass
+        return results
+
+    def get_file(self, key, suffix):
+        """
+        Return the path of the cached file of *key* with *suffix* (e.g.,
+        ``WORDLIST_SUFFIX``), or None if there is none.
+        """
+        file_path = self._path(key, suffix)
+        try:
+            os.utime(file_path, None)  # mark as recently used
+        except OSError:
+            return None
+        return file_path
+
+    def put(self, key, results, metadata=None):
+        """
+        Cache *results* under *key*, with the JSON-serializable dict
+        *metadata* (for ``entries()``), and then remove the least recently
+        used entries if the cache is over its size limit.
+        """
+        self.put_file(key, RESULT_SUFFIX, lambda f: pickle.dump(
+            results, f, pickle.HIGHEST_PROTOCOL), metadata)
+
+    def put_file(self, key, suffix, dump, metadata=None):
+        """
+        Cache the file with *suffix* (one of ``DATA_SUFFIXES``) which the
+        function *dump* writes to a binary file object, under *key*, as
+        ``put()`` does.
+        """
+        write_atomically(self._path(key, suffix), dump)
+        write_atomically(self._path(key, METADATA_SUFFIX), lambda f: f.write(
+            six.text_type(json.dumps(metadata or dict()))), mode='w')
+        self.prune()
+
+    def entries(self):
+        """
+        Return a list of dicts of the cache entries, the most recently used
+        first. Each dict has the keys ``'key'``, ``'size'`` (in bytes),
+        ``'last_used'`` (a timestamp), and those of the entry's metadata.
+        """
+        entries = list()
+        for file_name in os.listdir(self.directory):
+            key, suffix = os.path.splitext(file_name)
+            if suffix not in DATA_SUFFIXES:
+                continue
+            try:
+                stat = os.stat(self._path(key, suffix))
+            except OSError:
+                continue  # just removed by another process
+
+            entry = dict()
+            try:
+                with open(self._path(key, METADATA_SUFFIX)) as f:
+                    entry.update(json.loads(f.read()))
+            except (IOError, OSError, ValueError):
+                pass
+            entry.update(key=key, size=stat.st_size,
+                         last_used=stat.st_mtime)
+            entries.append(entry)
+
+        entries.sort(key=lambda entry: entry['last_used'], reverse=True)
+        return entries
+
+    def total_size(self):
+        """
+        Return the total size of the cache entries in bytes.
+        """
+        return sum(entry['size'] for entry in self.entries())
+
+    def remove(self, key):
+        for suffix in DATA_SUFFIXES + (METADATA_SUFFIX,):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def prune(self, size_limit=None):
+        """
+        Remove the least recently used entries until the cache takes at most
+        *size_limit* bytes (default: the size limit of the cache).
+
+        :return: the list of the removed entries
+        """
+        if size_limit is None:
+            size_limit = self.size_limit
+
+        entries = self.entries()
+        total_size = sum(entry['size'] for entry in entries)
+        removed = list()
+
+        while entries and total_size > size_limit:
+            entry = entries.pop()
+            self.remove(entry['key'])
+            total_size -= entry['size']
+            removed.append(entry)
+
+        return removed
+
+    def clear(self):
+        """
+        Remove all entries.
+
+        :return: the list of the removed entries
+        """
+        return self.prune(0)
+
+
+def print_entries(entries):
+    for entry in entries:
+        print('{}  {:>9}  {}  {:<9} {}'.format(
+            entry['key'][:12], format_size(entry['size']),
+            time.strftime('%Y-%m-%d %H:%M:%S',
+                          time.localtime(entry['last_used'])),
+            entry.get('module', '?'), entry.get('file_path', '')))
+
+
+def main(args=None):
+    """
+    Command line interface for inspecting and pruning a cache,
+    as in ``linguistica cache info``.
+    """
+    parser = argparse.ArgumentParser(
+        prog='linguistica cache',
+        description='Inspect and prune the cache of Linguistica results.')
+    parser.add_argument('command', choices=['info', 'prune', 'clear'],
+                        help='info: list the cache entries, '
+                             'the most recently used first; '
+                             'prune: remove the least recently used entries '
+                             'over the size limit; '
+                             'clear: remove all entries')
+    parser.add_argument('--dir', default=CACHE_DIR,
+                        help='cache directory (default: %(default)s)')
+    parser.add_argument('--size-limit', default=format_size(SIZE_LIMIT),
+                        help='size limit for "prune", e.g., 500M '
+                             '(default: %(default)s)')
+    args = parser.parse_args(args)
+
+    if not os.path.isdir(args.dir):
+        print('No cache at', args.dir)
+        return
+
+    cache = ResultCache(args.dir)
+
+    if args.command == 'info':
+        entries = cache.entries()
+        print('Cache at {}: {} entries, {}'.format(
+            cache.directory, len(entries),
+            format_size(sum(entry['size'] for entry in entries))))
+        print_entries(entries)
+    else:
+        if args.command == 'prune':
+            removed = cache.prune(parse_size(args.size_limit))
+        else:
+            removed = cache.clear()
+        print('Removed {} entries, {}'.format(
+            len(removed), format_size(sum(entry['size']
+                                          for entry in removed))))
+        print_entries(removed)
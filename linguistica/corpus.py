@@ -0,0 +1,327 @@
+# -*- encoding: utf8 -*-
+
+import bz2
+import glob
+import gzip
+import io
+import mmap
+import os
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+import six
+
+from linguistica.util import ENCODING
+
+try:
+    import lzma
+except ImportError:
+    lzma = None  # no lzma in Python 2
+
+CHUNK_SIZE = 1 << 20  # in bytes
+
+# file extensions of compressed files, with the classes to read them
+COMPRESSED_FILE_CLASSES = {'.gz': gzip.GzipFile,
+                           '.bz2': bz2.BZ2File,
+                           '.xz': lzma.LZMAFile if lzma else None,
+                           }
+
+
+def is_ascii_compatible(encoding):
+    """
+    Return whether line breaks in *encoding* can be found byte-wise.
+    """
+    return u'\r\n'.encode(encoding) == b'\r\n'
+
+
+def compressed_file_class(file_path):
+    """
+    Return the class to read the compressed file at *file_path*,
+    or None if the file is not compressed (by its file extension).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in COMPRESSED_FILE_CLASSES:
+        return None
+
+    file_class = COMPRESSED_FILE_CLASSES[extension]
+    if file_class is None:
+        raise ImportError('unable to import lzma for ' + file_path)
+    return file_class
+
+
+def expand_corpus_path(path):
+    """
+    Return the sorted list of the corpus file paths of *path*, which is
+    either a file path, a directory (for all the files in it and in its
+    subdirectories, except hidden ones), or a glob pattern.
+    """
+    if os.path.isfile(path):
+        return [path]
+
+    if os.path.isdir(path):
+        file_paths = list()
+        for directory, subdirectories, file_names in os.walk(path):
+            subdirectories[:] = [name for name in subdirectories
+                                 if not name.startswith('.')]
+            file_paths.extend(os.path.join(directory, name)
+                              for name in file_names
+                              if not name.startswith('.'))
+        return sorted(file_paths)
+
+    return sorted(file_path for file_path in glob.glob(path)
+                  if os.path.isfile(file_path))
+
+
+def looks_like_path(string):
+    """
+    Return whether the one-line *string* looks like a file path (or a glob
+    pattern) rather than corpus text: it is an absolute path or starts with
+    '~', or it is one token with a path separator or a file extension.
+    """
+    if '\n' in string or '\r' in string:
+        return False
+    if os.path.isabs(string) or string.startswith('~'):
+        return True
+    if any(character.isspace() for character in string):
+        return False
+    return os.sep in string or '/' in string or \
+        len(os.path.splitext(string)[1]) > 1
+
+
+def open_corpus(path, encoding=ENCODING):
+    """
+    Return the ``CorpusFile`` object of *path* for a single file, or the
+    ``CorpusFiles`` object for a directory or a glob pattern.
+    """
+    file_paths = expand_corpus_path(path)
+    if not file_paths:
+        raise IOError('no corpus files found -- ' + path)
+    if file_paths == [path]:
+        return CorpusFile(path, encoding=encoding)
+    return CorpusFiles(file_paths, encoding=encoding)
+
+
+def split_lines(text):
+    """
+    Split *text* into lines as in the universal newlines mode of text files.
+
+    The line break characters themselves are not kept.
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
+
+
+class CorpusFile:
+    """
+    A corpus text file.
+
+    The file is memory-mapped, and its text is decoded one chunk at a time,
+    so that no copy of the whole corpus is ever held in memory.
+    A compressed file (``.gz``, ``.bz2``, or ``.xz``) is decompressed
+    as a stream instead.
+    Iterating over a ``CorpusFile`` object gives the lines of the file,
+    the same as those from ``io.open()`` (without the line breaks).
+    A ``CorpusFile`` object can be iterated over any number of times.
+    """
+
+    def __init__(self, file_path, encoding=ENCODING):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.compressed_file_class = compressed_file_class(file_path)
+
+    @property
+    def file_paths(self):
+        return [self.file_path]
+
+    def __iter__(self):
+        return self.lines()
+
+    def size(self):
+        """
+        Return the file size in bytes.
+        """
+        return os.path.getsize(self.file_path)
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        """
+        Yield the text of the byte range [*start*, *end*) in chunks.
+
+        Each chunk has about *chunk_size* bytes and ends at a line break
+        (or at *end*), so that no line is split across chunks.
+        *start* must be at the beginning of a line.
+        A compressed file is always read as a whole.
+        """
+        if self.compressed_file_class is not None:
+            for text in self._decompressed_chunks(chunk_size):
+                yield text
+            return
+
+        if end is None:
+            end = self.size()
+        if start >= end:
+            return
+
+        if not is_ascii_compatible(self.encoding):
+            # line breaks cannot be found in the raw bytes
+            with open(self.file_path, encoding=self.encoding) as f:
+                for text_lines in iter(lambda: f.readlines(chunk_size), []):
+                    yield ''.join(text_lines)
+            return
+
+        with open(self.file_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                position = start
+                while position < end:
+                    stop = position + chunk_size
+                    if stop < end:
+                        line_break = mapped.find(b'\n', stop - 1, end)
+                        if line_break == -1:
+                            stop = end
+                        else:
+                            stop = line_break + 1
+                    else:
+                        stop = end
+
+                    yield mapped[position: stop].decode(self.encoding)
+                    position = stop
+            finally:
+                mapped.close()
+
+    def _decompressed_chunks(self, chunk_size):
+        with self.compressed_file_class(self.file_path, 'rb') as f:
+            if not is_ascii_compatible(self.encoding):
+                text_file = io.TextIOWrapper(f, encoding=self.encoding)
+                for text_lines in iter(lambda: text_file.readlines(chunk_size),
+                                       []):
+                    yield ''.join(text_lines)
+                return
+
+            for data in iter(lambda: f.read(chunk_size), b''):
+                if not data.endswith(b'\n'):
+                    data += f.readline()  # the rest of the last line
+                yield data.decode(self.encoding)
+
+    def lines(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        """
+        Yield the lines of the byte range [*start*, *end*).
+        """
+        for text in self.chunks(start, end, chunk_size):
+            text_lines = split_lines(text)
+            if not text_lines[-1]:
+                # the chunk ends with a line break
+                text_lines.pop()
+            for line in text_lines:
+                yield line
+
+    def shards(self, n_shards):
+        """
+        Split the file into at most *n_shards* byte ranges,
+        each of which starts at the beginning of a line.
+        A compressed file is not split.
+
+        :return: a list of (start, end) byte offsets
+        """
+        file_size = self.size()
+
+        if self.compressed_file_class is not None or \
+                not is_ascii_compatible(self.encoding):
+            return [(0, file_size)] if file_size else []
+
+        offsets = [0]
+
+        with open(self.file_path, 'rb') as f:
+            for i in range(1, n_shards):
+                position = file_size * i // n_shards
+                if position <= offsets[-1]:
+                    continue
+
+                # move to the start of the line following the byte before
+                # *position*, so that a shard never begins mid-line
+                f.seek(position - 1)
+                f.readline()
+                position = f.tell()
+
+                if position >= file_size:
+                    break
+                if position > offsets[-1]:
+                    offsets.append(position)
+
+        offsets.append(file_size)
+        return [(start, end) for start, end in zip(offsets[:-1], offsets[1:])
+                if start < end]
+
+
+class CorpusFiles:
+    """
+    A corpus of several text files (possibly compressed), read one after
+    another in the order of *file_paths*.
+
+    Iterating over a ``CorpusFiles`` object gives the lines of all the files.
+    """
+
+    def __init__(self, file_paths, encoding=ENCODING):
+        self.file_paths = list(file_paths)
+        self.encoding = encoding
+        self.corpus_files = [CorpusFile(file_path, encoding=encoding)
+                             for file_path in self.file_paths]
+
+    def __iter__(self):
+        for corpus_file in self.corpus_files:
+            for line in corpus_file:
+                yield line
+
+    def shards(self, n_shards):
+        """
+        Split the files into about *n_shards* byte ranges, in proportion to
+        the file sizes, with at least one per non-empty file.
+
+        :return: a list of (file path, start, end) tuples in corpus order
+        """
+        sizes = [corpus_file.size() for corpus_file in self.corpus_files]
+        total_size = max(sum(sizes), 1)
+
+        shards = list()
+        for corpus_file, size in zip(self.corpus_files, sizes):
+            n_file_shards = max(n_shards * size // total_size, 1)
+            shards.extend((corpus_file.file_path, start, end)
+                          for start, end in corpus_file.shards(n_file_shards))
+        return shards
+
+
+class CorpusText:
+    """
+    An in-memory corpus.
+
+    *corpus_object* is either a long string of text or an iterable of
+    strings (e.g., a list of word tokens, or a generator of lines).
+    Either way, the corpus is treated as running text: word ngrams span the
+    boundaries between the strings, as if the strings were joined with
+    spaces. Iterating over a ``CorpusText`` object gives the corpus in
+    pieces without joining or copying it as a whole.
+    A generator can be iterated over only once.
+    """
+
+    def __init__(self, corpus_object):
+        if not isinstance(corpus_object, six.string_types) and \
+                not hasattr(corpus_object, '__iter__'):
+            raise TypeError('corpus object must be either a text or '
+                            'an iterable of strings')
+        self.corpus_object = corpus_object
+
+    def __iter__(self):
+        if isinstance(self.corpus_object, six.string_types):
+            return self._iter_text_lines(self.corpus_object)
+        else:
+            return iter(self.corpus_object)
+
+    @staticmethod
+    def _iter_text_lines(text):
+        start = 0
+        while True:
+            line_break = text.find('\n', start)
+            if line_break == -1:
+                yield text[start:]
+                return
+            yield text[start: line_break]
+            start = line_break + 1
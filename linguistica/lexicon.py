@@ -1,15 +1,25 @@
 # -*- encoding: utf8 -*-
 
-import six
 import sys
 import os
 from io import StringIO
 from io import open  # not using built-in open(), for py2+3 cross compatibility
 
-from linguistica import (ngram, signature, manifold, phon, trie)
-from linguistica.util import (ENCODING, PARAMETERS, SEP_SIG, SEP_SIGTRANSFORM,
-                              double_sorted, fix_punctuations,
-                              output_latex, vprint)
+import six
+
+from linguistica import (ngram, signature, manifold, phon, trie, sweep)
+from linguistica.cache import (SIZE_LIMIT as CACHE_SIZE_LIMIT, ResultCache,
+                               files_digest, make_key)
+from linguistica.corpus import (CorpusFile, CorpusFiles, CorpusText,
+                                expand_corpus_path, looks_like_path,
+                                open_corpus)
+from linguistica.ngram_table import WordNgrams
+from linguistica.release import __version__
+from linguistica.signature_store import SignatureStore
+from linguistica.util import (ENCODING, MODULE_PARAMETERS, PARAMETERS,
+                              PUNCTUATIONS, SEP_SIG, SEP_SIGTRANSFORM,
+                              double_sorted, output_latex, vprint)
+from linguistica.wordlist_file import (parse_wordlist, read_wordlist_file)
 
 
 try:
@@ -17,6 +27,19 @@ try:
 except NameError:
     FileNotFoundError = OSError  # no FileNotFoundError in Python 2
 
+# the objects which each module makes, as cached in a ResultCache
+MODULE_OBJECTS = {'ngram': ('_word_ngrams', '_word_unigram_counter'),
+                  'signature': ('_signature_store',),
+                  'phon': ('_phone_unigram_counter', '_phone_bigram_counter',
+                           '_phone_trigram_counter', '_phone_dict',
+                           '_biphone_dict', '_word_dict', '_words_to_phones'),
+                  'trie': ('_broken_words_left_to_right',
+                           '_broken_words_right_to_left', '_successors',
+                           '_predecessors'),
+                  'manifold': ('_words_to_neighbors', '_words_to_contexts',
+                               '_contexts_to_words', '_neighbor_graph'),
+                  }
+
 
 class Lexicon:
     """
@@ -24,26 +47,55 @@ class Lexicon:
     """
 
     def __init__(self, file_path=None, wordlist_file=False, corpus_object=None,
-                 wordlist_object=None, encoding=ENCODING, **kwargs):
-        self.file_abspath = self._check_file_path(file_path)
+                 wordlist_object=None, encoding=ENCODING, n_jobs=1,
+                 punctuations=PUNCTUATIONS, ngram_memory_budget=0,
+                 ngram_memory_limit=0, cache_dir=None,
+                 cache_size_limit=CACHE_SIZE_LIMIT, compile_wordlist=True,
+                 compile_next_to_file=False, count_bisignatures_first=False,
+                 **kwargs):
+        self.file_abspath = self._check_file_path(
+            file_path, corpus_files=not wordlist_file)
 
         if self.file_abspath is None:
             self.directory = None
+        elif os.path.isdir(self.file_abspath):
+            self.directory = self.file_abspath
         else:
             self.directory = os.path.dirname(self.file_abspath)
 
         self.file_is_wordlist = wordlist_file
+        self.compile_wordlist = compile_wordlist
+        self.compile_next_to_file = compile_next_to_file
         self.encoding = encoding
         self.corpus_object = corpus_object
         self.wordlist_object = wordlist_object
+        self.n_jobs = n_jobs
+        self.punctuations = punctuations
+        self.ngram_memory_budget = ngram_memory_budget
+        self.ngram_memory_limit = ngram_memory_limit
+        self.count_bisignatures_first = count_bisignatures_first
         self.parameters_ = self._determine_parameters(**kwargs)
 
+        # corpus objects from add_corpus(), kept across reset()
+        self.added_corpus_file_objects = list()
+
+        # cache of the results of the modules, for input files only
+        if cache_dir is None:
+            self.result_cache = None
+        else:
+            self.result_cache = ResultCache(cache_dir,
+                                            size_limit=cache_size_limit)
+        self._file_digest = None
+
         self._initialize()
 
     @staticmethod
-    def _check_file_path(file_path):
+    def _check_file_path(file_path, corpus_files=False):
         """
         Return the absolute path of *file_path*.
+
+        :param corpus_files: whether *file_path* can also be a directory or
+            a glob pattern of corpus files
         """
         if file_path is None:
             return None
@@ -57,10 +109,12 @@ class Lexicon:
             file_path = file_path.replace('\\', os.sep)
 
         file_abspath = os.path.abspath(file_path)
-        if not os.path.isfile(file_abspath):
-            raise FileNotFoundError
-        else:
+        if os.path.isfile(file_abspath):
             return file_abspath
+        elif corpus_files and expand_corpus_path(file_abspath):
+            return file_abspath
+        else:
+            raise FileNotFoundError
 
     @staticmethod
     def _determine_parameters(**kwargs):
@@ -109,6 +163,7 @@ class Lexicon:
         self._number_of_word_tokens = None
 
         # word ngrams
+        self._word_ngrams = None
         self._word_unigram_counter = None
         self._word_bigram_counter = None
         self._word_trigram_counter = None
@@ -147,33 +202,15 @@ class Lexicon:
                 raise TypeError('wordlist object must be a dict of word-count'
                                 'pairs or an iterable of words')
 
-        # signature-related objects
-        self._stems_to_words = None
-        self._signatures_to_stems = None
-        self._stems_to_signatures = None
-        self._words_to_signatures = None
-        self._signatures_to_words = None
-        self._words_to_sigtransforms = None
-
-        self._signatures = None
-        self._affixes_to_signatures = None
-        self._words_in_signatures = None
-        self._affixes = None
-        self._stems = None
+        self._reset_signature_objects()
 
         # corpus file object
         if self.corpus_object is not None:
-            # self.corpus_object is either a list of strings or a long str
-            if type(self.corpus_object) is list:
-                corpus_str = fix_punctuations(' '.join(self.corpus_object))
-            elif type(self.corpus_object) is six.text_type:
-                corpus_str = fix_punctuations(self.corpus_object)
-            else:
-                raise TypeError('corpus object must be either a text or list')
-            self.corpus_file_object = StringIO(corpus_str)
+            # self.corpus_object is either a long str or an iterable of str
+            self.corpus_file_object = CorpusText(self.corpus_object)
         elif self.file_abspath and not self.file_is_wordlist:
-            self.corpus_file_object = open(self.file_abspath,
-                                           encoding=self.encoding)
+            self.corpus_file_object = open_corpus(self.file_abspath,
+                                                  encoding=self.encoding)
         else:
             self.corpus_file_object = None
 
@@ -184,13 +221,36 @@ class Lexicon:
         else:
             self.wordlist_file_object = StringIO()
 
-        # manifold-related objects
+        self._reset_manifold_objects()
+        self._reset_phon_objects()
+        self._words_to_phones = None
+        self._reset_trie_objects()
+
+    def _reset_signature_objects(self):
+        # signature objects kept up to date by add_corpus()
+        self._incremental_signatures = None
+        self._signature_store = None
+
+        self._stems_to_words = None
+        self._signatures_to_stems = None
+        self._stems_to_signatures = None
+        self._words_to_signatures = None
+        self._signatures_to_words = None
+        self._words_to_sigtransforms = None
+
+        self._signatures = None
+        self._affixes_to_signatures = None
+        self._words_in_signatures = None
+        self._affixes = None
+        self._stems = None
+
+    def _reset_manifold_objects(self):
         self._words_to_neighbors = None
         self._words_to_contexts = None
         self._contexts_to_words = None
         self._neighbor_graph = None
 
-        # phon objects
+    def _reset_phon_objects(self):
         self._phone_unigram_counter = None
         self._phone_bigram_counter = None
         self._phone_trigram_counter = None
@@ -198,23 +258,175 @@ class Lexicon:
         self._phone_dict = None
         self._biphone_dict = None
         self._word_dict = None
-        self._words_to_phones = None
 
-        # trie objects
+    def _reset_trie_objects(self):
         self._broken_words_left_to_right = None
         self._broken_words_right_to_left = None
         self._successors = None
         self._predecessors = None
 
+    def _cache_key(self, module):
+        """
+        Return the cache key of the results of *module* and the dict of the
+        parameters in the key, or (None, None) if there is no cache for them.
+        """
+        if self.result_cache is None or self.file_abspath is None or \
+                self.added_corpus_file_objects:
+            return None, None
+
+        if self._file_digest is None:
+            self._file_digest = files_digest(
+                expand_corpus_path(self.file_abspath))
+
+        parameters = {parameter: self.parameters_[parameter] for parameter in
+                      MODULE_PARAMETERS['ngram'] + MODULE_PARAMETERS[module]}
+        parameters.update(wordlist_file=bool(self.file_is_wordlist),
+                          encoding=self.encoding,
+                          objects=list(MODULE_OBJECTS[module]))
+        if not self.file_is_wordlist:
+            parameters.update(punctuations=self.punctuations,
+                              ngram_memory_budget=self.ngram_memory_budget)
+            if self.ngram_memory_budget > 0:
+                # approximate counts keep only the ngrams of this count
+                parameters.update(
+                    min_context_count=self.parameters_['min_context_count'])
+
+        return make_key(module, self._file_digest, parameters), parameters
+
+    def _load_from_cache(self, module):
+        """
+        Set the objects of *module* to their cached values, if any.
+
+        :return: whether the objects were found in the cache
+        """
+        key, _ = self._cache_key(module)
+        if key is None:
+            return False
+
+        results = self.result_cache.get(key)
+        if results is None:
+            return False
+
+        for attribute, value in zip(MODULE_OBJECTS[module], results):
+            setattr(self, attribute, value)
+        return True
+
+    def _save_to_cache(self, module):
+        """
+        Cache the objects of *module*.
+        """
+        key, parameters = self._cache_key(module)
+        if key is None:
+            return
+
+        results = tuple(getattr(self, attribute)
+                        for attribute in MODULE_OBJECTS[module])
+        metadata = {'module': module, 'file_path': self.file_abspath,
+                    'parameters': parameters, 'version': __version__}
+        self.result_cache.put(key, results, metadata)
+
     def reset(self):
         """
         Reset the Linguistica object. While the file path information is
         retained, all computed objects (ngrams, signatures, word neighbors,
         etc) are reset to ``NULL``; if they are called again, they are
         re-computed.
+        (Corpora added by ``add_corpus()`` are counted again, too.)
         """
         self._initialize()
 
+    def add_corpus(self, text_or_path, encoding=None):
+        """
+        Add more corpus text, and update the word ngram counts in place.
+
+        Only the objects which depend on the word counts (the wordlist,
+        signatures, tries, phonology, and word manifolds) are reset, and they
+        are re-computed when they are called again. The morphological
+        signatures are then updated for only those words which have entered or
+        left the wordlist (see ``signature.IncrementalSignatures``), except the
+        first time, and the signature objects already returned stay up to date.
+        The new text is counted without any *max_word_tokens* limit, and word
+        ngrams do not span the boundary between the new text and the earlier
+        text.
+
+        :param text_or_path: the path of a corpus file, a directory, or a
+            glob pattern as in ``read_corpus()``, or a corpus object as in
+            ``from_corpus()`` (a long string of text or an iterable of
+            strings). A generator cannot be counted again after ``reset()``.
+            A one-line string which looks like a path (see
+            ``corpus.looks_like_path()``) but matches no files raises
+            ``FileNotFoundError``.
+        :param encoding: encoding of the corpus files; defaults to the
+            encoding of this Linguistica object.
+        """
+        if self.file_is_wordlist or self.wordlist_object is not None:
+            raise ValueError('cannot add a corpus to a Linguistica object '
+                             'of a wordlist')
+
+        # a path has no line breaks, unlike (most) text
+        if isinstance(text_or_path, six.string_types) and \
+                '\n' not in text_or_path and expand_corpus_path(text_or_path):
+            corpus_file_object = open_corpus(
+                os.path.abspath(text_or_path),
+                encoding=encoding if encoding is not None else self.encoding)
+        elif isinstance(text_or_path, six.string_types) and \
+                looks_like_path(text_or_path):
+            # added corpora cannot be removed, so a mistyped path is an error
+            # rather than one word of text
+            raise FileNotFoundError('no corpus files at ' + text_or_path)
+        else:
+            corpus_file_object = CorpusText(text_or_path)
+
+        if self.corpus_file_object is None:
+            # nothing has been counted so far
+            self.corpus_file_object = corpus_file_object
+            self._word_ngrams = None
+            self._word_unigram_counter = None
+        else:
+            self.added_corpus_file_objects.append(corpus_file_object)
+            if self._word_ngrams is not None:
+                self._add_word_ngrams(self._count_word_ngrams(
+                    corpus_file_object, n_jobs=self.n_jobs))
+
+        self._number_of_word_types = None
+        self._number_of_word_tokens = None
+        self._wordlist = None
+
+        # the signatures are updated for the words which are new to (or no
+        # longer in) the wordlist, rather than made again from scratch
+        incremental_signatures = self._incremental_signatures
+        signature_store = self._signature_store
+        self._reset_signature_objects()
+        self._incremental_signatures = incremental_signatures
+        self._signature_store = signature_store
+
+        self._reset_manifold_objects()
+        self._reset_phon_objects()
+        self._reset_trie_objects()
+
+    def _add_word_ngrams(self, word_ngrams):
+        """
+        Merge the counts of *word_ngrams* into those computed so far.
+        """
+        merged = WordNgrams.merge([self._word_ngrams, word_ngrams])
+        self._word_ngrams = merged
+
+        if merged.is_approximate():
+            # estimated counts are not the sums of earlier estimates
+            self._word_unigram_counter = merged.unigram_counter()
+            self._word_bigram_counter = None
+            self._word_trigram_counter = None
+            return
+
+        for counter, new_counter in (
+                (self._word_unigram_counter, word_ngrams.unigram_counter),
+                (self._word_bigram_counter, word_ngrams.bigram_counter),
+                (self._word_trigram_counter, word_ngrams.trigram_counter)):
+            if counter is None:
+                continue
+            for key, count in new_counter().items():
+                counter[key] = counter.get(key, 0) + count
+
     def run_all_modules(self, verbose=False):
         """
         Run all modules.
@@ -742,7 +954,7 @@ class Lexicon:
         :rtype: dict(tuple(str): int)
         """
         if self._word_bigram_counter is None:
-            self._make_word_ngrams_from_corpus_file_object()
+            self._word_bigram_counter = self.word_ngrams().bigram_counter()
         return self._word_bigram_counter
 
     def word_trigram_counter(self):
@@ -752,9 +964,22 @@ class Lexicon:
         :rtype: dict(tuple(str): int)
         """
         if self._word_trigram_counter is None:
-            self._make_word_ngrams_from_corpus_file_object()
+            self._word_trigram_counter = self.word_ngrams().trigram_counter()
         return self._word_trigram_counter
 
+    def word_ngrams(self):
+        """
+        Return the word unigram, bigram, and trigram counts over an integer
+        vocabulary, with the bigrams and trigrams as sorted arrays of word ids.
+        The dicts of ``word_bigram_counter()`` and ``word_trigram_counter()``
+        are built from this object only when they are asked for.
+
+        :rtype: WordNgrams instance
+        """
+        if self._word_ngrams is None:
+            self._make_word_ngrams_from_corpus_file_object()
+        return self._word_ngrams
+
     def _make_wordlist(self):
         """
         Return a wordlist sorted by word frequency in descending order.
@@ -777,49 +1002,83 @@ class Lexicon:
         return self._wordlist
 
     def _read_from_wordlist_file_object(self):
-        word_freq_dict = dict()
-        words_to_phones = dict()
-
-        for line in self.wordlist_file_object:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            line_split = line.split()
-            word = line_split[0]
-
-            if not self.parameters_['keep_case']:
-                word = word.lower()
-
-            try:
-                freq = int(line_split[1])
-            except (ValueError, IndexError):
-                freq = 1
-
-            phones = line_split[2:]
-            if not phones:
-                phones = list(word)
+        keep_case = self.parameters_['keep_case']
+
+        # the compiled form is kept only where it was asked for: in the
+        # result cache, or next to the file
+        if self.file_is_wordlist and self.compile_wordlist and (
+                self.result_cache is not None or self.compile_next_to_file):
+            wordlist = read_wordlist_file(
+                self.file_abspath, self.encoding, keep_case,
+                cache=self.result_cache,
+                next_to_file=self.compile_next_to_file)
+            self._word_unigram_counter = wordlist.word_unigram_counter()
+            self._words_to_phones = wordlist.words_to_phones()
+            return
 
-            word_freq_dict[word] = freq
-            words_to_phones[word] = phones
+        self._word_unigram_counter, self._words_to_phones = parse_wordlist(
+            self.wordlist_file_object, keep_case)
 
-        self._word_unigram_counter = word_freq_dict
-        self._words_to_phones = words_to_phones
+    def _make_word_ngrams_from_corpus_file_object(self, n_jobs=None):
+        """
+        Count word ngrams in the corpus.
 
-    def _make_word_ngrams_from_corpus_file_object(self):
+        :param n_jobs: number of worker processes for a corpus file;
+            defaults to the ``n_jobs`` of this Linguistica object.
+        """
         if self.corpus_file_object is None:
-            self._word_bigram_counter = dict()
-            self._word_trigram_counter = dict()
+            self._word_ngrams = WordNgrams()
             return
 
-        unigrams, bigrams, trigrams = ngram.run(
-            corpus_file_object=self.corpus_file_object,
-            keep_case=self.parameters_['keep_case'],
-            max_word_tokens=self.parameters_['max_word_tokens'])
+        if self._load_from_cache('ngram'):
+            return
 
-        self._word_unigram_counter = unigrams
-        self._word_bigram_counter = bigrams
-        self._word_trigram_counter = trigrams
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+
+        word_ngrams = self._count_word_ngrams(
+            self.corpus_file_object,
+            max_word_tokens=self.parameters_['max_word_tokens'],
+            n_jobs=n_jobs)
+
+        if self.added_corpus_file_objects:
+            word_ngrams = WordNgrams.merge(
+                [word_ngrams] + [self._count_word_ngrams(corpus_file_object,
+                                                         n_jobs=n_jobs)
+                                 for corpus_file_object
+                                 in self.added_corpus_file_objects])
+
+        self._word_ngrams = word_ngrams
+        self._word_unigram_counter = word_ngrams.unigram_counter()
+        self._save_to_cache('ngram')
+
+    def _count_word_ngrams(self, corpus_file_object, max_word_tokens=0,
+                           n_jobs=1):
+        """
+        Count word ngrams in *corpus_file_object*.
+
+        :rtype: WordNgrams instance
+        """
+        if n_jobs != 1 and isinstance(corpus_file_object,
+                                      (CorpusFile, CorpusFiles)):
+            return ngram.count_parallel(
+                corpus_file_object.file_paths,
+                encoding=corpus_file_object.encoding,
+                keep_case=self.parameters_['keep_case'],
+                max_word_tokens=max_word_tokens,
+                n_jobs=n_jobs, punctuations=self.punctuations,
+                memory_budget=self.ngram_memory_budget,
+                min_count=self.parameters_['min_context_count'],
+                memory_limit=self.ngram_memory_limit)
+        else:
+            return ngram.count(
+                corpus_file_object=corpus_file_object,
+                keep_case=self.parameters_['keep_case'],
+                max_word_tokens=max_word_tokens,
+                punctuations=self.punctuations,
+                memory_budget=self.ngram_memory_budget,
+                min_count=self.parameters_['min_context_count'],
+                memory_limit=self.ngram_memory_limit)
 
     def run_ngram_module(self, verbose=False):
         """
@@ -942,36 +1201,117 @@ class Lexicon:
             self._make_all_signature_objects()
         return self._stems
 
-    def _make_all_signature_objects(self):
-        self._stems_to_words = signature.make_stems_to_words(
-            self.wordlist(), self.parameters_['min_stem_length'],
-            self.parameters_['max_affix_length'],
-            self.parameters_['suffixing'], self.parameters_['min_sig_count'])
+    def signatures_with_affixes(self, affixes):
+        """
+        Return a set of the morphological signatures which contain all of
+        *affixes*, e.g. ``('ed', 'ing')`` for all signatures with both
+        -ed and -ing. The null affix is "NULL".
+
+        :param affixes: an affix, or an iterable of affixes
+        :rtype: set(tuple(str))
+        """
+        self.signatures()
+        return self._signature_store.signatures_containing(affixes)
 
-        self._signatures_to_stems = signature.make_signatures_to_stems(
-            self._stems_to_words, self.parameters_['max_affix_length'],
-            self.parameters_['min_sig_count'], self.parameters_['suffixing'])
+    def signatures_within_affixes(self, affixes):
+        """
+        Return a set of the morphological signatures all of whose affixes are
+        among *affixes*.
 
-        self._stems_to_signatures = signature.make_stems_to_signatures(
-            self._signatures_to_stems)
+        :param affixes: an affix, or an iterable of affixes
+        :rtype: set(tuple(str))
+        """
+        self.signatures()
+        return self._signature_store.signatures_contained_in(affixes)
 
-        self._words_to_signatures = signature.make_words_to_signatures(
-            self._stems_to_words, self._stems_to_signatures)
+    def stems_with_affixes(self, affixes):
+        """
+        Return a set of the stems whose morphological signatures contain all
+        of *affixes*, e.g. ``('ed', 'ing')`` for all stems which take both
+        -ed and -ing.
 
-        self._signatures_to_words = signature.make_signatures_to_words(
-            self._words_to_signatures)
+        :param affixes: an affix, or an iterable of affixes
+        :rtype: set(str)
+        """
+        self.signatures()
+        return self._signature_store.stems_containing(affixes)
 
-        self._words_to_sigtransforms = signature.make_words_to_sigtransforms(
-            self._words_to_signatures, self.parameters_['suffixing'])
+    def stems_within_affixes(self, affixes):
+        """
+        Return a set of the stems with a morphological signature all of whose
+        affixes are among *affixes*. (A stem may have other signatures, too.)
 
-        self._signatures = set(self._signatures_to_stems.keys())
+        :param affixes: an affix, or an iterable of affixes
+        :rtype: set(str)
+        """
+        self.signatures()
+        return self._signature_store.stems_contained_in(affixes)
 
-        self._affixes_to_signatures = signature.make_affixes_to_signatures(
-            self._signatures)
+    def _make_all_signature_objects(self):
+        if not self._load_from_cache('signature'):
+            self._make_signature_store()
+            self._save_to_cache('signature')
+
+        # views of the signature store
+        store = self._signature_store
+        self._stems_to_words = store.stems_to_words
+        self._signatures_to_stems = store.signatures_to_stems
+        self._stems_to_signatures = store.stems_to_signatures
+        self._words_to_signatures = store.words_to_signatures
+        self._signatures_to_words = store.signatures_to_words
+        self._words_to_sigtransforms = store.words_to_sigtransforms
+        self._signatures = store.signatures
+        self._affixes_to_signatures = store.affixes_to_signatures
+        self._words_in_signatures = store.words_in_signatures
+        self._affixes = store.affixes
+        self._stems = store.stems
+
+    def _make_signature_store(self):
+        parameters = (self.parameters_['min_stem_length'],
+                      self.parameters_['max_affix_length'],
+                      self.parameters_['suffixing'],
+                      self.parameters_['min_sig_count'])
+        if self._signature_store is None:
+            self._signature_store = SignatureStore()
+
+        # the dicts of the incremental signatures are much larger than the
+        # store; they are kept only once a corpus has been added, for updates
+        if not self.added_corpus_file_objects:
+            self._incremental_signatures = None
+            self._load_signature_store_from_scratch(*parameters)
+            return
 
-        self._words_in_signatures = set(self._words_to_signatures.keys())
-        self._affixes = set(self._affixes_to_signatures.keys())
-        self._stems = set(self._stems_to_words.keys())
+        if self._incremental_signatures is None or \
+                self._incremental_signatures.parameters != parameters:
+            self._incremental_signatures = signature.IncrementalSignatures(
+                *parameters, n_jobs=self.n_jobs)
+
+        signatures = self._incremental_signatures
+        signatures.update(self.wordlist())
+        self._signature_store.load(signatures.stems_to_words,
+                                   signatures.signatures_to_stems,
+                                   signatures.words_to_sigtransforms)
+
+    def _load_signature_store_from_scratch(self, min_stem_length,
+                                           max_affix_length, suffixing,
+                                           min_sig_count):
+        # with count_bisignatures_first, no (stem, word1, word2) tuples are
+        # made for the bisignatures with fewer than min_sig_count of them,
+        # in less memory but more time
+        stems_to_words = signature.make_stems_to_words(
+            self.wordlist(), min_stem_length, max_affix_length, suffixing,
+            min_sig_count, n_jobs=self.n_jobs,
+            count_first=self.count_bisignatures_first)
+        signatures_to_stems = signature.make_signatures_to_stems(
+            stems_to_words, max_affix_length, min_sig_count, suffixing,
+            n_jobs=self.n_jobs)
+        words_to_signatures = signature.make_words_to_signatures(
+            stems_to_words,
+            signature.make_stems_to_signatures(signatures_to_stems))
+        words_to_sigtransforms = signature.make_words_to_sigtransforms(
+            words_to_signatures, suffixing)
+        self._signature_store.load(stems_to_words, signatures_to_stems,
+                                   words_to_sigtransforms)
 
     def run_signature_module(self, verbose=False):
         """
@@ -980,6 +1320,28 @@ class Lexicon:
         vprint(verbose, 'Morphological signatures...')
         self._make_all_signature_objects()
 
+    def sweep(self, grid, n_jobs=None):
+        """
+        Run the signature module for each point of a grid of parameters,
+        sharing the wordlist and the bisignatures across the points
+        (see the ``sweep`` module). The parameters of this Linguistica object
+        are not changed.
+
+        :param grid: a dict of the names of signature parameters
+            (``min_stem_length``, ``max_affix_length``, ``min_sig_count``,
+            ``suffixing``) to lists of their values; the other parameters
+            have their current values.
+        :param n_jobs: number of worker processes, among which the points
+            are split; defaults to the ``n_jobs`` of this Linguistica object.
+        :return: a list of the dicts of the parameters and summary statistics
+            of the points
+        :rtype: list(dict(str: int or float))
+        """
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+        return sweep.run(self.wordlist(), grid, self.parameters_,
+                         n_jobs=n_jobs)
+
     # --------------------------------------------------------------------------
     # for the "manifold" module
 
@@ -1024,6 +1386,9 @@ class Lexicon:
         return self._neighbor_graph
 
     def _make_all_manifold_objects(self):
+        if self._load_from_cache('manifold'):
+            return
+
         self._words_to_neighbors, self._words_to_contexts, \
             self._contexts_to_words = manifold.run(
                 self.word_unigram_counter(),
@@ -1034,6 +1399,7 @@ class Lexicon:
                 self.parameters_['n_eigenvectors'],
                 self.parameters_['min_context_count'])
         self._neighbor_graph = manifold.compute_graph(self._words_to_neighbors)
+        self._save_to_cache('manifold')
 
     def run_manifold_module(self, verbose=False):
         """
@@ -1059,6 +1425,7 @@ class Lexicon:
     def phone_bigram_counter(self):
         """
         Return a dict of phone bigrams with counts.
+        It is a read-only view of arrays (``phon.PhoneNgramsView``).
 
         :rtype: dict(tuple(str): int)
         """
@@ -1069,6 +1436,7 @@ class Lexicon:
     def phone_trigram_counter(self):
         """
         Return a dict of phone trigrams with counts.
+        It is a read-only view of arrays (``phon.PhoneNgramsView``).
 
         :rtype: dict(tuple(str): int)
         """
@@ -1103,11 +1471,12 @@ class Lexicon:
 
     def word_phonology_dict(self):
         """
-        Return a dict of words to Word objects.
-        A Word instance has the methods
-        ``spelling()``, ``phones()``, ``count()``, ``frequency()``,
-        ``unigram_plog()``, ``avg_unigram_plog()``,
-        ``bigram_plog()``, and ``avg_bigram_plog()``.
+        Return a dict-like view of words to Word objects.
+        A Word instance has the attributes
+        ``spelling``, ``phones``, ``count``, ``frequency``,
+        ``unigram_plog``, ``avg_unigram_plog``,
+        ``bigram_plog``, and ``avg_bigram_plog``, which are read from the
+        arrays of a ``phon.WordPhonology`` of all words.
 
         :rtype: dict(str: Word instance)
         """
@@ -1115,6 +1484,28 @@ class Lexicon:
             self._make_all_phon_objects()
         return self._word_dict
 
+    def score_phonotactics(self, words, unseen_phone_plog=None,
+                           batch_size=phon.SCORE_BATCH_SIZE):
+        """
+        Generate the (word, unigram plog, bigram plog) tuples of *words*,
+        which need not be in the wordlist, scored against the phones and
+        biphones of the wordlist. The words are scored *batch_size* at a
+        time, so *words* may be any iterable (e.g., a generator over a file).
+
+        A word is either a string, whose phones are its letters, or a
+        sequence of phones. Biphones never seen in the wordlist have an MI
+        of 0, and phones never seen have the plog *unseen_phone_plog*, by
+        default that of a phone seen once more than all phones together.
+
+        :param words: an iterable of words
+        :param unseen_phone_plog: the plog of phones never seen
+        :param batch_size: the number of words scored at once
+        :rtype: generator of tuple(word, float, float)
+        """
+        phonology = self.word_phonology_dict().phonology
+        return phonology.score(words, unseen_phone_plog=unseen_phone_plog,
+                               batch_size=batch_size)
+
     def words_to_phones(self):
         """
         Return a dict of words with their phones.
@@ -1124,6 +1515,9 @@ class Lexicon:
         return self._words_to_phones
 
     def _make_all_phon_objects(self):
+        if self._load_from_cache('phon'):
+            return
+
         word_unigram_counter = self.word_unigram_counter()
         words_to_phones = self.words_to_phones()
 
@@ -1138,6 +1532,7 @@ class Lexicon:
                                               self.phone_dict(),
                                               self.biphone_dict(),
                                               self.words_to_phones())
+        self._save_to_cache('phon')
 
     def run_phon_module(self, verbose=False):
         """
@@ -1162,6 +1557,8 @@ class Lexicon:
     def broken_words_right_to_left(self):
         """
         Return a dict of words to their right-to-left broken form.
+        It is a read-only view of the broken forms of the reversed words,
+        which are reversed back as they are read.
 
         :rtype: dict(str: list(str))
         """
@@ -1172,6 +1569,7 @@ class Lexicon:
     def successors(self):
         """
         Return a dict of word (sub)strings to their successors.
+        It is a read-only view of a ``trie_store.PieceTrie`` of the words.
 
         :rtype: dict(str: set(str))
         """
@@ -1182,6 +1580,8 @@ class Lexicon:
     def predecessors(self):
         """
         Return a dict of word (sub)strings to their predecessors.
+        It is a read-only view of a ``trie_store.PieceTrie`` of the reversed
+        words.
 
         :rtype: dict(str: set(str))
         """
@@ -1190,9 +1590,13 @@ class Lexicon:
         return self._predecessors
 
     def _make_all_trie_objects(self):
+        if self._load_from_cache('trie'):
+            return
+
         self._broken_words_left_to_right, self._broken_words_right_to_left, \
             self._successors, self._predecessors = trie.run(
                 self.wordlist(), self.parameters_['min_stem_length'])
+        self._save_to_cache('trie')
 
     def run_trie_module(self, verbose=False):
         """
@@ -1,40 +1,268 @@
 # -*- encoding: utf8 -*-
 
-from collections import Counter
+import multiprocessing
+import shutil
+import tempfile
 
-from linguistica.util import fix_punctuations
+import numpy as np
+import six
 
+from linguistica.corpus import (CorpusFile, CorpusFiles, CorpusText,
+                                expand_corpus_path)
+from linguistica.ngram_table import (WordNgramCounter, WordNgrams)
+from linguistica.util import (ENCODING, PUNCTUATIONS, Tokenizer)
 
-def run(corpus_file_object=None, keep_case=False, max_word_tokens=0):
+SHARDS_PER_JOB = 4  # more shards than workers for load balancing
 
-    unigrams_counter = Counter()
-    bigrams_counter = Counter()
-    trigrams_counter = Counter()
 
-    current_word_token_count = 0
+def count_lines(lines, keep_case=False, max_word_tokens=0,
+                current_word_token_count=0, punctuations=PUNCTUATIONS,
+                memory_budget=0, min_count=1, memory_limit=0, temp_dir=None):
+    """
+    Count word unigrams, bigrams, and trigrams in *lines*.
+
+    Counting stops at the first line which starts after more than
+    *max_word_tokens* word tokens have been seen (zero means no limit).
+    *current_word_token_count* is the number of word tokens already seen
+    before *lines*, so that a corpus can be counted in consecutive pieces.
+    Each character in *punctuations* is a word token of its own.
+    For *memory_budget*, *min_count*, and *memory_limit*, see ``count()``;
+    *temp_dir* is the directory for the spilled tables (see
+    ``ngram_table.WordNgramCounter``).
+
+    :return: a tuple of the ``WordNgrams`` object
+        and the word token count at the end of *lines*
+    """
+    tokenize = Tokenizer(punctuations=punctuations, keep_case=keep_case)
+    counter = WordNgramCounter(memory_budget=memory_budget,
+                               min_count=min_count, memory_limit=memory_limit,
+                               temp_dir=temp_dir)
 
-    for line in corpus_file_object:
+    for line in lines:
         if max_word_tokens and current_word_token_count > max_word_tokens:
             break
 
-        line = fix_punctuations(line).strip()
+        words = tokenize(line)
+        if not words:
+            continue
+
+        current_word_token_count += len(words)
+        counter.add(words)
+
+    return counter.word_ngrams(), current_word_token_count
+
+
+def count_running_text(pieces, keep_case=False, punctuations=PUNCTUATIONS,
+                       memory_budget=0, min_count=1, memory_limit=0):
+    """
+    Count word unigrams, bigrams, and trigrams in running text which comes
+    as consecutive *pieces* of strings.
 
-        if not keep_case:
-            line = line.lower()
+    Word ngrams span the boundaries between the pieces, as if the pieces
+    were joined with spaces into one line of text.
+    For *memory_budget*, *min_count*, and *memory_limit*, see ``count()``.
 
-        words = line.split()
+    :return: a tuple of the ``WordNgrams`` object and the word token count
+    """
+    tokenize = Tokenizer(punctuations=punctuations, keep_case=keep_case)
+    counter = WordNgramCounter(memory_budget=memory_budget,
+                               min_count=min_count, memory_limit=memory_limit)
+    current_word_token_count = 0
+
+    for piece in pieces:
+        words = tokenize(piece)
         if not words:
             continue
 
+        counter.add(words, new_line=not current_word_token_count)
         current_word_token_count += len(words)
 
-        unigrams_of_line = words
-        bigrams_of_line = zip(*[words[i:] for i in range(2)])
-        trigrams_of_line = zip(*[words[i:] for i in range(3)])
+    return counter.word_ngrams(), current_word_token_count
+
+
+def count(corpus_file_object=None, keep_case=False, max_word_tokens=0,
+          punctuations=PUNCTUATIONS, memory_budget=0, min_count=1,
+          memory_limit=0):
+    """
+    Count word unigrams, bigrams, and trigrams.
+
+    By default, all counts are exact. If *memory_budget* is positive,
+    bigrams and trigrams are counted approximately with a Count-Min sketch
+    in about *memory_budget* bytes (on top of the vocabulary), and only the
+    bigrams and trigrams whose estimated counts are at least *min_count* are
+    returned. Estimates are never below the true counts, and with
+    probability at least 1 - exp(-4) (about 98%) each one exceeds its true
+    count by at most e * N / w, where N is the total number of bigrams (or
+    trigrams) and w = 3 * *memory_budget* / 256 is the sketch width;
+    ``WordNgrams.error_bounds()`` gives the actual values.
+    Unigrams are always exact.
+
+    If *memory_limit* is positive (and *memory_budget* is zero), the counts
+    are exact, and whenever the bigram and trigram tables take more than
+    about *memory_limit* bytes, they are spilled to temporary files as
+    sorted runs, which are k-way merged at the end. The merged tables are
+    memory-mapped from temporary files.
+
+    :param corpus_file_object: an iterable of lines, such as a file object
+        or a ``corpus.CorpusFile`` object, or a ``corpus.CorpusText``
+        object for running text (to which *max_word_tokens* does not apply)
+    :param punctuations: characters which are word tokens of their own
+    :param memory_budget: bytes for approximate counting; zero means exact
+    :param min_count: the smallest estimated count of the bigrams and
+        trigrams kept in approximate counting
+    :param memory_limit: bytes of bigram and trigram tables kept in memory
+        in exact counting; zero means no limit
+    :rtype: ``ngram_table.WordNgrams``
+    """
+    if isinstance(corpus_file_object, CorpusText):
+        word_ngrams, _ = count_running_text(corpus_file_object,
+                                            keep_case=keep_case,
+                                            punctuations=punctuations,
+                                            memory_budget=memory_budget,
+                                            min_count=min_count,
+                                            memory_limit=memory_limit)
+    else:
+        word_ngrams, _ = count_lines(corpus_file_object, keep_case=keep_case,
+                                     max_word_tokens=max_word_tokens,
+                                     punctuations=punctuations,
+                                     memory_budget=memory_budget,
+                                     min_count=min_count,
+                                     memory_limit=memory_limit)
+    return word_ngrams
+
+
+def run(corpus_file_object=None, keep_case=False, max_word_tokens=0,
+        punctuations=PUNCTUATIONS, memory_budget=0, min_count=1,
+        memory_limit=0):
+    word_ngrams = count(corpus_file_object, keep_case=keep_case,
+                        max_word_tokens=max_word_tokens,
+                        punctuations=punctuations,
+                        memory_budget=memory_budget, min_count=min_count,
+                        memory_limit=memory_limit)
+
+    return (word_ngrams.unigram_counter(), word_ngrams.bigram_counter(),
+            word_ngrams.trigram_counter())
+
+
+def _count_shard(args):
+    (file_path, encoding, start, end, keep_case, punctuations,
+     memory_budget, min_count, memory_limit) = args
+    corpus_file = CorpusFile(file_path, encoding=encoding)
+
+    # worker processes exit without running atexit handlers, so the spilled
+    # tables of a shard are removed here, once they are back in memory
+    temp_dir = tempfile.mkdtemp(prefix='linguistica-') if memory_limit \
+        else None
+    try:
+        word_ngrams, word_token_count = count_lines(
+            corpus_file.lines(start, end), keep_case=keep_case,
+            punctuations=punctuations, memory_budget=memory_budget,
+            min_count=min_count, memory_limit=memory_limit,
+            temp_dir=temp_dir)
+        if temp_dir is not None:
+            for table in (word_ngrams.bigrams, word_ngrams.trigrams):
+                table.keys = np.array(table.keys)
+                table.counts = np.array(table.counts)
+        return word_ngrams, word_token_count
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, True)
+
+
+def count_parallel(file_path, encoding=ENCODING, keep_case=False,
+                   max_word_tokens=0, n_jobs=2, punctuations=PUNCTUATIONS,
+                   memory_budget=0, min_count=1, memory_limit=0):
+    """
+    Count word ngrams of the corpus at *file_path* with a pool of
+    *n_jobs* worker processes.
+
+    *file_path* is the path of a corpus file, a directory, or a glob pattern
+    (see ``corpus.expand_corpus_path()``), or a list of file paths.
+    The files are split into byte-range shards on line boundaries; each
+    compressed file is one shard, decompressed as a stream by a worker.
+    The results are the same as those of ``count()`` for the files in order,
+    including the truncation at *max_word_tokens*. In approximate counting,
+    *memory_budget* applies to each shard, and the sketches of the shards
+    are merged. Likewise, *memory_limit* applies to each worker process,
+    whose spilled tables are removed when its shard is done. It does not
+    bound the parent process: the tables of the shards are sent back in
+    memory, and they are merged in memory.
+
+    :param n_jobs: number of worker processes; a value below 1 means
+        as many as there are CPUs.
+    :rtype: ``ngram_table.WordNgrams``
+    """
+    if n_jobs < 1:
+        n_jobs = multiprocessing.cpu_count()
+
+    if isinstance(file_path, six.string_types):
+        file_paths = expand_corpus_path(file_path)
+    else:
+        file_paths = list(file_path)
+    corpus_files = CorpusFiles(file_paths, encoding=encoding)
+
+    if n_jobs == 1:
+        return count(corpus_files, keep_case=keep_case,
+                     max_word_tokens=max_word_tokens,
+                     punctuations=punctuations, memory_budget=memory_budget,
+                     min_count=min_count, memory_limit=memory_limit)
+
+    shards = corpus_files.shards(n_jobs * SHARDS_PER_JOB)
+
+    # an ngram reaching min_count overall reaches this in at least one shard
+    shard_min_count = -(-min_count // max(len(shards), 1))
+    tasks = [(shard_file_path, encoding, start, end, keep_case, punctuations,
+              memory_budget, shard_min_count, memory_limit)
+             for shard_file_path, start, end in shards]
+
+    word_ngrams_list = list()
+    current_word_token_count = 0
+
+    pool = multiprocessing.Pool(n_jobs)
+    try:
+        # imap() returns the shard results in corpus order, which is what
+        # makes the max_word_tokens truncation below exact
+        for (shard_file_path, start, end), result in zip(
+                shards, pool.imap(_count_shard, tasks)):
+            word_ngrams, shard_word_token_count = result
+
+            if max_word_tokens and (current_word_token_count +
+                                    shard_word_token_count >
+                                    max_word_tokens):
+                # the truncation point is in this shard: recount it with
+                # the tokens seen so far, and ignore all later shards
+                corpus_file = CorpusFile(shard_file_path, encoding=encoding)
+                word_ngrams, _ = count_lines(
+                    corpus_file.lines(start, end),
+                    keep_case=keep_case, max_word_tokens=max_word_tokens,
+                    current_word_token_count=current_word_token_count,
+                    punctuations=punctuations, memory_budget=memory_budget,
+                    min_count=shard_min_count, memory_limit=memory_limit)
+                word_ngrams_list.append(word_ngrams)
+                break
+
+            current_word_token_count += shard_word_token_count
+            word_ngrams_list.append(word_ngrams)
+    finally:
+        pool.terminate()
+
+    return WordNgrams.merge(word_ngrams_list, min_count=min_count)
+
 
-        unigrams_counter.update(unigrams_of_line)
-        bigrams_counter.update(bigrams_of_line)
-        trigrams_counter.update(trigrams_of_line)
+def run_parallel(file_path, encoding=ENCODING, keep_case=False,
+                 max_word_tokens=0, n_jobs=2, punctuations=PUNCTUATIONS,
+                 memory_budget=0, min_count=1, memory_limit=0):
+    """
+    Count word ngrams of the corpus at *file_path* with a pool of
+    *n_jobs* worker processes; see ``count_parallel()``.
+    """
+    word_ngrams = count_parallel(file_path, encoding=encoding,
+                                 keep_case=keep_case,
+                                 max_word_tokens=max_word_tokens,
+                                 n_jobs=n_jobs, punctuations=punctuations,
+                                 memory_budget=memory_budget,
+                                 min_count=min_count,
+                                 memory_limit=memory_limit)
 
-    return (dict(unigrams_counter), dict(bigrams_counter),
-            dict(trigrams_counter))
+    return (word_ngrams.unigram_counter(), word_ngrams.bigram_counter(),
+            word_ngrams.trigram_counter())
@@ -0,0 +1,677 @@
+# -*- encoding: utf8 -*-
+
+import atexit
+import copy
+import os
+import shutil
+import tempfile
+from array import array
+
+import numpy as np
+
+from linguistica.sketch import (DEPTH, CountMinSketch, hash_words)
+
+BATCH_SIZE = 1 << 20  # number of word tokens encoded before each reduction
+
+# in approximate counting, the share of the memory budget for the sketch;
+# the rest is for the ngrams tracked as heavy hitters
+SKETCH_SHARE = 0.75
+
+MIN_MERGE_BLOCK_SIZE = 1 << 12  # rows read from each sorted run at a time
+
+
+def _sort_keys(keys, n_bits=None):
+    """
+    Return a 1-D array whose sort order is the row-wise lexicographic order
+    of the 2-D array of word ids *keys*.
+
+    The word ids of each row are packed into one unsigned 64-bit integer
+    whenever they fit (i.e., for bigrams always, and for trigrams as long
+    as the vocabulary has fewer than 2 ** 21 words); otherwise the rows
+    are compared as big-endian byte strings.
+
+    :param n_bits: number of bits per word id; defaults to what the largest
+        word id in *keys* needs. Sort keys of different arrays can be
+        compared only if they are made with the same *n_bits*.
+    """
+    order = keys.shape[1]
+    if n_bits is None:
+        n_bits = max(int(keys.max()).bit_length(), 1)
+
+    if n_bits * order <= 64:
+        n_bits = np.uint64(n_bits)
+        packed = np.zeros(len(keys), dtype=np.uint64)
+        for column in keys.T:
+            packed = (packed << n_bits) | column.astype(np.uint64)
+        return packed
+
+    return np.ascontiguousarray(keys.astype('>u4')).view(
+        'V%d' % (4 * order)).ravel()
+
+
+def reduce_ngrams(keys, counts):
+    """
+    Sort the rows of word ids *keys* and merge duplicate rows by summing
+    their *counts*.
+
+    :return: a tuple of the sorted and deduplicated keys and their counts
+    """
+    if not len(keys):
+        return keys, counts
+
+    sorted_indices = np.argsort(_sort_keys(keys), kind='mergesort')
+    keys = keys[sorted_indices]
+    counts = counts[sorted_indices]
+
+    is_new = np.ones(len(keys), dtype=bool)
+    is_new[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+    starts = np.flatnonzero(is_new)
+
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+class Vocabulary:
+    """
+    A mapping of word types to dense integer ids, in order of first
+    occurrence.
+    """
+
+    def __init__(self, words=None):
+        self.word_ids = dict()
+        if words is not None:
+            self.encode(words)
+
+    def __len__(self):
+        return len(self.word_ids)
+
+    def __contains__(self, word):
+        return word in self.word_ids
+
+    def encode(self, words):
+        """
+        Return the list of word ids of *words*; new words get new ids.
+        """
+        word_ids = self.word_ids
+        # len() is evaluated before setdefault() inserts a new word
+        return [word_ids.setdefault(word, len(word_ids)) for word in words]
+
+    def words(self):
+        """
+        Return the list of words, indexed by word id.
+        """
+        words = [None] * len(self.word_ids)
+        for word, word_id in self.word_ids.items():
+            words[word_id] = word
+        return words
+
+
+def merge_sorted_ngrams(order, runs, out_keys, out_counts, n_bits,
+                        block_size=MIN_MERGE_BLOCK_SIZE):
+    """
+    K-way merge *runs*, a list of (keys, counts) tuples each sorted and
+    deduplicated (e.g., as memory-mapped arrays), into the preallocated
+    arrays *out_keys* and *out_counts*.
+
+    Up to *block_size* rows of each run are read at a time. All the ngrams up
+    to the smallest of the last ngrams of the blocks are merged in one step,
+    because no later rows of any run can have them.
+
+    :param n_bits: number of bits per word id for ``_sort_keys()``
+    :return: the number of merged rows
+    """
+    positions = [0] * len(runs)
+    n_merged = 0
+
+    while True:
+        blocks = [(i, keys[positions[i]: positions[i] + block_size])
+                  for i, (keys, _) in enumerate(runs)
+                  if positions[i] < len(keys)]
+        if not blocks:
+            return n_merged
+
+        last_keys = np.array([block[-1] for _, block in blocks],
+                             dtype=np.int32).reshape(-1, order)
+        frontier = np.sort(_sort_keys(last_keys, n_bits))[0]
+
+        block_keys = list()
+        block_counts = list()
+        for i, block in blocks:
+            n_rows = np.searchsorted(_sort_keys(block, n_bits), frontier,
+                                     side='right')
+            block_keys.append(block[:n_rows])
+            block_counts.append(runs[i][1][positions[i]:
+                                           positions[i] + n_rows])
+            positions[i] += n_rows
+
+        keys, counts = reduce_ngrams(np.concatenate(block_keys),
+                                     np.concatenate(block_counts))
+        out_keys[n_merged: n_merged + len(keys)] = keys
+        out_counts[n_merged: n_merged + len(keys)] = counts
+        n_merged += len(keys)
+
+
+class SortedRuns:
+    """
+    Sorted and deduplicated ngram tables of one order, spilled to ``.npy``
+    files in *directory*.
+    """
+
+    def __init__(self, order, directory):
+        self.order = order
+        self.directory = directory
+        self.file_paths = list()  # (keys file path, counts file path) pairs
+
+    def __len__(self):
+        return len(self.file_paths)
+
+    def _file_path(self, name):
+        return os.path.join(self.directory, '{}-{}gram-{}.npy'.format(
+            name, self.order, len(self.file_paths)))
+
+    def add(self, table):
+        """
+        Write the ``NgramTable`` object *table* to files.
+        """
+        file_paths = self._file_path('keys'), self._file_path('counts')
+        np.save(file_paths[0], table.keys)
+        np.save(file_paths[1], table.counts)
+        self.file_paths.append(file_paths)
+
+    def merge(self, tables, n_bits, memory_limit):
+        """
+        Merge the spilled runs and the in-memory ``NgramTable`` objects
+        *tables* into one table. The run files are removed, and the arrays
+        of the merged table are memory-mapped from new files in *directory*.
+
+        :param n_bits: number of bits per word id for ``_sort_keys()``
+        :param memory_limit: the approximate number of bytes for the blocks
+            of the runs read at a time
+        """
+        runs = [(np.load(keys_path, mmap_mode='r'),
+                 np.load(counts_path, mmap_mode='r'))
+                for keys_path, counts_path in self.file_paths]
+        runs.extend((table.keys, table.counts) for table in tables)
+
+        n_rows = sum(len(counts) for _, counts in runs)
+        if not n_rows:
+            return NgramTable(self.order)
+
+        # the merged table has at most n_rows rows
+        out_keys = np.lib.format.open_memmap(
+            self._file_path('merged-keys'), mode='w+', dtype=np.int32,
+            shape=(n_rows, self.order))
+        out_counts = np.lib.format.open_memmap(
+            self._file_path('merged-counts'), mode='w+', dtype=np.int64,
+            shape=(n_rows,))
+
+        # each row of a block and its sort key take about 4 * order + 16
+        # bytes, and the merge step needs a few copies of them
+        block_size = max(memory_limit // (4 * len(runs) *
+                                          (4 * self.order + 16)),
+                         MIN_MERGE_BLOCK_SIZE)
+        n_merged = merge_sorted_ngrams(self.order, runs, out_keys,
+                                       out_counts, n_bits, block_size)
+        out_keys.flush()
+        out_counts.flush()
+
+        del runs
+        for file_paths in self.file_paths:
+            for file_path in file_paths:
+                os.remove(file_path)
+        self.file_paths = list()
+
+        return NgramTable(self.order, out_keys[:n_merged],
+                          out_counts[:n_merged])
+
+
+class NgramTable:
+    """
+    Word ngrams of one order (e.g., 2 for bigrams).
+
+    *keys* is a 2-D int32 array whose rows are the word ids of the ngrams,
+    sorted and deduplicated, and *counts* is the int64 array of their
+    counts.
+    """
+
+    def __init__(self, order, keys=None, counts=None):
+        self.order = order
+        if keys is None:
+            keys = np.zeros((0, order), dtype=np.int32)
+            counts = np.zeros(0, dtype=np.int64)
+        self.keys = keys
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    @classmethod
+    def from_partial_tables(cls, order, tables, id_maps=None):
+        """
+        Merge *tables* into one table.
+
+        :param id_maps: if given, one array per table which maps the word ids
+            of that table to those of the merged table
+        """
+        if id_maps is None:
+            if len(tables) == 1:
+                return tables[0]
+            keys = [table.keys for table in tables]
+        else:
+            keys = [id_map[table.keys] for table, id_map in
+                    zip(tables, id_maps)]
+        keys = np.concatenate([np.zeros((0, order), dtype=np.int32)] + keys)
+        counts = np.concatenate([np.zeros(0, dtype=np.int64)] +
+                                [table.counts for table in tables])
+        keys, counts = reduce_ngrams(keys.astype(np.int32), counts)
+        return cls(order, keys, counts)
+
+    def to_dict(self, words):
+        """
+        Return a dict of ngrams (as tuples of words) to their counts.
+
+        :param words: the list of words, indexed by word id
+        """
+        return {tuple(words[word_id] for word_id in key): count
+                for key, count in zip(self.keys.tolist(),
+                                      self.counts.tolist())}
+
+
+class HeavyHitters:
+    """
+    The ngrams of one order whose counts are estimated to be at least
+    *min_count*, within about *memory_budget* bytes.
+
+    The counts are kept in a ``sketch.CountMinSketch``. After each update, the
+    ngrams just added whose estimated counts reach *min_count* are kept as
+    candidates (at most as many as fit in the memory budget; those with the
+    lowest estimates are dropped first). Because estimates never decrease
+    and are never below the true counts, every ngram with a true count of
+    at least *min_count* is a candidate, as long as there is room for all
+    candidates. The reported counts are overestimates within the error bound
+    of the sketch.
+
+    *keys* are 2-D arrays of word ids; *word_hashes* is the array of the
+    hash values (from ``sketch.hash_words()``) of the words, indexed by
+    word id.
+    """
+
+    def __init__(self, order, memory_budget, min_count=1, depth=DEPTH):
+        self.order = order
+        self.min_count = max(min_count, 1)
+
+        sketch_bytes = int(memory_budget * SKETCH_SHARE)
+        width = max(sketch_bytes // (depth * 8), 1)
+        self.sketch = CountMinSketch(order, width, depth)
+
+        bytes_per_key = 4 * order + 8
+        self.capacity = max((memory_budget - sketch_bytes) // bytes_per_key,
+                            1)
+
+        self.keys = np.zeros((0, order), dtype=np.int32)
+
+    def update(self, keys, counts, word_hashes):
+        key_hashes = word_hashes[keys]
+        self.sketch.add(key_hashes, counts)
+
+        estimates = self.sketch.estimate(key_hashes)
+        self.add_candidates(keys[estimates >= self.min_count], word_hashes)
+
+    def add_candidates(self, keys, word_hashes):
+        keys = np.concatenate([self.keys, keys]).astype(np.int32)
+        if not len(keys):
+            return
+
+        keys, _ = reduce_ngrams(keys, np.zeros(len(keys), dtype=np.int64))
+        if len(keys) > self.capacity:
+            estimates = self.sketch.estimate(word_hashes[keys])
+            kept = np.sort(np.argsort(-estimates,
+                                      kind='mergesort')[: self.capacity])
+            keys = keys[kept]
+        self.keys = keys
+
+    def merge(self, other, id_map, word_hashes):
+        """
+        Add the counts and candidates of *other* (whose word ids are mapped
+        to those of this object by the array *id_map*).
+        """
+        self.sketch.merge(other.sketch)
+        self.add_candidates(id_map[other.keys], word_hashes)
+
+    def counts(self, word_hashes):
+        """
+        Return a tuple of the candidate keys whose estimated counts are at
+        least *min_count*, and the estimated counts.
+        """
+        if not len(self.keys):
+            return self.keys, np.zeros(0, dtype=np.int64)
+
+        estimates = self.sketch.estimate(word_hashes[self.keys])
+        is_heavy = estimates >= self.min_count
+        return self.keys[is_heavy], estimates[is_heavy]
+
+
+class WordNgrams:
+    """
+    Word unigram, bigram, and trigram counts over an integer vocabulary.
+
+    *words* is the list of word types, indexed by word id,
+    and *unigram_counts* the array of their counts.
+    *bigrams* and *trigrams* are ``NgramTable`` objects.
+
+    If the bigrams and trigrams were counted approximately, *heavy_hitters*
+    is the tuple of the ``HeavyHitters`` objects for bigrams and
+    trigrams, and the bigram and trigram counts are their estimates.
+    """
+
+    def __init__(self, words=None, unigram_counts=None, bigrams=None,
+                 trigrams=None, heavy_hitters=None):
+        self.words = words if words is not None else list()
+        if unigram_counts is None:
+            unigram_counts = np.zeros(len(self.words), dtype=np.int64)
+        self.unigram_counts = unigram_counts
+        self.bigrams = bigrams if bigrams is not None else NgramTable(2)
+        self.trigrams = trigrams if trigrams is not None else NgramTable(3)
+        self.heavy_hitters = heavy_hitters
+
+    def is_approximate(self):
+        """
+        Return whether the bigram and trigram counts are estimates.
+        """
+        return self.heavy_hitters is not None
+
+    def error_bounds(self):
+        """
+        Return the error bounds of the bigram and trigram count estimates,
+        as a dict of ngram orders (2 and 3) to (epsilon, delta, N) tuples.
+        With probability at least 1 - delta, an estimated count exceeds the
+        true count by at most epsilon * N, where N is the total number of
+        ngrams of that order; estimates are never below the true counts.
+        For exact counts, epsilon and delta are zero.
+        """
+        if self.heavy_hitters is None:
+            return {2: (0.0, 0.0, int(self.bigrams.counts.sum())),
+                    3: (0.0, 0.0, int(self.trigrams.counts.sum()))}
+        bounds = dict()
+        for heavy_hitters in self.heavy_hitters:
+            epsilon, delta = heavy_hitters.sketch.error_bound()
+            bounds[heavy_hitters.order] = (
+                epsilon, delta, heavy_hitters.sketch.total_count)
+        return bounds
+
+    def number_of_word_tokens(self):
+        return int(self.unigram_counts.sum())
+
+    def unigram_counter(self):
+        """
+        Return a dict of words to their counts.
+        """
+        return dict(zip(self.words, self.unigram_counts.tolist()))
+
+    def bigram_counter(self):
+        """
+        Return a dict of word bigrams (as tuples) to their counts.
+        """
+        return self.bigrams.to_dict(self.words)
+
+    def trigram_counter(self):
+        """
+        Return a dict of word trigrams (as tuples) to their counts.
+        """
+        return self.trigrams.to_dict(self.words)
+
+    @classmethod
+    def merge(cls, word_ngrams_list, min_count=None):
+        """
+        Merge *word_ngrams_list*, a list of ``WordNgrams`` objects.
+
+        The word ids of the merged object follow the order in which the words
+        first occur in *word_ngrams_list*.
+
+        :param min_count: for approximate counts only, the smallest estimated
+            count of the merged bigrams and trigrams that are kept; defaults
+            to that of the first object. An ngram is found only if it is
+            a heavy hitter of at least one object, so the objects should use
+            a lower *min_count* of their own (e.g., divided by their number).
+        """
+        is_approximate = [word_ngrams.is_approximate()
+                          for word_ngrams in word_ngrams_list]
+        if any(is_approximate) and not all(is_approximate):
+            raise ValueError('cannot merge exact and approximate counts')
+
+        vocabulary = Vocabulary()
+        id_maps = [np.array(vocabulary.encode(word_ngrams.words),
+                            dtype=np.int32)
+                   for word_ngrams in word_ngrams_list]
+
+        unigram_counts = np.zeros(len(vocabulary), dtype=np.int64)
+        for word_ngrams, id_map in zip(word_ngrams_list, id_maps):
+            unigram_counts[id_map] += word_ngrams.unigram_counts
+
+        if is_approximate and all(is_approximate):
+            return cls._merge_approximate(word_ngrams_list, vocabulary.words(),
+                                          unigram_counts, id_maps, min_count)
+
+        bigrams = NgramTable.from_partial_tables(
+            2, [word_ngrams.bigrams for word_ngrams in word_ngrams_list],
+            id_maps)
+        trigrams = NgramTable.from_partial_tables(
+            3, [word_ngrams.trigrams for word_ngrams in word_ngrams_list],
+            id_maps)
+
+        return cls(vocabulary.words(), unigram_counts, bigrams, trigrams)
+
+    @classmethod
+    def _merge_approximate(cls, word_ngrams_list, words, unigram_counts,
+                           id_maps, min_count):
+        # the word ids of the first object are those of the merged object
+        heavy_hitters = copy.deepcopy(word_ngrams_list[0].heavy_hitters)
+        word_hashes = hash_words(words)
+        if min_count is not None:
+            for heavy in heavy_hitters:
+                heavy.min_count = max(min_count, 1)
+
+        for word_ngrams, id_map in zip(word_ngrams_list[1:], id_maps[1:]):
+            for merged, other in zip(heavy_hitters,
+                                     word_ngrams.heavy_hitters):
+                merged.merge(other, id_map, word_hashes)
+
+        bigrams, trigrams = [NgramTable(heavy.order,
+                                        *heavy.counts(word_hashes))
+                             for heavy in heavy_hitters]
+        return cls(words, unigram_counts, bigrams, trigrams, heavy_hitters)
+
+
+class WordNgramCounter:
+    """
+    Count word ngrams into ``WordNgrams`` without any per-ngram Python
+    objects.
+
+    Words are encoded as integer ids one line at a time. Every *batch_size*
+    word tokens, the ids are turned into bigram and trigram keys with NumPy,
+    which are then sorted and deduplicated.
+
+    If *memory_budget* (in bytes) is positive, bigrams and trigrams are
+    counted approximately instead: each batch is added to a
+    ``HeavyHitters`` object per order (half of the budget each),
+    and only those ngrams whose estimated counts reach *min_count* are kept.
+    Unigrams are always counted exactly.
+
+    Otherwise, if *memory_limit* (in bytes) is positive, the bigram and
+    trigram tables are spilled to temporary files as sorted runs whenever
+    they take more than about *memory_limit* bytes, and the runs are k-way
+    merged at the end. The counts stay exact; the merged tables are
+    memory-mapped from temporary files, which are removed when the Python
+    process exits. *temp_dir* is the directory for the temporary files
+    (default: that of the ``tempfile`` module).
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, memory_budget=0, min_count=1,
+                 memory_limit=0, temp_dir=None):
+        self.batch_size = batch_size
+        self.vocabulary = Vocabulary()
+        self.unigram_counts = np.zeros(0, dtype=np.int64)
+        self.bigram_tables = list()
+        self.trigram_tables = list()
+
+        if memory_budget > 0:
+            self.heavy_hitters = (
+                HeavyHitters(2, memory_budget // 2, min_count=min_count),
+                HeavyHitters(3, memory_budget // 2, min_count=min_count))
+        else:
+            self.heavy_hitters = None
+        self._word_hashes = np.zeros(0, dtype=np.uint64)
+
+        self.memory_limit = memory_limit
+        self.temp_dir = temp_dir
+        self._runs = None  # SortedRuns objects, once tables are spilled
+
+        self._ids = array('i')
+        self._line_starts = array('i')
+        self._n_context = 0  # number of ids carried over from the last batch
+        self._n_table_rows = 0
+        self._n_table_rows_after_reduction = 0
+
+    def add(self, words, new_line=True):
+        """
+        Add the word tokens *words*.
+
+        :param new_line: whether *words* start a new line; if False, ngrams
+            span the boundary with the previously added words.
+        """
+        if new_line:
+            self._line_starts.append(len(self._ids))
+        self._ids.extend(self.vocabulary.encode(words))
+
+        if len(self._ids) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        ids = np.array(self._ids, dtype=np.int32)
+        n_ids = len(ids)
+        n_context = self._n_context
+
+        is_line_start = np.zeros(n_ids + 2, dtype=bool)
+        is_line_start[np.array(self._line_starts, dtype=np.int64)] = True
+
+        vocabulary_size = len(self.vocabulary)
+        if len(self.unigram_counts) < vocabulary_size:
+            self.unigram_counts = np.concatenate([
+                self.unigram_counts,
+                np.zeros(vocabulary_size - len(self.unigram_counts),
+                         dtype=np.int64)])
+        self.unigram_counts += np.bincount(ids[n_context:],
+                                           minlength=vocabulary_size)
+
+        # an ngram starting at position i is counted in this batch if it
+        # does not cross a line start and ends after the carried-over ids
+        positions = np.arange(n_ids)
+        continues = ~is_line_start[1: n_ids + 1]
+
+        is_bigram = continues[:-1] & (positions[:-1] + 1 >= n_context)
+        bigram_keys = np.column_stack([ids[:-1][is_bigram],
+                                       ids[1:][is_bigram]])
+
+        is_trigram = continues[:-2] & continues[1:-1] & \
+            (positions[:-2] + 2 >= n_context)
+        trigram_keys = np.column_stack([ids[:-2][is_trigram],
+                                        ids[1:-1][is_trigram],
+                                        ids[2:][is_trigram]])
+
+        if self.heavy_hitters is not None:
+            self._update_word_hashes()
+
+        for order, keys, tables in ((2, bigram_keys, self.bigram_tables),
+                                    (3, trigram_keys, self.trigram_tables)):
+            keys, counts = reduce_ngrams(
+                keys.reshape(-1, order).astype(np.int32),
+                np.ones(len(keys), dtype=np.int64))
+            if self.heavy_hitters is not None:
+                self.heavy_hitters[order - 2].update(keys, counts,
+                                                     self._word_hashes)
+                continue
+            tables.append(NgramTable(order, keys, counts))
+            self._n_table_rows += len(keys)
+
+        # carry the last two ids over, for ngrams spanning the next batch
+        n_carried = min(n_ids, 2)
+        self._ids = array('i', self._ids[n_ids - n_carried:])
+        self._line_starts = array('i', [position - (n_ids - n_carried)
+                                        for position in self._line_starts
+                                        if position >= n_ids - n_carried])
+        self._n_context = n_carried
+
+        if self.memory_limit and self._table_bytes() > self.memory_limit:
+            self._spill_tables()
+        elif self._n_table_rows > 2 * self._n_table_rows_after_reduction:
+            self._reduce_tables()
+
+    def _update_word_hashes(self):
+        n_hashed = len(self._word_hashes)
+        if n_hashed < len(self.vocabulary):
+            self._word_hashes = np.concatenate([
+                self._word_hashes,
+                hash_words(self.vocabulary.words()[n_hashed:])])
+
+    def _table_bytes(self):
+        return sum(len(table) * (4 * table.order + 8) for table in
+                   self.bigram_tables + self.trigram_tables)
+
+    def _spill_tables(self):
+        self._reduce_tables()
+
+        if self._runs is None:
+            directory = tempfile.mkdtemp(prefix='linguistica-',
+                                         dir=self.temp_dir)
+            atexit.register(shutil.rmtree, directory, True)
+            self._runs = (SortedRuns(2, directory), SortedRuns(3, directory))
+
+        for runs, tables in zip(self._runs, (self.bigram_tables,
+                                             self.trigram_tables)):
+            runs.add(tables[0])
+
+        self.bigram_tables = list()
+        self.trigram_tables = list()
+        self._n_table_rows = self._n_table_rows_after_reduction = 0
+
+    def _reduce_tables(self):
+        self.bigram_tables = [
+            NgramTable.from_partial_tables(2, self.bigram_tables)]
+        self.trigram_tables = [
+            NgramTable.from_partial_tables(3, self.trigram_tables)]
+        self._n_table_rows = self._n_table_rows_after_reduction = \
+            len(self.bigram_tables[0]) + len(self.trigram_tables[0])
+
+    def word_ngrams(self):
+        """
+        Return the ``WordNgrams`` object of all the words added so far.
+        """
+        if len(self._ids) > self._n_context:
+            self._flush()
+        self._reduce_tables()
+
+        unigram_counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+        unigram_counts[: len(self.unigram_counts)] = self.unigram_counts
+
+        if self.heavy_hitters is not None:
+            self._update_word_hashes()
+            bigrams, trigrams = [
+                NgramTable(heavy.order, *heavy.counts(self._word_hashes))
+                for heavy in self.heavy_hitters]
+            return WordNgrams(self.vocabulary.words(), unigram_counts,
+                              bigrams, trigrams, self.heavy_hitters)
+
+        if self._runs is not None:
+            n_bits = max((len(self.vocabulary) - 1).bit_length(), 1)
+            bigrams, trigrams = [
+                runs.merge(tables, n_bits, self.memory_limit)
+                for runs, tables in zip(self._runs, (self.bigram_tables,
+                                                     self.trigram_tables))]
+            self.bigram_tables = [bigrams]
+            self.trigram_tables = [trigrams]
+            # ngrams added later are spilled to a new directory, if at all
+            self._runs = None
+            return WordNgrams(self.vocabulary.words(), unigram_counts,
+                              bigrams, trigrams)
+
+        return WordNgrams(self.vocabulary.words(), unigram_counts,
+                          self.bigram_tables[0], self.trigram_tables[0])
@@ -1,8 +1,26 @@
 # -*- encoding: utf8 -*-
 
-from collections import Counter
+from __future__ import division
+
+try:
+    from collections.abc import (ItemsView, Mapping, ValuesView)
+except ImportError:  # Python 2
+    from collections import (ItemsView, Mapping, ValuesView)
+from collections import defaultdict
+from functools import partial
+from itertools import (chain, count, islice)
 
 import numpy
+import six
+from six.moves import (map, zip)
+
+from linguistica.signature_store import StringTable
+
+# codes of phone ngrams up to this many are counted for all possible codes
+# at once, rather than for the distinct codes found by sorting
+DENSE_CODES = 1 << 20
+
+SCORE_BATCH_SIZE = 1 << 16  # number of words scored at once
 
 
 def plog(x):
@@ -11,7 +29,9 @@ def plog(x):
     return float(-1 * numpy.log2(x))
 
 
-class Phone:
+class Phone(object):
+    __slots__ = ('spelling', 'count', 'frequency', 'plog')
+
     def __init__(self, spelling, count, freq):
         self.spelling = spelling
         self.count = count
@@ -20,66 +40,521 @@ class Phone:
 
 
 # noinspection PyPep8Naming
-class Biphone:
+class Biphone(object):
+    __slots__ = ('phone1', 'phone2', 'count', 'frequency', 'MI',
+                 'weighted_MI')
+
     def __init__(self, phone1, phone2, count, freq):
         self.phone1 = phone1
         self.phone2 = phone2
 
-        self.spelling = (self.phone1.spelling, self.phone2.spelling)
         self.count = count
         self.frequency = freq
         self.MI = self.phone1.plog + self.phone2.plog - plog(self.frequency)
         self.weighted_MI = self.MI * self.count
 
+    @property
+    def spelling(self):
+        return self.phone1.spelling, self.phone2.spelling
+
+
+class Word(object):
+    """
+    The phonology of a word.
+
+    ``Word(phonology, index)`` reads the values of the word *index* of the
+    ``WordPhonology`` *phonology* from its arrays (as in ``make_word_dict()``).
+    ``Word(spelling, phones, count, freq, phone_dict, biphone_dict)``
+    computes them for one word on its own, as before, where *phones* has
+    '#' at both ends.
+    """
+
+    __slots__ = ('_phonology', '_index')
+
+    def __init__(self, *args):
+        if len(args) == 2:
+            self._phonology, self._index = args
+        elif len(args) == 6:
+            self._phonology, self._index = _OneWordPhonology(*args), 0
+        else:
+            raise TypeError('Word() takes (phonology, index) or (spelling, '
+                            'phones, count, freq, phone_dict, biphone_dict)')
+
+    @property
+    def spelling(self):
+        return self._phonology.words[self._index]
+
+    @property
+    def phones(self):
+        """
+        The list of the phones of the word, with '#' at both ends.
+        """
+        phonology = self._phonology
+        start, end = phonology.offsets[self._index: self._index + 2]
+        return [phonology.phones[i]
+                for i in phonology.ids[start: end].tolist()]
+
+    @property
+    def count(self):
+        return self._phonology.counts[self._index].item()
+
+    @property
+    def frequency(self):
+        return self._phonology.frequency(self._index)
+
+    @property
+    def unigram_plog(self):
+        return float(self._phonology.unigram_plogs[self._index])
+
+    @property
+    def avg_unigram_plog(self):
+        return float(self._phonology.avg_unigram_plogs[self._index])
+
+    @property
+    def bigram_plog(self):
+        return float(self._phonology.bigram_plogs[self._index])
+
+    @property
+    def avg_bigram_plog(self):
+        return float(self._phonology.avg_bigram_plogs[self._index])
+
+
+class WordPhonology:
+    """
+    The phonology of the words of *word_unigram_counter*.
+
+    The phones of the words are kept as one flat array of phone ids with
+    word offsets (see ``encode_phones()``), the plogs of the phones as a
+    vector, and the mutual information of the biphones as a dense
+    phones-by-phones matrix (0 for the biphones not in *biphone_dict*).
+    The unigram and bigram plogs of all words are sums of these values
+    gathered by phone ids, over the segments of the words.
+    """
+
+    def __init__(self, word_unigram_counter=None, phone_dict=None,
+                 biphone_dict=None, words_to_phones=None):
+        word_unigram_counter = word_unigram_counter or dict()
+        phone_dict = phone_dict or dict()
+        biphone_dict = biphone_dict or dict()
+
+        self.words = StringTable(word_unigram_counter)
+        words = list(self.words)
+        self.counts = numpy.array([word_unigram_counter[word]
+                                   for word in words])
+        self.total_count = sum(word_unigram_counter.values())
+        self.phones, ids, self.offsets = encode_phones(words,
+                                                       words_to_phones)
+        self.ids = ids.astype(numpy.int32)
+
+        phone_ids = {phone: i for i, phone in enumerate(self.phones)}
+        self.phone_plogs = numpy.array([phone_dict[phone].plog
+                                        for phone in self.phones])
+        self.biphone_mi = numpy.zeros((len(self.phones), len(self.phones)))
+        for (phone1, phone2), biphone in biphone_dict.items():
+            if phone1 in phone_ids and phone2 in phone_ids:
+                self.biphone_mi[phone_ids[phone1], phone_ids[phone2]] = \
+                    biphone.MI
+
+        # the plog of a phone seen once more than all phones together
+        total_phone_count = sum(phone.count for phone in phone_dict.values())
+        self.unseen_phone_plog = plog(1 / (total_phone_count + 1))
+
+        self.unigram_plogs, self.bigram_plogs = _plogs_of_words(
+            self.ids, self.offsets, self.phone_plogs, self.biphone_mi)
+        n_phones = numpy.diff(self.offsets) - 1  # all but the first '#'
+        self.avg_unigram_plogs = self.unigram_plogs / n_phones
+        self.avg_bigram_plogs = self.bigram_plogs / n_phones
+
+    def __len__(self):
+        return len(self.words)
+
+    def frequency(self, index):
+        """
+        Return the frequency of the word *index*.
+        """
+        return self.counts[index].item() / self.total_count
+
+    def index(self, word):
+        """
+        Return the index of *word*, or -1 if it is not in the wordlist.
+        """
+        return self.words.index(word)
+
+    def score(self, words, unseen_phone_plog=None,
+              batch_size=SCORE_BATCH_SIZE):
+        """
+        Generate the (word, unigram plog, bigram plog) tuples of *words*,
+        which need not be in the wordlist, scored against the phone plogs
+        and biphone MI values of the wordlist.
+
+        A word is either a string, whose phones are its letters, or a
+        sequence of phones. The words are encoded and scored
+        *batch_size* at a time, so that *words* may be any iterable,
+        however long.
+
+        A biphone never seen in the wordlist has an MI of 0, as if its two
+        phones were independent. A phone never seen has the plog
+        *unseen_phone_plog*, by default that of a phone seen once more
+        than all phones together.
+        """
+        if unseen_phone_plog is None:
+            unseen_phone_plog = self.unseen_phone_plog
+
+        # the unseen phones share the last id, after all seen phones
+        phone_ids = {phone: i for i, phone in enumerate(self.phones)}
+        unseen_id = len(self.phones)
+        phone_plogs = numpy.append(self.phone_plogs, unseen_phone_plog)
+        biphone_mi = numpy.zeros((unseen_id + 1, unseen_id + 1))
+        biphone_mi[:unseen_id, :unseen_id] = self.biphone_mi
+        boundary_id = phone_ids.get('#', unseen_id)
+
+        words = iter(words)
+        while True:
+            batch = list(islice(words, batch_size))
+            if not batch:
+                break
+
+            phone_lists = [list(word) for word in batch]
+            flat_phones = list(chain.from_iterable(phone_lists))
+            inner_ids = numpy.fromiter(
+                (phone_ids.get(phone, unseen_id) for phone in flat_phones),
+                dtype=numpy.int64, count=len(flat_phones))
+            ids, offsets = _add_boundaries(
+                inner_ids, [len(phones) for phones in phone_lists],
+                boundary_id)
+
+            unigram_plogs, bigram_plogs = _plogs_of_words(
+                ids, offsets, phone_plogs, biphone_mi)
+            for score in zip(batch, unigram_plogs.tolist(),
+                             bigram_plogs.tolist()):
+                yield score
+
+
+class _OneWordPhonology:
+    """
+    The arrays of a ``WordPhonology`` for one word on its own, for
+    ``Word(spelling, phones, count, freq, phone_dict, biphone_dict)``.
+    """
 
-class Word:
     def __init__(self, spelling, phones, count, freq, phone_dict,
                  biphone_dict):
-        self.spelling = spelling
-        self.phones = phones
-        self.count = count
-        self.frequency = freq
+        self.words = [spelling]
+        self.phones = list(phones)
+        self.ids = numpy.arange(len(self.phones))
+        self.offsets = numpy.array([0, len(self.phones)])
+        self.counts = numpy.array([count])
+        self._frequency = freq
 
-        self.unigram_plog = sum(phone_dict[phone].plog
-                                for phone in self.phones[1:])
-        self.avg_unigram_plog = self.unigram_plog / (len(self.phones) - 1)
+        unigram_plog = sum(phone_dict[phone].plog for phone in phones[1:])
+        bigram_plog = unigram_plog - sum(
+            biphone_dict[biphone].MI for biphone in zip(phones, phones[1:])
+            if biphone in biphone_dict)
+        self.unigram_plogs = numpy.array([unigram_plog])
+        self.bigram_plogs = numpy.array([bigram_plog])
+        self.avg_unigram_plogs = self.unigram_plogs / (len(phones) - 1)
+        self.avg_bigram_plogs = self.bigram_plogs / (len(phones) - 1)
+
+    def frequency(self, index):
+        return self._frequency
 
-        _bigram_plog = self.unigram_plog
-        for biphone in zip(*[self.phones[i:] for i in range(2)]):
-            if biphone in biphone_dict:
-                # TODO "biphone in biphone_dict" could be false?
-                _bigram_plog -= biphone_dict[biphone].MI
-        self.bigram_plog = _bigram_plog
 
-        self.avg_bigram_plog = self.bigram_plog / (len(self.phones) - 1)
+class WordsItemsView(ItemsView):
+
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class WordsView(Mapping):
+    """
+    A read-only dict-like view of the words of *phonology* (a
+    ``WordPhonology``) to their ``Word`` objects, which are made only as
+    they are read.
+    """
+
+    def __init__(self, phonology):
+        self._phonology = phonology
 
+    @property
+    def phonology(self):
+        return self._phonology
 
-def make_word_ngrams(word_unigram_counter, words_to_phones=None):
-    uniphone_counter = Counter()
-    biphone_counter = Counter()
-    triphone_counter = Counter()
-
-    for word, freq in word_unigram_counter.items():
-        if not words_to_phones:
-            word = '#' + word + '#'  # add word boundaries
-            uniphones = list(word)
-        else:
-            uniphones = ['#'] + words_to_phones[word] + ['#']
+    def __getitem__(self, word):
+        index = self._phonology.index(word)
+        if index < 0:
+            raise KeyError(word)
+        return Word(self._phonology, index)
+
+    def __iter__(self):
+        return iter(self._phonology.words)
 
-        biphones = zip(*[uniphones[i:] for i in range(2)])
-        triphones = zip(*[uniphones[i:] for i in range(3)])
+    def __len__(self):
+        return len(self._phonology)
 
-        for uniphone in uniphones:
-            uniphone_counter[uniphone] += freq
+    def __contains__(self, word):
+        return self._phonology.index(word) >= 0
 
-        for biphone in biphones:
-            biphone_counter[biphone] += freq
+    def _items(self):
+        for index, word in enumerate(self._phonology.words):
+            yield word, Word(self._phonology, index)
+
+    def items(self):
+        return WordsItemsView(self)
 
-        for triphone in triphones:
-            triphone_counter[triphone] += freq
 
-    return (dict(uniphone_counter), dict(biphone_counter),
-            dict(triphone_counter))
+class PhoneNgramsItemsView(ItemsView):
+
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class PhoneNgramsValuesView(ValuesView):
+
+    def __iter__(self):
+        return self._mapping._values()
+
+
+class PhoneNgramsView(Mapping):
+    """
+    A read-only dict-like view of the phone ngrams of length *n* (tuples of
+    the strings of *phones*) to their counts. The ngrams are kept as the
+    sorted array of their *codes*, which have the phone ids of an ngram as
+    their digits in base ``len(phones)``, with the array of their *counts*.
+    """
+
+    def __init__(self, phones, n, codes, counts):
+        self._phones = phones
+        self._n = n
+        self._codes = codes
+        self._counts = counts
+        self._phone_ids = None
+
+    def _index(self, ngram):
+        """
+        Return the index of *ngram* in the arrays, or -1 if it is not there.
+        """
+        if not isinstance(ngram, tuple) or len(ngram) != self._n:
+            return -1
+        if self._phone_ids is None:
+            self._phone_ids = {phone: i for i, phone
+                               in enumerate(self._phones)}
+
+        code = 0
+        for phone in ngram:
+            phone_id = self._phone_ids.get(phone, -1)
+            if phone_id < 0:
+                return -1
+            code = code * len(self._phones) + phone_id
+
+        i = int(numpy.searchsorted(self._codes, code))
+        if i < len(self._codes) and self._codes[i] == code:
+            return i
+        return -1
+
+    def __getitem__(self, ngram):
+        i = self._index(ngram)
+        if i < 0:
+            raise KeyError(ngram)
+        return self._counts[i].item()
+
+    def __iter__(self):
+        n_phones = len(self._phones)
+        return zip(*[map(self._phones.__getitem__,
+                         (self._codes // n_phones ** k % n_phones).tolist())
+                     for k in range(self._n - 1, -1, -1)])
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, ngram):
+        return self._index(ngram) >= 0
+
+    def _items(self):
+        return zip(iter(self), self._counts.tolist())
+
+    def _values(self):
+        return iter(self._counts.tolist())
+
+    def items(self):
+        return PhoneNgramsItemsView(self)
+
+    def values(self):
+        return PhoneNgramsValuesView(self)
+
+    def __repr__(self):
+        return '{' + ', '.join('{!r}: {!r}'.format(key, value)
+                               for key, value in self.items()) + '}'
+
+
+def encode_phones(words, words_to_phones=None):
+    """
+    Encode the phones of *words*, with word boundaries ('#') around each
+    word, as one flat array of phone ids.
+
+    :param words: a list of words
+    :param words_to_phones: a dict of words to their lists of phones;
+        if not given, the phones of a word are its letters
+    :return: a tuple of the sorted list of the distinct phones (indexed by
+        their ids), the array of the phone ids of all words, and the array
+        of the offsets of the words in it (with the total length at the end)
+    """
+    if words_to_phones:
+        phone_lists = list(map(words_to_phones.__getitem__, words))
+        lengths = list(map(len, phone_lists))
+
+        # in one pass over the phones, each phone gets the next id when it
+        # is first seen; the ids are then mapped to the ranks of the phones
+        # in sorted order
+        first_ids = defaultdict(partial(next, count()))
+        boundary_id = first_ids['#']
+        inner_ids = numpy.fromiter(
+            map(first_ids.__getitem__, chain.from_iterable(phone_lists)),
+            dtype=numpy.int64, count=sum(lengths))
+        ids, offsets = _add_boundaries(inner_ids, lengths, boundary_id)
+
+        phones = sorted(first_ids)
+        ranks = numpy.zeros(len(phones), dtype=numpy.int64)
+        ranks[[first_ids[phone] for phone in phones]] = numpy.arange(
+            len(phones))
+        return phones, ranks[ids], offsets
+
+    sequence = ''.join('#' + word + '#' for word in words)
+    # code points of the letters (4 bytes each in UTF-32)
+    code_points = numpy.frombuffer(sequence.encode('utf-32-le'),
+                                   dtype='<u4').astype(numpy.int64)
+    phones, ids = _encode_integers(code_points)
+    phones = [six.unichr(phone) for phone in phones.tolist()]
+
+    offsets = numpy.zeros(len(words) + 1, dtype=numpy.int64)
+    numpy.cumsum([len(word) + 2 for word in words], out=offsets[1:])
+    return phones, ids, offsets
+
+
+def _add_boundaries(inner_ids, lengths, boundary_id):
+    """
+    Return the array of the phone ids *inner_ids* of words of *lengths*
+    (in phones) with *boundary_id* added around each word, and the array of
+    the offsets of the words in it (with the total length at the end).
+    """
+    offsets = numpy.zeros(len(lengths) + 1, dtype=numpy.int64)
+    numpy.cumsum([length + 2 for length in lengths], out=offsets[1:])
+
+    ids = numpy.full(offsets[-1], boundary_id, dtype=numpy.int64)
+    inner = numpy.ones(offsets[-1], dtype=bool)
+    inner[offsets[:-1]] = False
+    inner[offsets[1:] - 1] = False
+    ids[inner] = inner_ids
+    return ids, offsets
+
+
+def _plogs_of_words(ids, offsets, phone_plogs, biphone_mi):
+    """
+    Return the arrays of the unigram and bigram plogs of the words whose
+    phone ids (boundaries included) are ``ids[offsets[i]: offsets[i + 1]]``,
+    gathered from the vector *phone_plogs* and the matrix *biphone_mi* and
+    summed over the segments of the words.
+    """
+    starts = offsets[:-1]
+    if not len(starts):
+        return numpy.zeros(0), numpy.zeros(0)
+
+    # the plog of each phone but the first of each word
+    plogs = phone_plogs[ids]
+    plogs[starts] = 0
+    unigram_plogs = numpy.add.reduceat(plogs, starts)
+
+    # the MI of each biphone, at the position of its first phone
+    mi = numpy.zeros(len(ids))
+    mi[:-1] = biphone_mi[ids[:-1], ids[1:]]
+    mi[offsets[1:] - 1] = 0
+    return unigram_plogs, unigram_plogs - numpy.add.reduceat(mi, starts)
+
+
+def _encode_integers(values):
+    """
+    Return the sorted array of the distinct non-negative integers *values*
+    and the array of the ids (indices in it) of *values*.
+    """
+    if len(values) and values.max() < max(4 * len(values), DENSE_CODES):
+        present = numpy.bincount(values) > 0
+        distinct_values = numpy.flatnonzero(present)
+        value_ids = numpy.cumsum(present) - 1
+        return distinct_values, value_ids[values]
+
+    distinct_values, ids = numpy.unique(values, return_inverse=True)
+    return distinct_values, ids.ravel()
+
+
+def _count_codes(codes, weights, n_codes):
+    """
+    Return the arrays of the distinct *codes* below *n_codes* and of the
+    sums of their *weights*. The codes equal to *n_codes* are not counted.
+    """
+    if n_codes <= max(4 * len(codes), DENSE_CODES):
+        # all possible codes at once, without sorting
+        present = numpy.bincount(codes, minlength=n_codes + 1)[:-1] > 0
+        sums = numpy.bincount(codes, weights=weights, minlength=n_codes + 1)
+        distinct_codes = numpy.flatnonzero(present)
+        return distinct_codes, sums[distinct_codes]
+
+    distinct_codes, inverse = numpy.unique(codes, return_inverse=True)
+    sums = numpy.bincount(inverse.ravel(), weights=weights)
+    if len(distinct_codes) and distinct_codes[-1] == n_codes:
+        return distinct_codes[:-1], sums[:-1]
+    return distinct_codes, sums
+
+
+def make_word_ngrams(word_unigram_counter, words_to_phones=None):
+    """
+    Count the phone unigrams, bigrams, and trigrams of the words of
+    *word_unigram_counter*, weighted by the word counts.
+
+    The phones of all words are encoded as one array of ids
+    (``encode_phones()``), and the ngrams as integer codes of their phone
+    ids, which are counted with ``numpy.bincount``.
+
+    :return: a tuple of the dict of phones to counts and the read-only
+        dict-like views (``PhoneNgramsView``) of phone bigrams and trigrams
+        to counts
+    """
+    words = list(word_unigram_counter)
+    if not words:
+        return dict(), dict(), dict()
+
+    counts = numpy.array(list(word_unigram_counter.values()))
+    phones, ids, offsets = encode_phones(words, words_to_phones)
+    n_phones = len(phones)
+    weights = numpy.repeat(counts.astype(numpy.float64),
+                           numpy.diff(offsets))
+
+    bigram_codes = ids[:-1] * n_phones + ids[1:]
+    trigram_codes = bigram_codes[:-1] * n_phones + ids[2:]
+
+    # the ngrams which span the end of a word and the start of the next are
+    # given the code one past the last, which is not counted
+    ends = offsets[1:-1]
+    bigram_codes[ends - 1] = n_phones ** 2
+    trigram_codes[ends - 2] = n_phones ** 3
+    trigram_codes[ends - 1] = n_phones ** 3
+
+    unigram_counts = numpy.bincount(ids, weights=weights, minlength=n_phones)
+    bigram_codes, bigram_counts = _count_codes(
+        bigram_codes, weights[:-1], n_phones ** 2)
+    trigram_codes, trigram_counts = _count_codes(
+        trigram_codes, weights[:-2], n_phones ** 3)
+
+    if numpy.issubdtype(counts.dtype, numpy.integer):
+        unigram_counts, bigram_counts, trigram_counts = [
+            numpy.rint(counts_).astype(numpy.int64) for counts_ in
+            (unigram_counts, bigram_counts, trigram_counts)]
+
+    # the bigrams and trigrams are read from their arrays as they are asked
+    # for, instead of being made into dicts of tuples here
+    uniphone_counter = dict(zip(phones, unigram_counts.tolist()))
+    biphone_counter = PhoneNgramsView(phones, 2, bigram_codes, bigram_counts)
+    triphone_counter = PhoneNgramsView(phones, 3, trigram_codes,
+                                       trigram_counts)
+
+    return uniphone_counter, biphone_counter, triphone_counter
 
 
 def make_phone_dict(phone_unigram_counter=None):
@@ -111,20 +586,10 @@ def make_biphone_dict(phone_bigram_counter, phone_dict):
 
 def make_word_dict(word_unigram_counter, phone_dict, biphone_dict,
                    words_to_phones=None):
-    word_dict = dict()
-    total_count = sum(word_unigram_counter.values())
-
-    for word, count_ in word_unigram_counter.items():
-        freq = count_ / total_count
-
-        if not words_to_phones:
-            phones = list(word)
-        else:
-            phones = words_to_phones[word]
-
-        phones = ['#'] + phones + ['#']
-
-        word_dict[word] = Word(word, phones, count_, freq,
-                               phone_dict, biphone_dict)
-
-    return word_dict
+    """
+    Return a dict-like view of the words of *word_unigram_counter* to their
+    ``Word`` objects, all of whose plogs are computed at once in a
+    ``WordPhonology``.
+    """
+    return WordsView(WordPhonology(word_unigram_counter, phone_dict,
+                                   biphone_dict, words_to_phones))
@@ -1,9 +1,13 @@
 # -*- encoding: utf8 -*-
 
-from itertools import (combinations, groupby)
+import heapq
+import multiprocessing
+from itertools import (chain, groupby)
 
 from linguistica.util import NULL
 
+CHUNKS_PER_JOB = 4  # more chunks than workers for load balancing
+
 
 def max_common_prefix(a, b):
     if len(a) < len(b):
@@ -94,44 +98,94 @@ def make_signatures_to_words(words_to_signatures):
 
 
 def make_signatures_to_stems(stems_to_words, max_affix_length, min_sig_count,
-                             suffixing):
-    signatures_to_stems = dict()
-
-    for stem in stems_to_words.keys():
-        affix_set = set()
-        len_stem = len(stem)
+                             suffixing, n_jobs=1):
+    """
+    Make the dict of signatures to stems.
 
-        for word in stems_to_words[stem]:
-            if word == stem:
-                affix_set.add(NULL)
-            else:
-                len_affix = len(word) - len_stem
-                if max_affix_length and len_affix > max_affix_length:
-                    continue
-                if suffixing:
-                    affix = word[len_stem:]
+    :param n_jobs: number of worker processes, among which the stems are
+        split; a value below 1 means as many as there are CPUs.
+        The results are the same for any number.
+    """
+    if n_jobs == 1:
+        signatures_to_stems = _signatures_to_stems_of_chunk(
+            (list(stems_to_words.items()), max_affix_length, suffixing))
+    else:
+        stems = sorted(stems_to_words)
+        n_chunks = _number_of_jobs(n_jobs) * CHUNKS_PER_JOB
+        tasks = [([(stem, stems_to_words[stem])
+                   for stem in stems[i::n_chunks]],
+                  max_affix_length, suffixing) for i in range(n_chunks)]
+        signatures_to_stems = dict()
+
+        for chunk_sigs_to_stems in _map(_signatures_to_stems_of_chunk,
+                                        tasks, n_jobs):
+            for sig, stems_ in chunk_sigs_to_stems.items():
+                if sig not in signatures_to_stems:
+                    signatures_to_stems[sig] = stems_
                 else:
-                    affix = word[: len_affix]
-                affix_set.add(affix)
+                    signatures_to_stems[sig].update(stems_)
+
+    for sig in dict(signatures_to_stems):
+        if len(signatures_to_stems[sig]) < min_sig_count:
+            del signatures_to_stems[sig]
+
+    return signatures_to_stems
+
+
+def _signatures_to_stems_of_chunk(args):
+    stems_and_words, max_affix_length, suffixing = args
+    signatures_to_stems = dict()
 
-        affix_tuple = tuple(sorted(affix_set))
+    for stem, words in stems_and_words:
+        affix_tuple = _signature_of_stem(stem, words, max_affix_length,
+                                         suffixing)
 
         if affix_tuple not in signatures_to_stems:
             signatures_to_stems[affix_tuple] = set()
 
         signatures_to_stems[affix_tuple].add(stem)
 
-    for sig in dict(signatures_to_stems):
-        if len(signatures_to_stems[sig]) < min_sig_count:
-            del signatures_to_stems[sig]
-
     return signatures_to_stems
 
 
+def _signature_of_stem(stem, words, max_affix_length, suffixing):
+    affix_set = set()
+    len_stem = len(stem)
+
+    for word in words:
+        if word == stem:
+            affix_set.add(NULL)
+        else:
+            len_affix = len(word) - len_stem
+            if max_affix_length and len_affix > max_affix_length:
+                continue
+            if suffixing:
+                affix = word[len_stem:]
+            else:
+                affix = word[: len_affix]
+            affix_set.add(affix)
+
+    return tuple(sorted(affix_set))
+
+
 def make_stems_to_words(wordlist, min_stem_length, max_affix_length, suffixing,
-                        min_sig_count):
-    bisigs_to_tuples = make_bisignatures(wordlist, min_stem_length,
-                                         max_affix_length, suffixing)
+                        min_sig_count, n_jobs=1, count_first=False):
+    """
+    Make the dict of stems to words, from the bisignatures with at least
+    *min_sig_count* (stem, word1, word2) tuples.
+
+    :param count_first: if true, the bisignatures are counted in a first
+        pass, and their tuples are made in a second pass for only those
+        bisignatures which may reach *min_sig_count* (see
+        ``make_bisignatures``). The results are the same.
+    """
+    bisigs_to_tuples = make_bisignatures(
+        wordlist, min_stem_length, max_affix_length, suffixing, n_jobs=n_jobs,
+        min_count=min_sig_count if count_first else 0)
+    return _stems_to_words_of_bisignatures(bisigs_to_tuples, min_sig_count)
+
+
+def _stems_to_words_of_bisignatures(bisigs_to_tuples, min_sig_count):
     stems_to_words = dict()
 
     for bisig in bisigs_to_tuples.keys():  # bisig is a tuple
@@ -148,67 +202,295 @@ def make_stems_to_words(wordlist, min_stem_length, max_affix_length, suffixing,
     return stems_to_words
 
 
-# noinspection PyPep8
-def make_bisignatures(wordlist, min_stem_length, max_affix_length, suffixing):
+def make_bisignatures(wordlist, min_stem_length, max_affix_length, suffixing,
+                      n_jobs=1, min_count=0):
     """
     This function finds pairs of words which make a valid signature,
     and makes Dictionary whose key is the signature and
     whose value is a tuple: stem, word1, word2.
+
+    Rather than comparing all pairs of words which share their first
+    *min_stem_length* letters (last ones if not suffixing), each word is
+    filed under each of its prefixes (suffixes) which leave an affix of at
+    most *max_affix_length* letters. The pairs with a given stem are then
+    exactly the pairs of words filed under it which branch off right after
+    it, so only the pairs that make a valid signature are ever visited.
+
+    :param n_jobs: number of worker processes, among which the groups of
+        words with the same first *min_stem_length* letters are split;
+        a value below 1 means as many as there are CPUs.
+        The results are the same for any number.
+    :param min_count: if above 1, the word pairs of each bisignature are
+        first only counted, and the tuples are then made for only those
+        bisignatures with at least *min_count* pairs. The counts are upper
+        bounds of the numbers of distinct tuples (the same, unless there are
+        repeated words in *wordlist*), so a few of the bisignatures returned
+        may still have fewer than *min_count* tuples.
     """
+    n_jobs = _number_of_jobs(n_jobs)
+
+    if suffixing:
+        words = sorted(word for word in wordlist
+                       if len(word) >= min_stem_length)
+    else:
+        # work on reversed words, so that stems are always prefixes
+        words = sorted(word[::-1] for word in wordlist
+                       if len(word) >= min_stem_length)
+
+    groups = [group for group in
+              (list(group) for _, group in
+               groupby(words, key=lambda x: x[: min_stem_length]))
+              if len(group) > 1]
+
+    kept_affix_pairs = None
+    if min_count > 1:
+        groups, kept_affix_pairs = _groups_of_counted_bisignatures(
+            groups, min_stem_length, max_affix_length, suffixing, n_jobs,
+            min_count)
+
+    # the bisignatures are made here rather than in the worker processes,
+    # as the order of the affixes in tuple(set) may differ across processes
     bisigs_to_tuples = dict()
 
-    if not suffixing:
-        wordlist = sorted(wordlist, key=lambda x: x[::-1])
-        group_key = lambda x: x[-min_stem_length:]  # noqa
+    for _, affix_pairs_to_tuples in _map_groups(
+            groups, min_stem_length, max_affix_length, suffixing, n_jobs,
+            kept_affix_pairs=kept_affix_pairs):
+        for (affix1, affix2), tuples in affix_pairs_to_tuples.items():
+            bisig = tuple({affix1, affix2})
+
+            if bisig not in bisigs_to_tuples:
+                bisigs_to_tuples[bisig] = tuples
+            else:
+                bisigs_to_tuples[bisig].update(tuples)
+
+    return bisigs_to_tuples
+
+
+def _groups_of_counted_bisignatures(groups, min_stem_length, max_affix_length,
+                                    suffixing, n_jobs, min_count):
+    """
+    Count the word pairs of the bisignatures of *groups*, without making
+    any (stem, word1, word2) tuples.
+
+    :return: a tuple of the list of those of *groups* with any word pairs of
+        the bisignatures with at least *min_count* pairs, and the set of the
+        affix pairs of these bisignatures
+    """
+    groups_and_counts = _map_groups(groups, min_stem_length, max_affix_length,
+                                    suffixing, n_jobs, count=True)
+
+    bisig_counts = dict()
+    for _, affix_pairs_to_counts in groups_and_counts:
+        for (affix1, affix2), count in affix_pairs_to_counts.items():
+            bisig = tuple({affix1, affix2})
+            bisig_counts[bisig] = bisig_counts.get(bisig, 0) + count
+
+    kept_affix_pairs = set()
+    kept_groups = list()
+    for group, affix_pairs_to_counts in groups_and_counts:
+        group_affix_pairs = [(affix1, affix2)
+                             for affix1, affix2 in affix_pairs_to_counts
+                             if bisig_counts[tuple({affix1, affix2})] >=
+                             min_count]
+        if group_affix_pairs:
+            kept_affix_pairs.update(group_affix_pairs)
+            kept_groups.append(group)
+
+    return kept_groups, kept_affix_pairs
+
+
+def _number_of_jobs(n_jobs):
+    if n_jobs < 1:
+        return multiprocessing.cpu_count()
+    return n_jobs
+
+
+def _map(function, tasks, n_jobs):
+    """
+    Return the list of the results of *function* for *tasks*, in order,
+    with a pool of *n_jobs* worker processes.
+    """
+    pool = multiprocessing.Pool(n_jobs)
+    try:
+        return pool.map(function, tasks)
+    finally:
+        pool.terminate()
+
+
+def _balanced_chunks(groups, n_chunks):
+    """
+    Split *groups* of words into at most *n_chunks* lists, each with about
+    the same estimated number of word pairs to compare.
+    """
+    chunks = [list() for _ in range(n_chunks)]
+    chunk_loads = [(0, i) for i in range(n_chunks)]
+
+    # the largest groups first, each to the least loaded chunk so far
+    for group in sorted(groups, key=len, reverse=True):
+        load, i = heapq.heappop(chunk_loads)
+        chunks[i].append(group)
+        n_words = len(group)
+        heapq.heappush(chunk_loads,
+                       (load + n_words * (n_words - 1) // 2 + n_words, i))
+
+    return [chunk for chunk in chunks if chunk]
+
+
+def _map_groups(groups, min_stem_length, max_affix_length, suffixing, n_jobs,
+                kept_affix_pairs=None, count=False):
+    """
+    Return the list of the pairs of each of *groups* and its dict of affix
+    pairs to (stem, word1, word2) tuples, with *n_jobs* worker processes.
+
+    :param kept_affix_pairs: if given, the set of the only affix pairs
+        whose tuples are made
+    :param count: if true, the dicts are of affix pairs to the numbers of
+        word pairs instead, and no tuples are made
+    """
+    if n_jobs == 1:
+        chunks = [groups]
+        results = [_bisignatures_of_groups(
+            (groups, min_stem_length, max_affix_length, suffixing,
+             kept_affix_pairs, count))]
     else:
-        wordlist = sorted(wordlist)
-        group_key = lambda x: x[: min_stem_length]  # noqa
+        chunks = _balanced_chunks(groups, n_jobs * CHUNKS_PER_JOB)
+        tasks = [(chunk, min_stem_length, max_affix_length, suffixing,
+                  kept_affix_pairs, count) for chunk in chunks]
+        results = _map(_bisignatures_of_groups, tasks, n_jobs)
 
-    wordlist = filter(lambda x: len(x) >= min_stem_length, wordlist)
+    return list(zip(chain.from_iterable(chunks),
+                    chain.from_iterable(results)))
 
-    for _, group in groupby(wordlist, key=group_key):  # groupby from itertools
-        wordlist_for_analysis = list(group)  # must use list() here!
-        # see python 3.4 documentation:
-        # https://docs.python.org/3/library/itertools.html#itertools.groupby
-        # "The returned group is itself an iterator that shares the underlying
-        # iterable with groupby(). Because the source is shared, when the
-        # groupby() object is advanced, the previous group is no longer
-        # visible. So, if that data is needed later, it should be stored as a
-        # list"
 
-        for (word1, word2) in combinations(wordlist_for_analysis, 2):
+def _bisignatures_of_groups(args):
+    """
+    Return the list of the dicts of affix pairs to (stem, word1, word2)
+    tuples (or to their numbers) of the groups of (sorted) words in *args*.
+    """
+    groups, min_stem_length, max_affix_length, suffixing, \
+        kept_affix_pairs, count = args
+    return [_bisignatures_of_group(group, min_stem_length, max_affix_length,
+                                   suffixing, kept_affix_pairs, count)
+            for group in groups]
+
+
+def _bisignatures_of_group(group, min_stem_length, max_affix_length,
+                           suffixing, kept_affix_pairs=None, count=False):
+    affix_pairs_to_tuples = dict()
+
+    # the longest common prefixes of the neighbors in sorted order;
+    # a prefix is shared with other words only if it is shared with a
+    # neighbor
+    lcp_lengths = [0] * (len(group) + 1)
+    for i in range(1, len(group)):
+        word1 = group[i - 1]
+        word2 = group[i]
+        len_lcp = min_stem_length
+        max_len_lcp = min(len(word1), len(word2))
+        while len_lcp < max_len_lcp and word1[len_lcp] == word2[len_lcp]:
+            len_lcp += 1
+        lcp_lengths[i] = len_lcp
 
-            if suffixing:
-                stem = max_common_prefix(word1, word2)
-                len_stem = len(stem)
-                affix1 = word1[len_stem:]
-                affix2 = word2[len_stem:]
-            else:
-                stem = max_common_suffix(word1, word2)
-                len_stem = len(stem)
-                affix1 = word1[: -len_stem]
-                affix2 = word2[: -len_stem]
+    stems_to_words = dict()
 
-            len_affix1 = len(affix1)
-            len_affix2 = len(affix2)
+    for i, word in enumerate(group):
+        for len_stem in range(max(len(word) - max_affix_length,
+                                  min_stem_length),
+                              max(lcp_lengths[i], lcp_lengths[i + 1]) + 1):
+            stem = word[: len_stem]
+            if stem not in stems_to_words:
+                stems_to_words[stem] = list()
+            stems_to_words[stem].append(word)
 
-            if len_affix1 > max_affix_length or \
-               len_affix2 > max_affix_length:
-                continue
+    for stem, stem_words in stems_to_words.items():
+        if len(stem_words) < 2:
+            continue
+        if count:
+            _add_bisignature_counts(affix_pairs_to_tuples, stem, stem_words,
+                                    suffixing)
+        else:
+            _add_bisignatures(affix_pairs_to_tuples, stem, stem_words,
+                              suffixing, kept_affix_pairs)
 
-            if len_affix1 == 0:
-                affix1 = NULL
-            if len_affix2 == 0:
-                affix2 = NULL
+    return affix_pairs_to_tuples
 
-            bisig = tuple({affix1, affix2})
 
-            if bisig not in bisigs_to_tuples:
-                bisigs_to_tuples[bisig] = set()
-            chunk = (stem, word1, word2)
-            bisigs_to_tuples[bisig].add(chunk)
+def _pair_starts_and_affixes(stem, words, suffixing):
+    """
+    Return a tuple of the list of the index of the first word which each of
+    *words* (sorted, and all beginning with *stem*) pairs with, and the list
+    of the affixes of *words*.
+    If not suffixing, the stem and words are reversed.
+    """
+    len_stem = len(stem)
+    n_words = len(words)
+
+    # words with the same letter after the stem are contiguous; the pairs
+    # of a word are with the words after its own run (or with any words
+    # after it if it is the stem itself, for repeated words in the wordlist)
+    starts = [n_words] * n_words
+    for i in range(n_words - 1, -1, -1):
+        if len(words[i]) == len_stem:
+            starts[i] = i + 1
+        elif i + 1 < n_words and words[i][len_stem] == \
+                words[i + 1][len_stem]:
+            starts[i] = starts[i + 1]
+        else:
+            starts[i] = i + 1
+
+    if suffixing:
+        affixes = [word[len_stem:] or NULL for word in words]
+    else:
+        affixes = [word[len_stem:][::-1] or NULL for word in words]
+
+    return starts, affixes
 
-    return bisigs_to_tuples
+
+def _add_bisignatures(affix_pairs_to_tuples, stem, words, suffixing,
+                      kept_affix_pairs=None):
+    """
+    Add to *affix_pairs_to_tuples* the pairs of *words* (sorted, and all
+    beginning with *stem*) whose longest common prefix is *stem*, for only
+    the affix pairs in *kept_affix_pairs* if it is given.
+    If not suffixing, the stem and words are reversed.
+    """
+    starts, affixes = _pair_starts_and_affixes(stem, words, suffixing)
+    n_words = len(words)
+
+    if not suffixing:
+        stem = stem[::-1]
+        words = [word[::-1] for word in words]
+
+    for i in range(n_words):
+        word1 = words[i]
+        affix1 = affixes[i]
+
+        for j in range(starts[i], n_words):
+            affix_pair = (affix1, affixes[j])
+
+            if affix_pair not in affix_pairs_to_tuples:
+                if kept_affix_pairs is not None and \
+                        affix_pair not in kept_affix_pairs:
+                    continue
+                affix_pairs_to_tuples[affix_pair] = set()
+            affix_pairs_to_tuples[affix_pair].add((stem, word1, words[j]))
+
+
+def _add_bisignature_counts(affix_pairs_to_counts, stem, words, suffixing):
+    """
+    Add to *affix_pairs_to_counts* the numbers of the pairs of *words* (as
+    in ``_add_bisignatures``) of each affix pair.
+    """
+    starts, affixes = _pair_starts_and_affixes(stem, words, suffixing)
+    n_words = len(words)
+
+    for i in range(n_words):
+        affix1 = affixes[i]
+
+        for j in range(starts[i], n_words):
+            affix_pair = (affix1, affixes[j])
+            affix_pairs_to_counts[affix_pair] = \
+                affix_pairs_to_counts.get(affix_pair, 0) + 1
 
 
 def make_affixes_to_signatures(signatures):
@@ -221,3 +503,388 @@ def make_affixes_to_signatures(signatures):
             affixes_to_sigs[affix].add(sig)
 
     return affixes_to_sigs
+
+
+class IncrementalSignatures:
+    """
+    Morphological signature objects of a wordlist which are kept up to date
+    as words are added to or removed from the wordlist.
+
+    Words only make bisignatures with words in the same group, of words with
+    the same first *min_stem_length* letters (last ones if not suffixing).
+    ``update()`` recomputes the bisignatures of only those groups which have
+    gained or lost words, and then patches the signature objects in place
+    for the stems, signatures, and words affected. The objects are always the
+    same as those made by the ``make_*`` functions for the whole wordlist.
+    """
+
+    def __init__(self, min_stem_length, max_affix_length, suffixing,
+                 min_sig_count, n_jobs=1):
+        self.parameters = (min_stem_length, max_affix_length, suffixing,
+                           min_sig_count)
+        self.n_jobs = n_jobs
+        self.words = set()
+
+        self.bisigs_to_tuples = dict()
+        self.stems_to_words = dict()
+        self.signatures_to_stems = dict()
+        self.stems_to_signatures = dict()
+        self.words_to_signatures = dict()
+        self.signatures_to_words = dict()
+        self.words_to_sigtransforms = dict()
+        self.signatures = set()
+        self.affixes_to_signatures = dict()
+        self.words_in_signatures = set()
+        self.affixes = set()
+        self.stems = set()
+
+        # group keys to the words (reversed if not suffixing) of each group,
+        # and to the bisignatures of each group, keyed by affix pairs
+        self._groups_to_words = dict()
+        self._groups_to_affix_pairs = dict()
+
+        # stems to their signatures, and signatures to their stems,
+        # including those signatures with fewer than min_sig_count stems
+        self._stems_to_signature = dict()
+        self._signatures_to_all_stems = dict()
+
+        self._words_to_stems = dict()
+
+    def _group_key(self, word_or_stem):
+        min_stem_length, _, suffixing, _ = self.parameters
+        if not suffixing:
+            word_or_stem = word_or_stem[::-1]
+        return word_or_stem[: min_stem_length]
+
+    def update(self, wordlist):
+        """
+        Update the signature objects for the words in *wordlist*.
+
+        :return: the set of words whose signatures have changed
+        """
+        min_stem_length, max_affix_length, suffixing, min_sig_count = \
+            self.parameters
+
+        new_words = set(wordlist)
+        changed_groups = set()
+
+        for word in new_words - self.words:
+            if len(word) < min_stem_length:
+                continue
+            key = self._group_key(word)
+            if key not in self._groups_to_words:
+                self._groups_to_words[key] = set()
+            self._groups_to_words[key].add(word if suffixing else word[::-1])
+            changed_groups.add(key)
+
+        for word in self.words - new_words:
+            if len(word) < min_stem_length:
+                continue
+            key = self._group_key(word)
+            self._groups_to_words[key].discard(
+                word if suffixing else word[::-1])
+            if not self._groups_to_words[key]:
+                del self._groups_to_words[key]
+            changed_groups.add(key)
+
+        first_update = not self.words
+        self.words = new_words
+
+        affected_stems = self._update_bisignatures(changed_groups)
+        if first_update:
+            self._make_all_objects()
+            return set(self.words_to_signatures)
+
+        changed_stems, affected_words = self._update_stems(changed_groups,
+                                                           affected_stems)
+        affected_words.update(self._update_signatures(changed_stems))
+        return self._update_words(affected_words)
+
+    def _make_all_objects(self):
+        """
+        Make the objects from the bisignatures, as the ``make_*`` functions
+        do, together with the indices for later updates.
+        """
+        _, max_affix_length, suffixing, min_sig_count = self.parameters
+
+        self.stems_to_words = _stems_to_words_of_bisignatures(
+            self.bisigs_to_tuples, min_sig_count)
+        self._words_to_stems = dict()
+        for stem, words in self.stems_to_words.items():
+            for word in words:
+                if word not in self._words_to_stems:
+                    self._words_to_stems[word] = set()
+                self._words_to_stems[word].add(stem)
+
+        self._signatures_to_all_stems = _signatures_to_stems_of_chunk(
+            (list(self.stems_to_words.items()), max_affix_length, suffixing))
+        self._stems_to_signature = dict()
+        for sig, stems in self._signatures_to_all_stems.items():
+            for stem in stems:
+                self._stems_to_signature[stem] = sig
+
+        self.signatures_to_stems = {
+            sig: set(stems)
+            for sig, stems in self._signatures_to_all_stems.items()
+            if len(stems) >= min_sig_count}
+        self.stems_to_signatures = make_stems_to_signatures(
+            self.signatures_to_stems)
+        self.words_to_signatures = make_words_to_signatures(
+            self.stems_to_words, self.stems_to_signatures)
+        self.signatures_to_words = make_signatures_to_words(
+            self.words_to_signatures)
+        self.words_to_sigtransforms = make_words_to_sigtransforms(
+            self.words_to_signatures, suffixing)
+        self.signatures = set(self.signatures_to_stems.keys())
+        self.affixes_to_signatures = make_affixes_to_signatures(
+            self.signatures)
+        self.words_in_signatures = set(self.words_to_signatures.keys())
+        self.affixes = set(self.affixes_to_signatures.keys())
+        self.stems = set(self.stems_to_words.keys())
+
+    def _update_bisignatures(self, changed_groups):
+        """
+        Recompute the bisignatures of *changed_groups*.
+
+        :return: the set of stems, other than those of the new bisignatures
+            of *changed_groups*, whose words may have changed
+        """
+        min_stem_length, max_affix_length, suffixing, min_sig_count = \
+            self.parameters
+
+        groups = [sorted(self._groups_to_words[key])
+                  for key in sorted(changed_groups)
+                  if len(self._groups_to_words.get(key, ())) > 1]
+
+        groups_and_results = _map_groups(
+            groups, min_stem_length, max_affix_length, suffixing,
+            _number_of_jobs(self.n_jobs))
+
+        affected_stems = set()
+        old_bisig_counts = dict()
+
+        for key in changed_groups:
+            affix_pairs_to_tuples = self._groups_to_affix_pairs.pop(key, None)
+            if affix_pairs_to_tuples:
+                self._add_affix_pairs(affix_pairs_to_tuples, False,
+                                      old_bisig_counts)
+                for tuples in affix_pairs_to_tuples.values():
+                    affected_stems.update(stem for stem, _, _ in tuples)
+
+        for group, affix_pairs_to_tuples in groups_and_results:
+            if affix_pairs_to_tuples:
+                self._groups_to_affix_pairs[group[0][: min_stem_length]] = \
+                    affix_pairs_to_tuples
+                self._add_affix_pairs(affix_pairs_to_tuples, True,
+                                      old_bisig_counts)
+
+        # a bisignature reaching or falling below min_sig_count changes the
+        # stems of all its tuples
+        for bisig, old_count in old_bisig_counts.items():
+            tuples = self.bisigs_to_tuples.get(bisig, ())
+            if (old_count >= min_sig_count) != (len(tuples) >= min_sig_count):
+                affected_stems.update(stem for stem, _, _ in tuples)
+
+        return affected_stems
+
+    def _add_affix_pairs(self, affix_pairs_to_tuples, add, old_bisig_counts):
+        """
+        Add (or remove if not *add*) the tuples of *affix_pairs_to_tuples*
+        to (from) the bisignatures.
+        """
+        bisigs_to_tuples = self.bisigs_to_tuples
+
+        for (affix1, affix2), tuples in affix_pairs_to_tuples.items():
+            bisig = tuple({affix1, affix2})
+            bisig_tuples = bisigs_to_tuples.get(bisig)
+
+            if bisig not in old_bisig_counts:
+                old_bisig_counts[bisig] = len(bisig_tuples or ())
+
+            if not add:
+                bisig_tuples.difference_update(tuples)
+                if not bisig_tuples:
+                    del bisigs_to_tuples[bisig]
+            elif bisig_tuples is None:
+                bisigs_to_tuples[bisig] = set(tuples)
+            else:
+                bisig_tuples.update(tuples)
+
+    def _update_stems(self, changed_groups, affected_stems):
+        """
+        Recompute the words of all stems of *changed_groups*, and of
+        *affected_stems*.
+
+        :return: a tuple of the set of stems whose words have changed and the
+            set of their words, before and after
+        """
+        min_sig_count = self.parameters[3]
+
+        groups_to_stems = dict()
+        for stem in affected_stems:
+            key = self._group_key(stem)
+            if key in changed_groups:
+                continue
+            if key not in groups_to_stems:
+                groups_to_stems[key] = set()
+            groups_to_stems[key].add(stem)
+        for key in changed_groups:
+            groups_to_stems[key] = None  # all stems
+
+        new_stems_to_words = dict()
+        for key, stems in groups_to_stems.items():
+            affix_pairs_to_tuples = self._groups_to_affix_pairs.get(key, {})
+            for (affix1, affix2), tuples in affix_pairs_to_tuples.items():
+                if len(self.bisigs_to_tuples[tuple({affix1, affix2})]) < \
+                        min_sig_count:
+                    continue
+                for stem, word1, word2 in tuples:
+                    if stems is not None and stem not in stems:
+                        continue
+                    if stem not in new_stems_to_words:
+                        new_stems_to_words[stem] = {word1, word2}
+                    else:
+                        new_stems_to_words[stem].add(word1)
+                        new_stems_to_words[stem].add(word2)
+
+        affected_stems = affected_stems | set(new_stems_to_words)
+        changed_stems = set()
+        affected_words = set()
+
+        for stem in affected_stems:
+            old_words = self.stems_to_words.get(stem, set())
+            new_words = new_stems_to_words.get(stem, set())
+            if old_words == new_words:
+                continue
+            changed_stems.add(stem)
+            affected_words.update(old_words)
+            affected_words.update(new_words)
+
+            for word in old_words - new_words:
+                self._words_to_stems[word].discard(stem)
+                if not self._words_to_stems[word]:
+                    del self._words_to_stems[word]
+            for word in new_words - old_words:
+                if word not in self._words_to_stems:
+                    self._words_to_stems[word] = set()
+                self._words_to_stems[word].add(stem)
+
+            if new_words:
+                self.stems_to_words[stem] = new_words
+                self.stems.add(stem)
+            else:
+                del self.stems_to_words[stem]
+                self.stems.discard(stem)
+
+        return changed_stems, affected_words
+
+    def _update_signatures(self, changed_stems):
+        """
+        Recompute the signatures of *changed_stems*.
+
+        :return: the set of words of the stems whose signatures have changed
+        """
+        _, max_affix_length, suffixing, min_sig_count = self.parameters
+        changed_sigs = set()
+
+        for stem in changed_stems:
+            old_sig = self._stems_to_signature.pop(stem, None)
+            if old_sig is not None:
+                self._signatures_to_all_stems[old_sig].discard(stem)
+                if not self._signatures_to_all_stems[old_sig]:
+                    del self._signatures_to_all_stems[old_sig]
+                changed_sigs.add(old_sig)
+
+            if stem in self.stems_to_words:
+                sig = _signature_of_stem(stem, self.stems_to_words[stem],
+                                         max_affix_length, suffixing)
+                self._stems_to_signature[stem] = sig
+                if sig not in self._signatures_to_all_stems:
+                    self._signatures_to_all_stems[sig] = set()
+                self._signatures_to_all_stems[sig].add(stem)
+                changed_sigs.add(sig)
+
+        # stems which may have gained or lost their signature
+        affected_stems = set(changed_stems)
+
+        for sig in changed_sigs:
+            affected_stems.update(self.signatures_to_stems.pop(sig, ()))
+            stems = self._signatures_to_all_stems.get(sig, ())
+
+            if stems and len(stems) >= min_sig_count:
+                self.signatures_to_stems[sig] = set(stems)
+                affected_stems.update(stems)
+                if sig not in self.signatures:
+                    self.signatures.add(sig)
+                    for affix in sig:
+                        if affix not in self.affixes_to_signatures:
+                            self.affixes_to_signatures[affix] = set()
+                            self.affixes.add(affix)
+                        self.affixes_to_signatures[affix].add(sig)
+            elif sig in self.signatures:
+                self.signatures.discard(sig)
+                for affix in sig:
+                    self.affixes_to_signatures[affix].discard(sig)
+                    if not self.affixes_to_signatures[affix]:
+                        del self.affixes_to_signatures[affix]
+                        self.affixes.discard(affix)
+
+        affected_words = set()
+
+        for stem in affected_stems:
+            sig = self._stems_to_signature.get(stem)
+            if sig in self.signatures_to_stems:
+                new_sigs = {sig}
+            else:
+                new_sigs = set()
+
+            if self.stems_to_signatures.get(stem, set()) == new_sigs:
+                continue
+            if new_sigs:
+                self.stems_to_signatures[stem] = new_sigs
+            else:
+                del self.stems_to_signatures[stem]
+            affected_words.update(self.stems_to_words.get(stem, ()))
+
+        return affected_words
+
+    def _update_words(self, affected_words):
+        """
+        Recompute the signatures of *affected_words*.
+
+        :return: the set of words whose signatures have changed
+        """
+        suffixing = self.parameters[2]
+        changed_words = set()
+
+        for word in affected_words:
+            new_sigs = set()
+            for stem in self._words_to_stems.get(word, ()):
+                new_sigs.update(self.stems_to_signatures.get(stem, ()))
+            old_sigs = self.words_to_signatures.get(word, set())
+            if new_sigs == old_sigs:
+                continue
+            changed_words.add(word)
+
+            for sig in old_sigs - new_sigs:
+                self.signatures_to_words[sig].discard(word)
+                if not self.signatures_to_words[sig]:
+                    del self.signatures_to_words[sig]
+            for sig in new_sigs - old_sigs:
+                if sig not in self.signatures_to_words:
+                    self.signatures_to_words[sig] = set()
+                self.signatures_to_words[sig].add(word)
+
+            if new_sigs:
+                self.words_to_signatures[word] = new_sigs
+                self.words_in_signatures.add(word)
+            else:
+                del self.words_to_signatures[word]
+                del self.words_to_sigtransforms[word]
+                self.words_in_signatures.discard(word)
+
+        self.words_to_sigtransforms.update(make_words_to_sigtransforms(
+            {word: self.words_to_signatures[word] for word in changed_words
+             if word in self.words_to_signatures}, suffixing))
+
+        return changed_words
@@ -0,0 +1,555 @@
+# -*- encoding: utf8 -*-
+
+try:
+    from collections.abc import (ItemsView, Mapping, Set)
+except ImportError:  # Python 2
+    from collections import (ItemsView, Mapping, Set)
+
+import numpy as np
+import six
+
+
+def _make_csr(rows):
+    """
+    Return the (indptr, indices) arrays of the compressed sparse rows of
+    the sequences of ids *rows*.
+    """
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.fromiter((i for row in rows for i in row), dtype=np.int32,
+                          count=int(indptr[-1]))
+    return indptr, indices
+
+
+def _intern(strings):
+    """
+    Return the sorted array of the distinct *strings* and the array of the
+    ids of *strings* in it.
+    """
+    return np.unique(np.array(strings, dtype='U'), return_inverse=True)
+
+
+def _ids_in(distinct, strings):
+    """
+    Return the array of the ids of *strings* in the sorted array of distinct
+    strings *distinct*, with -1 for those not in it.
+    """
+    strings = np.array(strings, dtype='U')
+    if not len(distinct):
+        return np.full(len(strings), -1, dtype=np.int64)
+    ids = np.minimum(np.searchsorted(distinct, strings), len(distinct) - 1)
+    return np.where(distinct[ids] == strings, ids, -1)
+
+
+def _csr_of_pairs(rows, columns, n_rows, *more_columns):
+    """
+    Return the (indptr, indices) arrays of the compressed sparse rows of the
+    (row, column) pairs of ids *rows* and *columns*, with the ids in each row
+    sorted, followed by the arrays *more_columns* in the same order.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    order = np.lexsort(tuple(more_columns[::-1]) + (columns, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return (indptr, np.asarray(columns)[order].astype(np.int32)) + tuple(
+        np.asarray(column)[order].astype(np.int32)
+        for column in more_columns)
+
+
+def _rows_union(indptr, indices, rows):
+    """
+    Return the sorted array of the distinct ids in the *rows* of the
+    compressed sparse rows (*indptr*, *indices*).
+    """
+    if not len(rows):
+        return np.zeros(0, dtype=np.int32)
+    return np.unique(np.concatenate(
+        [indices[indptr[i]: indptr[i + 1]] for i in rows.tolist()]))
+
+
+def _transpose_csr(indptr, indices, n_columns):
+    """
+    Return the (indptr, indices) arrays of the transpose of the compressed
+    sparse rows (*indptr*, *indices*) with *n_columns* columns.
+    The ids in each row of the transpose are sorted.
+    """
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32),
+                     np.diff(indptr))
+    order = np.argsort(indices, kind='mergesort')  # stable
+    new_indptr = np.zeros(n_columns + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_columns), out=new_indptr[1:])
+    return new_indptr, rows[order]
+
+
+class StringTable:
+    """
+    A table of distinct strings whose ids are their ranks in sorted order.
+
+    The strings are kept as one bytes object of their UTF-8 encodings,
+    which sort in the same order as the strings themselves.
+    """
+
+    def __init__(self, strings=()):
+        encoded = sorted(set(string.encode('utf8') for string in strings))
+        self.data = b''.join(encoded)
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=self.offsets[1:])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]: self.offsets[i + 1]].decode('utf8')
+
+    def __iter__(self):
+        offsets = self.offsets.tolist()
+        for i in range(len(self)):
+            yield self.data[offsets[i]: offsets[i + 1]].decode('utf8')
+
+    def index(self, string):
+        """
+        Return the id of *string*, or -1 if it is not in the table.
+        """
+        if not isinstance(string, six.string_types):
+            return -1
+        key = string.encode('utf8')
+        data = self.data
+        offsets = self.offsets
+
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if data[offsets[middle]: offsets[middle + 1]] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(self) and data[offsets[low]: offsets[low + 1]] == key:
+            return low
+        return -1
+
+
+class SignatureTable:
+    """
+    A table of distinct signatures (sorted tuples of affixes) whose ids are
+    their ranks in sorted order. Each signature is kept as a row of the ids
+    of its affixes in the ``StringTable`` *affixes*.
+    """
+
+    def __init__(self, signatures=(), affixes=None):
+        if affixes is None:
+            affixes = StringTable()
+        affix_ids = {affix: i for i, affix in enumerate(affixes)}
+        rows = sorted(tuple(affix_ids[affix] for affix in sig)
+                      for sig in signatures)
+        self.affixes = affixes
+        self.indptr, self.indices = _make_csr(rows)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def _row(self, i):
+        return tuple(self.indices[self.indptr[i]: self.indptr[i + 1]].tolist())
+
+    def __getitem__(self, i):
+        return tuple(self.affixes[j] for j in self._row(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def index(self, signature):
+        """
+        Return the id of *signature*, or -1 if it is not in the table.
+        """
+        if not isinstance(signature, tuple):
+            return -1
+        key = tuple(self.affixes.index(affix) for affix in signature)
+        if -1 in key:
+            return -1
+
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._row(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(self) and self._row(low) == key:
+            return low
+        return -1
+
+
+class IdSetView(Set):
+    """
+    A read-only set of the objects of *table* with the sorted array of
+    ids *ids*.
+    """
+
+    def __init__(self, table, ids):
+        self._table = table
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for i in self._ids.tolist():
+            yield self._table[i]
+
+    def __contains__(self, value):
+        i = self._table.index(value)
+        j = np.searchsorted(self._ids, i)
+        return i >= 0 and j < len(self._ids) and self._ids[j] == i
+
+    def __repr__(self):
+        return '{' + ', '.join(repr(value) for value in self) + '}'
+
+
+class SigtransformSetView(Set):
+    """
+    A read-only set of the (signature, affix) tuples of a word, with the
+    sorted array of signature ids *sig_ids* and the array of the ids of
+    their affixes *affix_ids*.
+    """
+
+    def __init__(self, signatures, sig_ids, affix_ids):
+        self._signatures = signatures
+        self._sig_ids = sig_ids
+        self._affix_ids = affix_ids
+
+    def __len__(self):
+        return len(self._sig_ids)
+
+    def __iter__(self):
+        affixes = self._signatures.affixes
+        for sig_id, affix_id in zip(self._sig_ids.tolist(),
+                                    self._affix_ids.tolist()):
+            yield self._signatures[sig_id], affixes[affix_id]
+
+    def __contains__(self, value):
+        try:
+            sig, affix = value
+        except (TypeError, ValueError):
+            return False
+        i = self._signatures.index(sig)
+        j = np.searchsorted(self._sig_ids, i)
+        return i >= 0 and j < len(self._sig_ids) and \
+            self._sig_ids[j] == i and \
+            self._signatures.affixes[self._affix_ids[j]] == affix
+
+    def __repr__(self):
+        return '{' + ', '.join(repr(value) for value in self) + '}'
+
+
+class RelationItemsView(ItemsView):
+
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class RelationView(Mapping):
+    """
+    A read-only dict-like view of a relation of *store*, which maps each
+    object of one table (with any related objects) to the set of the related
+    objects of another table.
+    """
+
+    def __init__(self, store, key_table, value_table, relation):
+        self._store = store
+        self._key_table = key_table
+        self._value_table = value_table
+        self._relation = relation
+
+    def _arrays(self):
+        store = self._store
+        indptr, indices = store.relations[self._relation]
+        return (getattr(store, self._key_table),
+                getattr(store, self._value_table), indptr, indices)
+
+    def _value(self, value_table, indices, start, end):
+        return IdSetView(value_table, indices[start: end])
+
+    def __getitem__(self, key):
+        key_table, value_table, indptr, indices = self._arrays()
+        i = key_table.index(key)
+        if i < 0 or indptr[i] == indptr[i + 1]:
+            raise KeyError(key)
+        return self._value(value_table, indices, indptr[i], indptr[i + 1])
+
+    def __iter__(self):
+        key_table, _, indptr, _ = self._arrays()
+        for i in np.flatnonzero(np.diff(indptr)).tolist():
+            yield key_table[i]
+
+    def __len__(self):
+        return int(np.count_nonzero(np.diff(self._arrays()[2])))
+
+    def __contains__(self, key):
+        key_table, _, indptr, _ = self._arrays()
+        i = key_table.index(key)
+        return i >= 0 and indptr[i] != indptr[i + 1]
+
+    def _items(self):
+        key_table, value_table, indptr, indices = self._arrays()
+        for i in np.flatnonzero(np.diff(indptr)).tolist():
+            yield key_table[i], self._value(value_table, indices, indptr[i],
+                                            indptr[i + 1])
+
+    def items(self):
+        return RelationItemsView(self)
+
+    def __repr__(self):
+        return '{' + ', '.join('{!r}: {!r}'.format(key, value)
+                               for key, value in self.items()) + '}'
+
+
+class SigtransformsView(RelationView):
+    """
+    A read-only dict-like view of the signature transforms of words.
+    """
+
+    def _value(self, value_table, indices, start, end):
+        affix_ids = self._store.word_sigtransform_affixes
+        return SigtransformSetView(value_table, indices[start: end],
+                                   affix_ids[start: end])
+
+
+class TableSetView(Set):
+    """
+    A read-only set of the objects of a table of *store*, or only those with
+    any related objects in *relation* if it is given.
+    """
+
+    def __init__(self, store, table, relation=None):
+        self._store = store
+        self._table = table
+        self._relation = relation
+
+    def _ids(self):
+        table = getattr(self._store, self._table)
+        if self._relation is None:
+            return table, np.arange(len(table))
+        indptr, _ = self._store.relations[self._relation]
+        return table, np.flatnonzero(np.diff(indptr))
+
+    def __len__(self):
+        return len(self._ids()[1])
+
+    def __iter__(self):
+        table, ids = self._ids()
+        for i in ids.tolist():
+            yield table[i]
+
+    def __contains__(self, value):
+        table = getattr(self._store, self._table)
+        i = table.index(value)
+        if i < 0 or self._relation is None:
+            return i >= 0
+        indptr, _ = self._store.relations[self._relation]
+        return indptr[i] != indptr[i + 1]
+
+    def __repr__(self):
+        return '{' + ', '.join(repr(value) for value in self) + '}'
+
+
+class SignatureStore:
+    """
+    A compact store of the morphological signature objects.
+
+    Stems, words, affixes, and signatures are interned as integer ids
+    (their ranks in sorted order), and each relation between them is kept
+    as compressed sparse rows of ids in NumPy arrays. The signature objects
+    of a ``Lexicon`` are read-only views of a store: ``stems_to_words``,
+    ``signatures_to_stems``, ``stems_to_signatures``, ``words_to_signatures``,
+    ``signatures_to_words``, ``words_to_sigtransforms``, and
+    ``affixes_to_signatures`` are dict-like, and ``signatures``,
+    ``words_in_signatures``, ``affixes``, and ``stems`` are set-like.
+    The views stay the same objects when the store is loaded again.
+
+    Signatures and stems are queried by their affixes with the posting lists
+    of ``affixes_to_signatures`` (``signatures_containing()`` and others),
+    whose results are set-like views of the store as it is at the query.
+    """
+
+    def __init__(self):
+        self.load(dict(), dict(), dict())
+
+        self.stems_to_words = RelationView(
+            self, 'stem_table', 'word_table', 'stem_words')
+        self.signatures_to_stems = RelationView(
+            self, 'signature_table', 'stem_table', 'signature_stems')
+        self.stems_to_signatures = RelationView(
+            self, 'stem_table', 'signature_table', 'stem_signatures')
+        self.words_to_signatures = RelationView(
+            self, 'word_table', 'signature_table', 'word_signatures')
+        self.signatures_to_words = RelationView(
+            self, 'signature_table', 'word_table', 'signature_words')
+        self.words_to_sigtransforms = SigtransformsView(
+            self, 'word_table', 'signature_table', 'word_signatures')
+        self.affixes_to_signatures = RelationView(
+            self, 'affix_table', 'signature_table', 'affix_signatures')
+        self.signatures = TableSetView(self, 'signature_table')
+        self.words_in_signatures = TableSetView(self, 'word_table',
+                                                'word_signatures')
+        self.affixes = TableSetView(self, 'affix_table')
+        self.stems = TableSetView(self, 'stem_table')
+
+    def load(self, stems_to_words, signatures_to_stems,
+             words_to_sigtransforms):
+        """
+        Replace the contents of the store by the signature objects made from
+        *stems_to_words*, *signatures_to_stems*, and *words_to_sigtransforms*
+        (as made by the functions of the ``signature`` module), from which
+        all the other signature objects follow.
+        """
+        # the strings are interned with np.unique over the flat lists of
+        # all (key, value) pairs, and each relation is made from its pairs
+        # of ids at once
+        stems = list(stems_to_words)
+        word_lists = [stems_to_words[stem] for stem in stems]
+        distinct_stems, stem_ids = _intern(stems)
+        distinct_words, word_ids = _intern(
+            [word for words in word_lists for word in words])
+        stem_table = StringTable(distinct_stems.tolist())
+        word_table = StringTable(distinct_words.tolist())
+        affix_table = StringTable(affix for sig in signatures_to_stems
+                                  for affix in sig)
+        signature_table = SignatureTable(signatures_to_stems, affix_table)
+
+        affix_ids = {affix: i for i, affix in enumerate(affix_table)}
+        sig_ids = {sig: i for i, sig in enumerate(signature_table)}
+
+        relations = dict()
+        relations['stem_words'] = _csr_of_pairs(
+            np.repeat(stem_ids, [len(words) for words in word_lists]),
+            word_ids, len(stem_table))
+
+        sigs = list(signatures_to_stems)
+        stem_lists = [signatures_to_stems[sig] for sig in sigs]
+        relations['signature_stems'] = _csr_of_pairs(
+            np.repeat([sig_ids[sig] for sig in sigs],
+                      [len(stems_) for stems_ in stem_lists]).astype(np.int64),
+            _ids_in(distinct_stems,
+                    [stem for stems_ in stem_lists for stem in stems_]),
+            len(signature_table))
+
+        # the sigtransforms of the words with no signatures are left out
+        words = list(words_to_sigtransforms)
+        sigtransform_lists = [words_to_sigtransforms[word] for word in words]
+        sigtransform_words = np.repeat(
+            _ids_in(distinct_words, words),
+            [len(sigtransforms) for sigtransforms in sigtransform_lists])
+        sigtransforms = [sigtransform for sigtransforms in sigtransform_lists
+                         for sigtransform in sigtransforms]
+        in_table = sigtransform_words >= 0
+        indptr, indices, word_sigtransform_affixes = _csr_of_pairs(
+            sigtransform_words[in_table],
+            np.array([sig_ids[sig] for sig, _ in sigtransforms],
+                     dtype=np.int64)[in_table],
+            len(word_table),
+            np.array([affix_ids[affix] for _, affix in sigtransforms],
+                     dtype=np.int64)[in_table])
+        relations['word_signatures'] = indptr, indices
+
+        # the other directions
+        relations['stem_signatures'] = _transpose_csr(
+            *relations['signature_stems'], n_columns=len(stem_table))
+        relations['signature_words'] = _transpose_csr(
+            *relations['word_signatures'], n_columns=len(signature_table))
+        relations['affix_signatures'] = _transpose_csr(
+            signature_table.indptr, signature_table.indices,
+            n_columns=len(affix_table))
+
+        self.stem_table = stem_table
+        self.word_table = word_table
+        self.affix_table = affix_table
+        self.signature_table = signature_table
+        self.word_sigtransform_affixes = word_sigtransform_affixes
+        self.relations = relations
+
+    def _affix_ids(self, affixes):
+        """
+        Return the list of the ids of *affixes* (a string is one affix),
+        with -1 for those not in the store.
+        """
+        if isinstance(affixes, six.string_types):
+            affixes = [affixes]
+        return [self.affix_table.index(affix) for affix in set(affixes)]
+
+    def _signature_ids_containing(self, affixes):
+        affix_ids = self._affix_ids(affixes)
+        if not affix_ids:
+            return np.arange(len(self.signature_table), dtype=np.int32)
+        if -1 in affix_ids:
+            return np.zeros(0, dtype=np.int32)
+
+        # intersect the posting lists, shortest first
+        indptr, indices = self.relations['affix_signatures']
+        postings = sorted((indices[indptr[i]: indptr[i + 1]]
+                           for i in affix_ids), key=len)
+        ids = postings[0]
+        for posting in postings[1:]:
+            ids = np.intersect1d(ids, posting, assume_unique=True)
+        return ids
+
+    def _signature_ids_contained_in(self, affixes):
+        affix_ids = [i for i in self._affix_ids(affixes) if i >= 0]
+        if not affix_ids:
+            return np.zeros(0, dtype=np.int32)
+
+        # the signatures each of whose affixes is one of affix_ids
+        indptr, indices = self.relations['affix_signatures']
+        ids, counts = np.unique(np.concatenate(
+            [indices[indptr[i]: indptr[i + 1]] for i in affix_ids]),
+            return_counts=True)
+        sig_lengths = np.diff(self.signature_table.indptr)
+        return ids[counts == sig_lengths[ids]]
+
+    def signatures_containing(self, affixes):
+        """
+        Return the set-like view of the signatures which contain all of
+        *affixes* (an affix or an iterable of them).
+        """
+        return IdSetView(self.signature_table,
+                         self._signature_ids_containing(affixes))
+
+    def signatures_contained_in(self, affixes):
+        """
+        Return the set-like view of the signatures all of whose affixes are
+        among *affixes* (an affix or an iterable of them).
+        """
+        return IdSetView(self.signature_table,
+                         self._signature_ids_contained_in(affixes))
+
+    def stems_containing(self, affixes):
+        """
+        Return the set-like view of the stems with a signature which contains
+        all of *affixes* (an affix or an iterable of them).
+        """
+        return IdSetView(self.stem_table, _rows_union(
+            *self.relations['signature_stems'],
+            rows=self._signature_ids_containing(affixes)))
+
+    def stems_contained_in(self, affixes):
+        """
+        Return the set-like view of the stems with a signature all of whose
+        affixes are among *affixes* (an affix or an iterable of them).
+        """
+        return IdSetView(self.stem_table, _rows_union(
+            *self.relations['signature_stems'],
+            rows=self._signature_ids_contained_in(affixes)))
+
+    def nbytes(self):
+        """
+        Return the number of bytes of the arrays and strings of the store.
+        """
+        arrays = [self.stem_table.offsets, self.word_table.offsets,
+                  self.affix_table.offsets, self.signature_table.indptr,
+                  self.signature_table.indices, self.word_sigtransform_affixes]
+        for indptr, indices in self.relations.values():
+            arrays.extend((indptr, indices))
+        return sum(array.nbytes for array in arrays) + \
+            len(self.stem_table.data) + len(self.word_table.data) + \
+            len(self.affix_table.data)
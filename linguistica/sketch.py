@@ -0,0 +1,93 @@
+# -*- encoding: utf8 -*-
+
+import zlib
+
+import numpy as np
+
+DEPTH = 4  # number of hash functions of a Count-Min sketch
+SEED = 20170409  # the same in every process, so that sketches can be merged
+
+
+def hash_words(words):
+    """
+    Return a uint64 array of hash values of *words*.
+
+    Unlike ``hash()``, the values are the same in every process,
+    so they do not depend on word ids or on hash randomization.
+    """
+    hash_values = np.zeros(len(words), dtype=np.uint64)
+    for i, word in enumerate(words):
+        word_bytes = word.encode('utf8')
+        hash_values[i] = (zlib.crc32(word_bytes) & 0xffffffff) << 32 | \
+            (zlib.crc32(word_bytes, SEED) & 0xffffffff)
+    return hash_values
+
+
+class CountMinSketch:
+    """
+    A Count-Min sketch of ngram counts (Cormode and Muthukrishnan 2005).
+
+    The sketch is a *depth* x *width* table of counters. An ngram is added to
+    one counter in each row, and its estimated count is the minimum of its
+    counters. An estimate is never below the true count, and with
+    probability at least 1 - delta it is at most the true count plus
+    epsilon * N, where N is the total count of all ngrams added,
+    epsilon = e / *width*, and delta = exp(-*depth*).
+    """
+
+    def __init__(self, order, width, depth=DEPTH):
+        self.order = order
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total_count = 0
+
+        random_state = np.random.RandomState(SEED)
+        # odd multipliers for multiply-shift hashing, one per row and word
+        self._multipliers = (random_state.randint(
+            0, 2 ** 62, size=(depth, order)).astype(np.uint64) *
+            np.uint64(2) + np.uint64(1))
+
+    def error_bound(self):
+        """
+        Return (epsilon, delta) of the guarantee that an estimated count
+        exceeds the true count by at most epsilon * N with probability
+        at least 1 - delta.
+        """
+        return float(np.e / self.width), float(np.exp(-self.depth))
+
+    def _indices(self, key_hashes):
+        """
+        Return the *depth* x n array of counter indices of the ngrams whose
+        words have the hash values *key_hashes* (an n x *order* array).
+        """
+        indices = np.zeros((self.depth, len(key_hashes)), dtype=np.int64)
+        with np.errstate(over='ignore'):
+            for row in range(self.depth):
+                hash_values = np.zeros(len(key_hashes), dtype=np.uint64)
+                for i in range(self.order):
+                    hash_values += key_hashes[:, i] * \
+                        self._multipliers[row, i]
+                indices[row] = (hash_values >> np.uint64(32)) % \
+                    np.uint64(self.width)
+        return indices
+
+    def add(self, key_hashes, counts):
+        for row, indices in enumerate(self._indices(key_hashes)):
+            self.table[row] += np.bincount(
+                indices, weights=counts, minlength=self.width).astype(np.int64)
+        self.total_count += int(counts.sum())
+
+    def estimate(self, key_hashes):
+        indices = self._indices(key_hashes)
+        estimates = self.table[0][indices[0]]
+        for row in range(1, self.depth):
+            estimates = np.minimum(estimates, self.table[row][indices[row]])
+        return estimates
+
+    def merge(self, other):
+        """
+        Add the counts of the sketch *other* to this sketch.
+        """
+        self.table += other.table
+        self.total_count += other.total_count
@@ -0,0 +1,242 @@
+# -*- encoding: utf8 -*-
+
+"""
+Sweeps of the parameters of the signature module over a grid of values.
+
+The work which stays the same across the points of a grid is done once: the
+wordlist (with the word counts it comes from), and the bisignatures of each
+value of *suffixing*, made with the smallest *min_stem_length* and the
+largest *max_affix_length* of the grid. The bisignatures of each point are
+exactly those of these with no affix longer than its *max_affix_length*,
+and with only the (stem, word1, word2) tuples whose stems are at least its
+*min_stem_length* letters long, so only the signatures themselves are made
+for each point.
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import sys
+import time
+from itertools import product
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+from linguistica import signature
+from linguistica.util import (ENCODING, MODULE_PARAMETERS, NULL)
+
+# the columns of the summary statistics of each point, after its parameters
+STATISTICS = ('stems', 'signatures', 'affixes', 'words_in_signatures',
+              'word_coverage', 'seconds')
+
+# the bisignatures of each value of suffixing, in the worker processes
+_bisignatures = dict()
+
+
+def make_points(grid, parameters):
+    """
+    Return the list of the dicts of the signature parameters of each point of
+    *grid*, in the order of ``itertools.product`` over the parameters sorted
+    by name.
+
+    :param grid: a dict of the names of signature parameters to lists of
+        their values
+    :param parameters: a dict of the values of the parameters not in *grid*
+    """
+    for parameter in grid:
+        if parameter not in MODULE_PARAMETERS['signature']:
+            raise KeyError('not a signature parameter -- ' + parameter)
+
+    names = sorted(MODULE_PARAMETERS['signature'])
+    values = [list(grid[name]) if name in grid else [parameters[name]]
+              for name in names]
+    return [dict(zip(names, point)) for point in product(*values)]
+
+
+def run(wordlist, grid, parameters, n_jobs=1):
+    """
+    Run the signature module for each point of *grid*.
+
+    :param wordlist: the list of word types
+    :param grid: a dict of the names of signature parameters to lists of
+        their values, e.g. ``{'min_stem_length': [3, 4, 5]}``
+    :param parameters: a dict of the values of the parameters not in *grid*
+    :param n_jobs: number of worker processes, among which the points are
+        split (and for the bisignatures, among which the groups of words are
+        split); a value below 1 means as many as there are CPUs
+    :return: a list of the dicts of the parameters and summary statistics
+        (``STATISTICS``) of the points, in the order of ``make_points()``
+    """
+    points = make_points(grid, parameters)
+    n_jobs = signature._number_of_jobs(n_jobs)
+
+    bisignatures = dict()
+    for suffixing in sorted({point['suffixing'] for point in points}):
+        points_ = [point for point in points
+                   if point['suffixing'] == suffixing]
+        bisignatures[suffixing] = signature.make_bisignatures(
+            wordlist, min(point['min_stem_length'] for point in points_),
+            max(point['max_affix_length'] for point in points_), suffixing,
+            n_jobs=n_jobs)
+
+    tasks = [(point, len(wordlist)) for point in points]
+
+    if n_jobs == 1 or len(points) == 1:
+        _init_worker(bisignatures)
+        try:
+            results = [_run_point(task) for task in tasks]
+        finally:
+            _bisignatures.clear()
+    else:
+        pool = multiprocessing.Pool(min(n_jobs, len(points)),
+                                    initializer=_init_worker,
+                                    initargs=(bisignatures,))
+        try:
+            results = pool.map(_run_point, tasks, chunksize=1)
+        finally:
+            pool.terminate()
+
+    return [dict(point, **statistics)
+            for point, statistics in zip(points, results)]
+
+
+def _init_worker(bisignatures):
+    _bisignatures.clear()
+    _bisignatures.update(bisignatures)
+
+
+def _affix_length(affix):
+    return 0 if affix == NULL else len(affix)
+
+
+def _stems_to_words_of_point(bisigs_to_tuples, min_stem_length,
+                             max_affix_length, min_sig_count):
+    """
+    Make the dict of stems to words for a point, as
+    ``signature.make_stems_to_words`` does, from *bisigs_to_tuples* made with
+    a smaller (or the same) *min_stem_length* and a larger (or the same)
+    *max_affix_length*.
+    """
+    stems_to_words = dict()
+
+    for bisig, tuples in bisigs_to_tuples.items():
+        if any(_affix_length(affix) > max_affix_length for affix in bisig):
+            continue
+
+        tuples = [tuple_ for tuple_ in tuples
+                  if len(tuple_[0]) >= min_stem_length]
+        if len(tuples) < min_sig_count:
+            continue
+
+        for stem, word1, word2 in tuples:
+            if stem not in stems_to_words:
+                stems_to_words[stem] = set()
+
+            stems_to_words[stem].add(word1)
+            stems_to_words[stem].add(word2)
+
+    return stems_to_words
+
+
+def _run_point(args):
+    point, n_word_types = args
+    start = time.time()
+
+    max_affix_length = point['max_affix_length']
+    min_sig_count = point['min_sig_count']
+    stems_to_words = _stems_to_words_of_point(
+        _bisignatures[point['suffixing']], point['min_stem_length'],
+        max_affix_length, min_sig_count)
+    signatures_to_stems = signature.make_signatures_to_stems(
+        stems_to_words, max_affix_length, min_sig_count, point['suffixing'])
+
+    affixes = set()
+    words_in_signatures = set()
+    for sig, stems in signatures_to_stems.items():
+        affixes.update(sig)
+        for stem in stems:
+            words_in_signatures.update(stems_to_words[stem])
+
+    return {'stems': len(stems_to_words),
+            'signatures': len(signatures_to_stems),
+            'affixes': len(affixes),
+            'words_in_signatures': len(words_in_signatures),
+            'word_coverage': (len(words_in_signatures) / float(n_word_types)
+                              if n_word_types else 0.0),
+            'seconds': time.time() - start}
+
+
+def format_table(rows):
+    """
+    Return the tab-separated table of *rows* as made by ``run()``, with a
+    header line.
+    """
+    columns = sorted(MODULE_PARAMETERS['signature']) + list(STATISTICS)
+    lines = ['\t'.join(columns)]
+
+    for row in rows:
+        lines.append('\t'.join('{:.4f}'.format(row[column])
+                               if isinstance(row[column], float)
+                               else str(row[column]) for column in columns))
+
+    return '\n'.join(lines) + '\n'
+
+
+def main(args=None):
+    """
+    Command line interface for parameter sweeps, as in
+    ``linguistica sweep corpus.txt --min-stem-length 3 4 5``.
+    """
+    import linguistica as lxa
+
+    parser = argparse.ArgumentParser(
+        prog='linguistica sweep',
+        description='Run the signature module for a grid of parameters, '
+                    'and print a table of summary statistics for each point.')
+    parser.add_argument('file_path',
+                        help='corpus file, directory, or glob pattern '
+                             '(a wordlist file with --wordlist)')
+    parser.add_argument('--wordlist', action='store_true',
+                        help='the file is a wordlist')
+    parser.add_argument('--encoding', default=ENCODING,
+                        help='encoding of the file (default: %(default)s)')
+    parser.add_argument('--max-word-tokens', type=int, default=0,
+                        help='number of word tokens of a corpus to use; '
+                             '0 means all (default: %(default)s)')
+    for parameter in sorted(MODULE_PARAMETERS['signature']):
+        parser.add_argument('--' + parameter.replace('_', '-'), type=int,
+                            nargs='+', dest=parameter, metavar='VALUE',
+                            help='values of ' + parameter)
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help='number of worker processes; 0 means as many as '
+                             'there are CPUs (default: %(default)s)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='directory of a cache of word counts')
+    parser.add_argument('--output', default=None,
+                        help='file to write the table to '
+                             '(default: standard output)')
+    args = parser.parse_args(args)
+
+    grid = {parameter: getattr(args, parameter)
+            for parameter in MODULE_PARAMETERS['signature']
+            if getattr(args, parameter)}
+
+    if args.wordlist:
+        lxa_object = lxa.read_wordlist(args.file_path, encoding=args.encoding,
+                                       n_jobs=args.n_jobs,
+                                       cache_dir=args.cache_dir)
+    else:
+        lxa_object = lxa.read_corpus(args.file_path, encoding=args.encoding,
+                                     n_jobs=args.n_jobs,
+                                     cache_dir=args.cache_dir,
+                                     max_word_tokens=args.max_word_tokens)
+
+    table = format_table(lxa_object.sweep(grid))
+
+    if args.output is None:
+        sys.stdout.write(table)
+    else:
+        with open(args.output, 'w', encoding='utf8') as f:
+            f.write(table)
+        print('Table of {} points written to {}'.format(
+            table.count('\n') - 1, args.output))
@@ -0,0 +1,129 @@
+# -*- encoding: utf8 -*-
+
+import os
+import time
+
+import pytest
+
+import linguistica as lxa
+from linguistica import signature
+from linguistica.cache import (ResultCache, main, make_key, parse_size)
+
+text = 'the cats jumped . the dogs jumped and walked . the cat walks .\n' * 20
+
+
+def test_make_key():
+    key = make_key('trie', 'abc', {'min_stem_length': 4})
+    assert key == make_key('trie', 'abc', {'min_stem_length': 4})
+    assert key != make_key('trie', 'abc', {'min_stem_length': 3})
+    assert key != make_key('trie', 'abd', {'min_stem_length': 4})
+    assert key != make_key('signature', 'abc', {'min_stem_length': 4})
+
+
+def test_parse_size():
+    assert parse_size('1000') == 1000
+    assert parse_size('2K') == 2048
+    assert parse_size('1.5 MB') == 3 * 2 ** 19
+
+
+def test_result_cache_lru(tmpdir):
+    cache = ResultCache(str(tmpdir), size_limit=10 ** 9)
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, ('x' * 1000, i), {'module': 'trie'})
+        os.utime(os.path.join(str(tmpdir), key + '.pickle'), (i, i))
+
+    assert cache.get('a') == ('x' * 1000, 0)  # now the most recently used
+    assert cache.get('d') is None
+    assert [entry['key'] for entry in cache.entries()] == ['a', 'c', 'b']
+    assert cache.entries()[0]['module'] == 'trie'
+
+    removed = cache.prune(cache.total_size() - 1)
+    assert [entry['key'] for entry in removed] == ['b']
+    assert [entry['key'] for entry in cache.entries()] == ['a', 'c']
+
+    cache.clear()
+    assert not cache.entries()
+    assert not os.listdir(str(tmpdir))
+
+
+def test_lexicon_cache(tmpdir, monkeypatch):
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text(text, encoding='utf8')
+    cache_dir = str(tmpdir.join('cache'))
+
+    expected = lxa.read_corpus(str(corpus_file), min_stem_length=3,
+                               min_sig_count=1)
+    lxa_object = lxa.read_corpus(str(corpus_file), cache_dir=cache_dir,
+                                 min_stem_length=3, min_sig_count=1)
+    assert lxa_object.stems_to_words() == expected.stems_to_words()
+    assert lxa_object.successors() == expected.successors()
+    modules = {entry['module'] for entry in ResultCache(cache_dir).entries()}
+    assert modules == {'ngram', 'signature', 'trie'}
+
+    def make_stems_to_words(*args, **kwargs):
+        raise RuntimeError('not loaded from the cache')
+
+    monkeypatch.setattr(signature, 'make_stems_to_words', make_stems_to_words)
+
+    lxa_object = lxa.read_corpus(str(corpus_file), cache_dir=cache_dir,
+                                 min_stem_length=3, min_sig_count=1)
+    assert lxa_object.stems_to_words() == expected.stems_to_words()
+    assert lxa_object.word_bigram_counter() == expected.word_bigram_counter()
+
+    # a different parameter of the signature module, or a different file
+    # content, is not in the cache
+    lxa_object = lxa.read_corpus(str(corpus_file), cache_dir=cache_dir,
+                                 min_stem_length=3, min_sig_count=2)
+    with pytest.raises(RuntimeError):
+        lxa_object.stems_to_words()
+
+    time.sleep(0.01)
+    corpus_file.write_text(text + 'more words\n', encoding='utf8')
+    lxa_object = lxa.read_corpus(str(corpus_file), cache_dir=cache_dir,
+                                 min_stem_length=3, min_sig_count=1)
+    assert lxa_object.number_of_word_tokens() == \
+        expected.number_of_word_tokens() + 2
+
+
+def test_lexicon_cache_approximate(tmpdir):
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text(text + 'a dog ran .\n', encoding='utf8')
+    cache_dir = str(tmpdir.join('cache'))
+
+    # approximate counts keep the ngrams of at least min_context_count
+    for min_context_count in (1, 5, 30):
+        expected = lxa.read_corpus(str(corpus_file),
+                                   ngram_memory_budget=10 ** 6,
+                                   min_context_count=min_context_count)
+        lxa_object = lxa.read_corpus(str(corpus_file), cache_dir=cache_dir,
+                                     ngram_memory_budget=10 ** 6,
+                                     min_context_count=min_context_count)
+        assert lxa_object.word_bigram_counter() == \
+            expected.word_bigram_counter()
+        assert lxa_object.word_trigram_counter() == \
+            expected.word_trigram_counter()
+
+
+def test_lexicon_cache_size_limit(tmpdir):
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text(text, encoding='utf8')
+    cache_dir = str(tmpdir.join('cache'))
+
+    lxa_object = lxa.read_corpus(str(corpus_file), cache_dir=cache_dir,
+                                 cache_size_limit=0)
+    assert lxa_object.result_cache.size_limit == 0
+    lxa_object.word_bigram_counter()
+    assert not ResultCache(cache_dir).entries()
+
+
+def test_main(tmpdir, capsys):
+    cache = ResultCache(str(tmpdir))
+    cache.put('a' * 64, 'results', {'module': 'trie', 'file_path': 'f.txt'})
+
+    main(['info', '--dir', str(tmpdir)])
+    out, _ = capsys.readouterr()
+    assert '1 entries' in out
+    assert 'f.txt' in out
+
+    main(['prune', '--dir', str(tmpdir), '--size-limit', '0'])
+    assert not cache.entries()
@@ -0,0 +1,133 @@
+# -*- encoding: utf8 -*-
+
+import bz2
+import gzip
+import os
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+import pytest
+
+import linguistica as lxa
+from linguistica.corpus import (CorpusFile, CorpusFiles, CorpusText,
+                                expand_corpus_path, looks_like_path, lzma,
+                                open_corpus)
+
+corpus_str = (u'The cat sat on the mat.\n'
+              u'\n'
+              u'Did the dog see it?\r\n'
+              u'Yes; the dog saw the cat!\r'
+              u'The end')
+
+
+def test_corpus_file_lines(tmpdir):
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text(corpus_str, encoding='utf8')
+
+    with open(str(corpus_file), encoding='utf8') as f:
+        expected_object = [line.rstrip('\n') for line in f]
+
+    for chunk_size in (1, 7, 1 << 20):
+        test_object = list(CorpusFile(str(corpus_file)).lines(
+            chunk_size=chunk_size))
+        assert test_object == expected_object
+
+
+def test_corpus_file_shards(tmpdir):
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text(corpus_str * 10, encoding='utf8')
+    corpus_file_object = CorpusFile(str(corpus_file))
+
+    test_object = list()
+    for start, end in corpus_file_object.shards(4):
+        test_object.extend(corpus_file_object.lines(start, end))
+
+    assert test_object == list(corpus_file_object)
+
+
+def test_corpus_text_from_generator():
+    words = corpus_str.split()
+    lxa_object1 = lxa.from_corpus(words)
+    lxa_object2 = lxa.from_corpus(line for line in corpus_str.splitlines())
+    assert lxa_object1.word_trigram_counter() == \
+        lxa_object2.word_trigram_counter()
+
+
+def test_corpus_text_iter():
+    assert list(CorpusText(u'a b\nc')) == [u'a b', u'c']
+
+
+def write_compressed(file_path, text, open_function):
+    with open_function(file_path, 'wb') as f:
+        f.write(text.encode('utf8'))
+
+
+def test_compressed_corpus_file_lines(tmpdir):
+    plain_file = tmpdir.join('corpus.txt')
+    plain_file.write_text(corpus_str * 3, encoding='utf8')
+    expected_object = list(CorpusFile(str(plain_file)))
+
+    open_functions = {'corpus.txt.gz': gzip.GzipFile,
+                      'corpus.txt.bz2': bz2.BZ2File}
+    if lzma is not None:
+        open_functions['corpus.txt.xz'] = lzma.LZMAFile
+
+    for file_name, open_function in open_functions.items():
+        file_path = str(tmpdir.join(file_name))
+        write_compressed(file_path, corpus_str * 3, open_function)
+        corpus_file = CorpusFile(file_path)
+
+        for chunk_size in (1, 7, 1 << 20):
+            test_object = list(corpus_file.lines(chunk_size=chunk_size))
+            assert test_object == expected_object
+        assert corpus_file.shards(4) == [(0, os.path.getsize(file_path))]
+
+
+def test_expand_corpus_path(tmpdir):
+    for file_path in ('b.txt', 'a.txt.gz', 'sub/c.txt', '.hidden',
+                      '.hidden_dir/d.txt'):
+        tmpdir.join(file_path).write_text(u'x', encoding='utf8',
+                                          ensure=True)
+    directory = str(tmpdir)
+
+    assert expand_corpus_path(directory) == [
+        os.path.join(directory, file_path)
+        for file_path in ('a.txt.gz', 'b.txt', os.path.join('sub', 'c.txt'))]
+    assert expand_corpus_path(os.path.join(directory, '*.txt*')) == [
+        os.path.join(directory, 'a.txt.gz'), os.path.join(directory, 'b.txt')]
+    assert expand_corpus_path(os.path.join(directory, 'b.txt')) == [
+        os.path.join(directory, 'b.txt')]
+    assert expand_corpus_path(os.path.join(directory, 'none*')) == []
+
+    assert isinstance(open_corpus(os.path.join(directory, 'b.txt')),
+                      CorpusFile)
+    assert isinstance(open_corpus(directory), CorpusFiles)
+    with pytest.raises(IOError):
+        open_corpus(os.path.join(directory, 'none*'))
+
+
+def test_corpus_files(tmpdir):
+    file_paths = [str(tmpdir.join('corpus1.txt')),
+                  str(tmpdir.join('corpus2.txt.gz')),
+                  str(tmpdir.join('corpus3.txt'))]
+    tmpdir.join('corpus1.txt').write_text(corpus_str * 5, encoding='utf8')
+    write_compressed(file_paths[1], corpus_str * 3, gzip.GzipFile)
+    tmpdir.join('corpus3.txt').write_text(u'', encoding='utf8')
+
+    corpus_files = CorpusFiles(file_paths)
+    expected_object = list(CorpusFile(file_paths[0])) + \
+        list(CorpusFile(file_paths[1]))
+    assert list(corpus_files) == expected_object
+
+    test_object = list()
+    for file_path, start, end in corpus_files.shards(8):
+        test_object.extend(CorpusFile(file_path).lines(start, end))
+    assert test_object == expected_object
+
+
+def test_looks_like_path():
+    for string in ('/data/corpora/brown.txt', '~/brown', 'corpora/brown',
+                   'brown.txt', '*.txt.gz', '/data/my corpus.txt'):
+        assert looks_like_path(string)
+    for string in ('the cat sat .', 'cats', 'etc.', 'and/or so',
+                   '/a\nb', ''):
+        assert not looks_like_path(string)
@@ -2,6 +2,8 @@
 
 import os
 
+import pytest
+
 import linguistica as lxa
 from linguistica.datasets import brown as corpus_path
 from linguistica.datasets import cmudict as wordlist_path
@@ -50,3 +52,144 @@ def test_word_trigram_counter():
     expected_object_path = os.path.join(data_dir, 'word_trigram_counter.txt')
     expected_object = eval(open(expected_object_path).read())
     assert test_object == expected_object
+
+
+def test_run_parallel(tmpdir):
+    from io import open
+    from linguistica import ngram
+
+    corpus_file = tmpdir.join('corpus.txt')
+    lines = ['The cat (a big one) sat on the mat.\n',
+             '\n',
+             'Did the dog see it? Yes; the dog saw the cat!\r\n',
+             'And then: the end.\r'] * 50
+    corpus_file.write_text(''.join(lines), encoding='utf8')
+    file_path = str(corpus_file)
+
+    for max_word_tokens in (0, 1, 17, 100, 1000):
+        with open(file_path, encoding='utf8') as f:
+            expected_object = ngram.run(f, max_word_tokens=max_word_tokens)
+        test_object = ngram.run_parallel(file_path, n_jobs=2,
+                                         max_word_tokens=max_word_tokens)
+        assert test_object == expected_object
+
+
+def test_run_parallel_memory_limit(tmpdir, monkeypatch):
+    import tempfile
+    from linguistica import ngram
+
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text(u'the cat sat on the mat . a dog ran .\n' * 200 +
+                           u'and then the dog sat on the cat .\n' * 200,
+                           encoding='utf8')
+    file_path = str(corpus_file)
+    temp_dir = tmpdir.mkdir('temp')
+    monkeypatch.setattr(tempfile, 'tempdir', str(temp_dir))
+
+    with open(file_path) as f:
+        expected_object = ngram.run(f)
+    test_object = ngram.run_parallel(file_path, n_jobs=2, memory_limit=200)
+    assert test_object == expected_object
+
+    # the workers leave no spilled tables behind
+    assert not temp_dir.listdir()
+
+
+def test_run_approximate(tmpdir):
+    from linguistica import ngram
+
+    corpus_file = tmpdir.join('corpus.txt')
+    corpus_file.write_text('the cat sat on the mat . the cat ran .\n' * 40 +
+                           'a dog sat on a log .\n' * 2, encoding='utf8')
+    file_path = str(corpus_file)
+
+    with open(file_path) as f:
+        _, expected_bigrams, expected_trigrams = ngram.run(f)
+    for n_jobs in (1, 2):
+        _, bigrams, trigrams = ngram.run_parallel(
+            file_path, n_jobs=n_jobs, memory_budget=1 << 16, min_count=3)
+        for estimated, expected in ((bigrams, expected_bigrams),
+                                    (trigrams, expected_trigrams)):
+            assert set(estimated) == {ngram_ for ngram_, count in
+                                      expected.items() if count >= 3}
+            assert all(estimated[ngram_] >= expected[ngram_]
+                       for ngram_ in estimated)
+
+
+def test_add_corpus(tmpdir):
+    old_text = 'the cats jumped . the dogs jumped and walked .\n' * 20
+    new_text = 'the cat walks . the dog walks and jumps .\n' * 20
+    for name, text in (('old', old_text), ('new', new_text),
+                       ('all', old_text + new_text)):
+        tmpdir.join(name + '.txt').write_text(text, encoding='utf8')
+
+    expected = lxa.read_corpus(str(tmpdir.join('all.txt')),
+                               min_stem_length=3, min_sig_count=1)
+
+    for counted_before in (True, False):
+        lxa_object = lxa.read_corpus(str(tmpdir.join('old.txt')),
+                                     min_stem_length=3, min_sig_count=1)
+        if counted_before:
+            bigram_counter = lxa_object.word_bigram_counter()
+            lxa_object.stems_to_words()
+        lxa_object.add_corpus(str(tmpdir.join('new.txt')))
+
+        if counted_before:
+            # updated in place
+            assert bigram_counter is lxa_object.word_bigram_counter()
+        assert lxa_object.word_unigram_counter() == \
+            expected.word_unigram_counter()
+        assert lxa_object.word_bigram_counter() == \
+            expected.word_bigram_counter()
+        assert lxa_object.word_trigram_counter() == \
+            expected.word_trigram_counter()
+        assert lxa_object.number_of_word_tokens() == \
+            expected.number_of_word_tokens()
+        assert lxa_object.wordlist() == expected.wordlist()
+        assert lxa_object.stems_to_words() == expected.stems_to_words()
+
+        lxa_object.reset()
+        assert lxa_object.word_trigram_counter() == \
+            expected.word_trigram_counter()
+
+    lxa_object = lxa.from_corpus(old_text)
+    lxa_object.add_corpus(new_text)
+    assert lxa_object.word_unigram_counter() == \
+        expected.word_unigram_counter()
+
+    # a mistyped path is not counted as a word of text
+    for path in (str(tmpdir.join('nwe.txt')), 'corpra/new.txt', 'new.txt'):
+        with pytest.raises(EnvironmentError):
+            lxa_object.add_corpus(path)
+    lxa_object.add_corpus(u'the cat jumps .')
+    assert lxa_object.word_unigram_counter()['jumps'] == \
+        expected.word_unigram_counter()['jumps'] + 1
+
+
+def test_read_corpus_directory(tmpdir):
+    import gzip
+    from linguistica import ngram
+
+    texts = ['the cat sat on the mat . the cat ran .\n' * 30,
+             'a dog sat on a log . the dog ran .\n' * 20,
+             'the cat and the dog sat .\n' * 10]
+    corpus_dir = tmpdir.mkdir('corpus')
+    corpus_dir.join('1.txt').write_text(texts[0], encoding='utf8')
+    with gzip.GzipFile(str(corpus_dir.join('2.txt.gz')), 'wb') as f:
+        f.write(texts[1].encode('utf8'))
+    corpus_dir.join('3.txt').write_text(texts[2], encoding='utf8')
+    all_file = tmpdir.join('all.txt')
+    all_file.write_text(''.join(texts), encoding='utf8')
+
+    with open(str(all_file)) as f:
+        expected_object = ngram.run(f)
+    for n_jobs in (1, 3):
+        assert ngram.run_parallel(str(corpus_dir), n_jobs=n_jobs) == \
+            expected_object
+
+    expected = lxa.read_corpus(str(all_file))
+    for path in (str(corpus_dir), str(corpus_dir.join('*.txt*'))):
+        lxa_object = lxa.read_corpus(path, n_jobs=2)
+        assert lxa_object.word_trigram_counter() == \
+            expected.word_trigram_counter()
+        assert lxa_object.wordlist() == expected.wordlist()
@@ -0,0 +1,120 @@
+# -*- encoding: utf8 -*-
+
+from collections import Counter
+
+import numpy as np
+
+from linguistica.ngram_table import (Vocabulary, WordNgramCounter, WordNgrams,
+                                     reduce_ngrams)
+
+lines = [['the', 'cat', 'sat', 'on', 'the', 'mat'],
+         ['the', 'dog'],
+         ['a'],
+         ['the', 'cat', 'sat', 'on', 'the', 'dog']]
+
+
+def expected_counters(lines_):
+    bigrams_counter = Counter()
+    trigrams_counter = Counter()
+    for words in lines_:
+        bigrams_counter.update(zip(*[words[i:] for i in range(2)]))
+        trigrams_counter.update(zip(*[words[i:] for i in range(3)]))
+    return dict(bigrams_counter), dict(trigrams_counter)
+
+
+def test_vocabulary():
+    vocabulary = Vocabulary()
+    assert vocabulary.encode(['b', 'a', 'b', 'c']) == [0, 1, 0, 2]
+    assert vocabulary.words() == ['b', 'a', 'c']
+    assert 'a' in vocabulary
+    assert len(vocabulary) == 3
+
+
+def test_reduce_ngrams():
+    for offset in (0, 2 ** 30):  # packed and byte-string sort keys
+        keys = np.array([[3, 1, 2], [1, 5, 0], [3, 1, 1], [1, 5, 0]],
+                        dtype=np.int32) + offset
+        counts = np.array([1, 2, 3, 4], dtype=np.int64)
+        keys, counts = reduce_ngrams(keys, counts)
+        assert (keys - offset).tolist() == [[1, 5, 0], [3, 1, 1], [3, 1, 2]]
+        assert counts.tolist() == [6, 3, 1]
+
+
+def test_word_ngram_counter():
+    expected_bigrams, expected_trigrams = expected_counters(lines)
+
+    for batch_size in (1, 2, 3, 100):
+        counter = WordNgramCounter(batch_size=batch_size)
+        for words in lines:
+            counter.add(words)
+        word_ngrams = counter.word_ngrams()
+
+        assert word_ngrams.unigram_counter() == \
+            dict(Counter(w for words in lines for w in words))
+        assert word_ngrams.bigram_counter() == expected_bigrams
+        assert word_ngrams.trigram_counter() == expected_trigrams
+
+
+def test_word_ngram_counter_running_text():
+    expected_bigrams, expected_trigrams = expected_counters(
+        [[w for words in lines for w in words]])
+
+    for batch_size in (1, 2, 3, 100):
+        counter = WordNgramCounter(batch_size=batch_size)
+        for i, words in enumerate(lines):
+            counter.add(words, new_line=not i)
+        word_ngrams = counter.word_ngrams()
+
+        assert word_ngrams.bigram_counter() == expected_bigrams
+        assert word_ngrams.trigram_counter() == expected_trigrams
+
+
+def test_word_ngrams_merge():
+    expected_bigrams, expected_trigrams = expected_counters(lines)
+
+    word_ngrams_list = list()
+    for words in lines:
+        counter = WordNgramCounter()
+        counter.add(words)
+        word_ngrams_list.append(counter.word_ngrams())
+    word_ngrams = WordNgrams.merge(word_ngrams_list)
+
+    assert word_ngrams.words == ['the', 'cat', 'sat', 'on', 'mat', 'dog', 'a']
+    assert word_ngrams.bigram_counter() == expected_bigrams
+    assert word_ngrams.trigram_counter() == expected_trigrams
+
+
+def test_word_ngram_counter_memory_limit(tmpdir):
+    expected_bigrams, expected_trigrams = expected_counters(lines * 5)
+
+    for batch_size in (1, 3, 100):
+        counter = WordNgramCounter(batch_size=batch_size, memory_limit=40,
+                                   temp_dir=str(tmpdir))
+        for words in lines * 5:
+            counter.add(words)
+        word_ngrams = counter.word_ngrams()
+
+        assert word_ngrams.bigram_counter() == expected_bigrams
+        assert word_ngrams.trigram_counter() == expected_trigrams
+        assert word_ngrams.unigram_counter() == \
+            dict(Counter(w for words in lines * 5 for w in words))
+
+
+def test_merge_sorted_ngrams():
+    from linguistica.ngram_table import merge_sorted_ngrams
+
+    for offset in (0, 2 ** 30):  # packed and byte-string sort keys
+        runs = [(np.array([[1, 2, 3], [1, 5, 0], [4, 0, 0]]) + offset,
+                 np.array([1, 2, 3])),
+                (np.array([[0, 9, 9], [1, 5, 0], [4, 0, 1]]) + offset,
+                 np.array([10, 20, 30])),
+                (np.zeros((0, 3), dtype=np.int32), np.zeros(0))]
+        out_keys = np.zeros((6, 3), dtype=np.int32)
+        out_counts = np.zeros(6, dtype=np.int64)
+        n_bits = 31 if offset else 4
+        n_merged = merge_sorted_ngrams(3, runs, out_keys, out_counts, n_bits,
+                                       block_size=1)
+        assert n_merged == 5
+        assert (out_keys[:n_merged] - offset).tolist() == \
+            [[0, 9, 9], [1, 2, 3], [1, 5, 0], [4, 0, 0], [4, 0, 1]]
+        assert out_counts[:n_merged].tolist() == [10, 1, 22, 3, 30]
@@ -1,5 +1,7 @@
 # -*- encoding: utf8 -*-
 
+from __future__ import division
+
 import os
 
 import linguistica as lxa
@@ -60,3 +62,107 @@ def test_word_phonology_dict():
     lxa_object = lxa.read_corpus(corpus_path, max_word_tokens=50000)
     lxa_object.word_phonology_dict()
     # TODO: only testing if there are errors for now...
+
+
+def test_make_word_ngrams():
+    from linguistica.phon import (encode_phones, make_word_ngrams)
+    phones, ids, offsets = encode_phones(['ab', 'b'])
+    assert phones == ['#', 'a', 'b']
+    assert ids.tolist() == [0, 1, 2, 0, 0, 2, 0]
+    assert offsets.tolist() == [0, 4, 7]
+
+    unigrams, bigrams, trigrams = make_word_ngrams({'ab': 2, 'b': 1})
+    assert unigrams == {'#': 6, 'a': 2, 'b': 3}
+    assert bigrams == {('#', 'a'): 2, ('a', 'b'): 2, ('b', '#'): 3,
+                       ('#', 'b'): 1}
+    assert trigrams == {('#', 'a', 'b'): 2, ('a', 'b', '#'): 2,
+                        ('#', 'b', '#'): 1}
+
+    words_to_phones = {'ab': ['AH', 'B'], 'b': ['B']}
+    unigrams, bigrams, trigrams = make_word_ngrams({'ab': 2, 'b': 1},
+                                                   words_to_phones)
+    assert unigrams == {'#': 6, 'AH': 2, 'B': 3}
+    assert trigrams[('#', 'AH', 'B')] == 2
+
+    # read-only views of the bigram and trigram arrays
+    assert ('B', '#') in bigrams
+    assert ('#', 'B', '#', 'B') not in trigrams
+    assert ('#', 'X') not in bigrams
+    assert 'AH' not in bigrams
+    assert bigrams.get(('B', 'AH')) is None
+    assert sorted(bigrams.values()) == [1, 2, 2, 3]
+    assert dict(trigrams.items()) == {('#', 'AH', 'B'): 2, ('AH', 'B', '#'): 2,
+                                      ('#', 'B', '#'): 1}
+
+    # words without phones, and no trigrams across words
+    unigrams, bigrams, trigrams = make_word_ngrams({'a': 1, 'b': 1},
+                                                   {'a': [], 'b': ['B']})
+    assert bigrams == {('#', '#'): 1, ('#', 'B'): 1, ('B', '#'): 1}
+    assert trigrams == {('#', 'B', '#'): 1}
+
+
+def test_word_phonology():
+    from linguistica.phon import (Word, make_biphone_dict, make_phone_dict,
+                                  make_word_dict, make_word_ngrams, plog)
+    word_unigram_counter = {'ab': 2, 'b': 1}
+    unigrams, bigrams, _ = make_word_ngrams(word_unigram_counter)
+    phone_dict = make_phone_dict(unigrams)
+    biphone_dict = make_biphone_dict(bigrams, phone_dict)
+    word_dict = make_word_dict(word_unigram_counter, phone_dict, biphone_dict)
+
+    assert sorted(word_dict) == ['ab', 'b']
+    assert 'a' not in word_dict
+
+    word = word_dict['ab']
+    assert word.spelling == 'ab'
+    assert word.phones == ['#', 'a', 'b', '#']
+    assert word.count == 2
+    assert word.frequency == 2 / 3
+
+    unigram_plog = plog(2 / 11) + plog(3 / 11) + plog(6 / 11)
+    assert abs(word.unigram_plog - unigram_plog) < 1e-9
+    assert abs(word.avg_unigram_plog - unigram_plog / 3) < 1e-9
+
+    bigram_plog = unigram_plog - sum(biphone_dict[biphone].MI for biphone in
+                                     [('#', 'a'), ('a', 'b'), ('b', '#')])
+    assert abs(word.bigram_plog - bigram_plog) < 1e-9
+    assert abs(word.avg_bigram_plog - bigram_plog / 3) < 1e-9
+
+    # a Word made on its own, as before
+    word = Word('ab', ['#', 'a', 'b', '#'], 2, 2 / 3, phone_dict,
+                biphone_dict)
+    assert word.phones == ['#', 'a', 'b', '#']
+    assert word.count == 2
+    assert word.frequency == 2 / 3
+    assert abs(word.unigram_plog - unigram_plog) < 1e-9
+    assert abs(word.avg_bigram_plog - bigram_plog / 3) < 1e-9
+
+    # slotted records, without a __dict__ each
+    assert biphone_dict[('a', 'b')].spelling == ('a', 'b')
+    for record in (phone_dict['a'], biphone_dict[('a', 'b')], word):
+        assert not hasattr(record, '__dict__')
+
+
+def test_score_phonotactics():
+    lxa_object = lxa.from_wordlist(['ab', 'b', 'bab'])
+    word_dict = lxa_object.word_phonology_dict()
+
+    words = list(word_dict)
+    scores = list(lxa_object.score_phonotactics(iter(words), batch_size=1))
+    assert [word for word, _, _ in scores] == words
+    for word, unigram_plog, bigram_plog in scores:
+        assert abs(unigram_plog - word_dict[word].unigram_plog) < 1e-9
+        assert abs(bigram_plog - word_dict[word].bigram_plog) < 1e-9
+
+    # unseen phones, and the unseen biphones of seen phones
+    phonology = word_dict.phonology
+    (_, unigram_plog, bigram_plog), = lxa_object.score_phonotactics(['zz'])
+    assert phonology.phones[0] == '#'
+    assert abs(unigram_plog - (2 * phonology.unseen_phone_plog +
+                               phonology.phone_plogs[0])) < 1e-9
+    assert unigram_plog == bigram_plog
+
+    (phones, unigram_plog, _), = lxa_object.score_phonotactics(
+        [['b', 'a']], unseen_phone_plog=0)
+    assert phones == ['b', 'a']
+    assert unigram_plog > 0
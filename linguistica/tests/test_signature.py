@@ -1,9 +1,12 @@
 # -*- encoding: utf8 -*-
 
 import os
+from itertools import combinations
 
 import linguistica as lxa
+from linguistica import signature
 from linguistica.datasets import brown as corpus_path
+from linguistica.util import NULL
 
 data_dir = os.path.join(os.path.dirname(__file__), 'data')
 
@@ -105,3 +108,189 @@ def test_stems():
     expected_object_path = os.path.join(data_dir, 'stems_to_words.txt')
     expected_object = set(eval(open(expected_object_path).read()).keys())
     assert test_object == expected_object
+
+
+def make_bisignatures_pairwise(wordlist, min_stem_length, max_affix_length,
+                               suffixing):
+    # reference implementation: all pairs of words with a common stem
+    bisigs_to_tuples = dict()
+    wordlist = [word for word in wordlist if len(word) >= min_stem_length]
+    if suffixing:
+        wordlist = sorted(wordlist)
+    else:
+        wordlist = sorted(wordlist, key=lambda x: x[::-1])
+
+    for word1, word2 in combinations(wordlist, 2):
+        if suffixing:
+            stem = signature.max_common_prefix(word1, word2)
+            affix1 = word1[len(stem):]
+            affix2 = word2[len(stem):]
+        else:
+            stem = signature.max_common_suffix(word1, word2)
+            affix1 = word1[: len(word1) - len(stem)]
+            affix2 = word2[: len(word2) - len(stem)]
+
+        if len(stem) < min_stem_length or \
+                len(affix1) > max_affix_length or \
+                len(affix2) > max_affix_length:
+            continue
+
+        bisig = tuple({affix1 or NULL, affix2 or NULL})
+        if bisig not in bisigs_to_tuples:
+            bisigs_to_tuples[bisig] = set()
+        bisigs_to_tuples[bisig].add((stem, word1, word2))
+
+    return bisigs_to_tuples
+
+
+def test_make_bisignatures():
+    wordlist = ['jump', 'jumps', 'jumped', 'jumping', 'jumper', 'jumpers',
+                'walk', 'walks', 'walked', 'walking', 'walker', 'walkers',
+                'talk', 'talks', 'talked', 'stalk', 'stalks', 'stalked',
+                'wall', 'walls', 'walled', 'unwalled', 'rejump', 'rejumped',
+                'a', 'an', 'the', 'then', 'there', 'jumpy']
+
+    for suffixing in (1, 0):
+        for min_stem_length in (1, 2, 4):
+            for max_affix_length in (0, 1, 3, 10):
+                test_object = signature.make_bisignatures(
+                    wordlist, min_stem_length, max_affix_length, suffixing)
+                expected_object = make_bisignatures_pairwise(
+                    wordlist, min_stem_length, max_affix_length, suffixing)
+                assert test_object == expected_object
+
+
+def test_signatures_parallel():
+    wordlist = ['jump', 'jumps', 'jumped', 'jumping', 'walk', 'walks',
+                'walked', 'walking', 'talk', 'talks', 'talked', 'talking',
+                'stalk', 'stalks', 'stalked', 'wall', 'walls', 'walled',
+                'play', 'plays', 'played', 'playing', 'pray', 'prays',
+                'prayed', 'praying', 'the', 'then', 'there', 'jumpy']
+
+    for suffixing in (1, 0):
+        expected_object = signature.make_bisignatures(wordlist, 3, 4,
+                                                      suffixing)
+        test_object = signature.make_bisignatures(wordlist, 3, 4, suffixing,
+                                                  n_jobs=2)
+        assert test_object == expected_object
+
+    expected = lxa.from_wordlist(wordlist, min_stem_length=3,
+                                 min_sig_count=2)
+    test = lxa.from_wordlist(wordlist, n_jobs=2, min_stem_length=3,
+                             min_sig_count=2)
+    assert test.stems_to_words() == expected.stems_to_words()
+    assert test.signatures_to_stems() == expected.signatures_to_stems()
+    assert test.words_to_sigtransforms() == expected.words_to_sigtransforms()
+
+
+def test_make_stems_to_words_count_first():
+    wordlist = ['jump', 'jumps', 'jumped', 'jumping', 'walk', 'walks',
+                'walked', 'walking', 'talk', 'talks', 'talked', 'stalk',
+                'stalks', 'wall', 'walls', 'walled', 'play', 'plays',
+                'played', 'the', 'then', 'there', 'jumpy']
+    # repeated words make the counts of the first pass upper bounds
+    wordlist_with_repeats = wordlist + ['walk', 'walk', 'the']
+
+    for words in (wordlist, wordlist_with_repeats):
+        for parameters in ((3, 4, 1), (2, 3, 0), (4, 1, 1)):
+            for min_sig_count in (1, 2, 3, 6):
+                expected_object = signature.make_stems_to_words(
+                    words, *parameters, min_sig_count=min_sig_count)
+                test_object = signature.make_stems_to_words(
+                    words, *parameters, min_sig_count=min_sig_count,
+                    count_first=True)
+                assert test_object == expected_object
+
+    test_object = signature.make_stems_to_words(wordlist, 3, 4, 1, 2,
+                                                n_jobs=2, count_first=True)
+    assert test_object == signature.make_stems_to_words(wordlist, 3, 4, 1, 2)
+
+    bisigs_to_tuples = signature.make_bisignatures(wordlist, 3, 4, 1,
+                                                   min_count=3)
+    assert all(len(tuples) >= 3 for tuples in bisigs_to_tuples.values())
+
+    expected = lxa.from_wordlist(wordlist, min_sig_count=2)
+    test = lxa.from_wordlist(wordlist, min_sig_count=2,
+                             count_bisignatures_first=True)
+    assert test.stems_to_words() == expected.stems_to_words()
+    assert test.signatures_to_stems() == expected.signatures_to_stems()
+
+
+def make_all_signature_objects(wordlist, min_stem_length, max_affix_length,
+                               suffixing, min_sig_count):
+    stems_to_words = signature.make_stems_to_words(
+        wordlist, min_stem_length, max_affix_length, suffixing, min_sig_count)
+    signatures_to_stems = signature.make_signatures_to_stems(
+        stems_to_words, max_affix_length, min_sig_count, suffixing)
+    stems_to_signatures = signature.make_stems_to_signatures(
+        signatures_to_stems)
+    words_to_signatures = signature.make_words_to_signatures(
+        stems_to_words, stems_to_signatures)
+    affixes_to_signatures = signature.make_affixes_to_signatures(
+        set(signatures_to_stems))
+    return {'stems_to_words': stems_to_words,
+            'signatures_to_stems': signatures_to_stems,
+            'stems_to_signatures': stems_to_signatures,
+            'words_to_signatures': words_to_signatures,
+            'signatures_to_words': signature.make_signatures_to_words(
+                words_to_signatures),
+            'words_to_sigtransforms': signature.make_words_to_sigtransforms(
+                words_to_signatures, suffixing),
+            'signatures': set(signatures_to_stems),
+            'affixes_to_signatures': affixes_to_signatures,
+            'words_in_signatures': set(words_to_signatures),
+            'affixes': set(affixes_to_signatures),
+            'stems': set(stems_to_words)}
+
+
+def test_incremental_signatures():
+    stems = ['jump', 'walk', 'talk', 'stalk', 'wall', 'play', 'pray', 'call',
+             'fall', 'kick', 'lick', 'pick', 'park', 'bark', 'mark', 'work']
+    suffixes = ['', 's', 'ed', 'ing', 'er', 'ers']
+    words = sorted(stem + suffix for stem in stems for suffix in suffixes)
+    # words added and removed, in a few steps
+    wordlists = [words[::2], words[::2] + words[1::4], words[1::3],
+                 words, words[:40], []]
+
+    for parameters in ((4, 4, 1, 3), (3, 3, 1, 2), (2, 4, 0, 2)):
+        incremental_signatures = signature.IncrementalSignatures(*parameters)
+
+        for wordlist in wordlists:
+            incremental_signatures.update(wordlist)
+            expected_objects = make_all_signature_objects(wordlist,
+                                                          *parameters)
+            for name, expected_object in expected_objects.items():
+                assert getattr(incremental_signatures, name) == \
+                    expected_object
+
+        # patched in place after the first update
+        incremental_signatures.update(words)
+        stems_to_words = incremental_signatures.stems_to_words
+        incremental_signatures.update(words[5:])
+        assert incremental_signatures.stems_to_words is stems_to_words
+
+
+def test_add_corpus_signatures():
+    old_text = 'jumps jumped walks walked talking talks talked walk\n' * 5
+    new_text = 'jumping jump walking talk calls called calling call\n' * 5
+    expected = lxa.from_corpus(old_text + new_text, min_stem_length=3,
+                               min_sig_count=2)
+
+    lxa_object = lxa.from_corpus(old_text, min_stem_length=3,
+                                 min_sig_count=2)
+    signatures_to_stems = lxa_object.signatures_to_stems()
+    lxa_object.add_corpus(new_text)
+
+    assert lxa_object.signatures_to_stems() == expected.signatures_to_stems()
+    assert lxa_object.signatures_to_stems() is signatures_to_stems
+    assert lxa_object.words_to_sigtransforms() == \
+        expected.words_to_sigtransforms()
+    assert lxa_object.affixes_to_signatures() == \
+        expected.affixes_to_signatures()
+
+    # another parameter makes the signatures from scratch
+    lxa_object.change_parameters(min_sig_count=1)
+    lxa_object.add_corpus(u'')
+    assert lxa_object.signatures_to_stems() == lxa.from_corpus(
+        old_text + new_text, min_stem_length=3,
+        min_sig_count=1).signatures_to_stems()
@@ -0,0 +1,107 @@
+# -*- encoding: utf8 -*-
+
+import pickle
+
+import linguistica as lxa
+from linguistica import signature
+from linguistica.signature_store import (SignatureStore, StringTable)
+
+wordlist = ['jump', 'jumped', 'jumping', 'jumps', 'walk', 'walked', 'walking',
+            'walks', 'talk', 'talked', 'talks', 'cat', 'cats', 'dog', 'dogs',
+            u'café', u'cafés', 'the']
+
+object_names = ['stems_to_words', 'signatures_to_stems', 'stems_to_signatures',
+                'words_to_signatures', 'signatures_to_words',
+                'words_to_sigtransforms', 'affixes_to_signatures',
+                'signatures', 'words_in_signatures', 'affixes', 'stems']
+
+
+def test_string_table():
+    table = StringTable([u'b', u'a', u'café', u'b', u'caf'])
+    assert list(table) == [u'a', u'b', u'caf', u'café']
+    assert [table.index(string) for string in table] == [0, 1, 2, 3]
+    assert table[3] == u'café'
+    assert table.index(u'c') == -1
+    assert table.index(u'z') == -1
+    assert table.index(('a',)) == -1
+
+
+def test_signature_store():
+    signatures = signature.IncrementalSignatures(3, 3, True, 1)
+    signatures.update(wordlist)
+
+    store = SignatureStore()
+    views = [getattr(store, name) for name in object_names]
+    store.load(signatures.stems_to_words, signatures.signatures_to_stems,
+               signatures.words_to_sigtransforms)
+
+    for name in object_names:
+        assert getattr(store, name) == getattr(signatures, name)
+
+    # views read the arrays of the store as it is now
+    assert [getattr(store, name) for name in object_names] == views
+    assert all(getattr(store, name) is view
+               for name, view in zip(object_names, views))
+
+    sigtransforms = store.words_to_sigtransforms['talked']
+    assert sigtransforms == {(('NULL', 'ed', 's'), 'NULL')}
+    assert (('NULL', 'ed', 's'), 'ed') not in sigtransforms
+    assert 'talk' in store.words_in_signatures
+    assert 'the' not in store.words_in_signatures
+    assert 'walk' not in store.stems_to_words['jump']
+    assert 'the' not in store.words_to_signatures
+    assert dict(store.stems_to_words.items()) == signatures.stems_to_words
+
+    store = pickle.loads(pickle.dumps(store))
+    assert store.stems_to_signatures == signatures.stems_to_signatures
+
+    store.load(dict(), dict(), dict())
+    assert not store.stems_to_words
+    assert not store.signatures
+
+
+def test_lexicon_signature_store():
+    lxa_object = lxa.from_wordlist(wordlist, min_stem_length=3,
+                                   max_affix_length=3, min_sig_count=1)
+    signatures = signature.IncrementalSignatures(3, 3, True, 1)
+    signatures.update(lxa_object.wordlist())
+
+    for name in object_names:
+        assert getattr(lxa_object, name)() == getattr(signatures, name)
+
+
+def test_signature_store_queries():
+    signatures = signature.IncrementalSignatures(3, 3, True, 1)
+    signatures.update(wordlist)
+    store = SignatureStore()
+    store.load(signatures.stems_to_words, signatures.signatures_to_stems,
+               signatures.words_to_sigtransforms)
+
+    # as if by scanning signatures_to_stems
+    queries = [(), ('ed',), 'ed', ('NULL', 's'), ('ed', 'ing'),
+               ('ed', 'ing', 'NULL', 's'), ('s', 'x'), ('x',), ['s', 's']]
+    for affixes in queries:
+        affix_set = {affixes} if isinstance(affixes, str) else set(affixes)
+        assert store.signatures_containing(affixes) == \
+            {sig for sig in signatures.signatures if affix_set <= set(sig)}
+        assert store.signatures_contained_in(affixes) == \
+            {sig for sig in signatures.signatures if set(sig) <= affix_set}
+        assert store.stems_containing(affixes) == \
+            {stem for sig, stems in signatures.signatures_to_stems.items()
+             if affix_set <= set(sig) for stem in stems}
+        assert store.stems_contained_in(affixes) == \
+            {stem for sig, stems in signatures.signatures_to_stems.items()
+             if set(sig) <= affix_set for stem in stems}
+
+    assert 'jump' in store.stems_containing(('ed', 'ing'))
+    assert 'talk' not in store.stems_containing(('ed', 'ing'))
+
+    lxa_object = lxa.from_wordlist(wordlist, min_stem_length=3,
+                                   max_affix_length=3, min_sig_count=1)
+    assert lxa_object.stems_with_affixes(('ed', 'ing')) == {'jump', 'walk'}
+    assert lxa_object.signatures_with_affixes('ing') == \
+        {('NULL', 'ed', 'ing', 's')}
+    assert lxa_object.stems_within_affixes(('NULL', 'ed', 's', 'x')) == {
+        'talk', 'cat', 'dog', u'café'}
+    assert lxa_object.signatures_within_affixes(('NULL', 's')) == \
+        store.signatures_contained_in(('NULL', 's'))
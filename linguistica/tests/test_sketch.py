@@ -0,0 +1,108 @@
+# -*- encoding: utf8 -*-
+
+from collections import Counter
+
+import numpy as np
+
+from linguistica.ngram_table import (HeavyHitters, WordNgramCounter,
+                                     WordNgrams)
+from linguistica.sketch import (CountMinSketch, hash_words)
+
+# a Zipf-like corpus: a few frequent word types and many rare ones
+random_state = np.random.RandomState(0)
+lines = [['w%d' % i for i in random_state.zipf(1.5, size=20) % 500]
+         for _ in range(300)]
+
+
+def true_counts(lines_, order):
+    counter = Counter()
+    for words in lines_:
+        counter.update(zip(*[words[i:] for i in range(order)]))
+    return counter
+
+
+def test_hash_words():
+    hash_values = hash_words(['a', 'b', 'a'])
+    assert hash_values.dtype == np.uint64
+    assert hash_values[0] == hash_values[2] != hash_values[1]
+
+
+def test_count_min_sketch():
+    sketch = CountMinSketch(2, width=50)
+    key_hashes = hash_words(['w%d' % i for i in range(200)]).reshape(-1, 2)
+    counts = np.arange(1, 101, dtype=np.int64)
+    sketch.add(key_hashes, counts)
+
+    estimates = sketch.estimate(key_hashes)
+    epsilon, _ = sketch.error_bound()
+    assert np.all(estimates >= counts)
+    assert np.mean(estimates - counts <= epsilon * counts.sum()) > 0.9
+
+    other = CountMinSketch(2, width=50)
+    other.add(key_hashes, counts)
+    sketch.merge(other)
+    assert np.all(sketch.estimate(key_hashes) >= 2 * counts)
+    assert sketch.total_count == 2 * counts.sum()
+
+
+def test_heavy_hitters_capacity():
+    heavy_hitters = HeavyHitters(2, memory_budget=1000, min_count=1)
+    assert heavy_hitters.capacity == (1000 - 750) // 16
+    word_hashes = hash_words(['w%d' % i for i in range(100)])
+    keys = np.arange(100, dtype=np.int32).reshape(-1, 2)
+    heavy_hitters.update(keys, np.arange(50, dtype=np.int64) + 1,
+                         word_hashes)
+    assert len(heavy_hitters.keys) == heavy_hitters.capacity
+
+
+def test_approximate_word_ngram_counter():
+    for memory_budget, min_count in ((1 << 20, 1), (1 << 18, 3)):
+        counter = WordNgramCounter(batch_size=100,
+                                   memory_budget=memory_budget,
+                                   min_count=min_count)
+        for words in lines:
+            counter.add(words)
+        word_ngrams = counter.word_ngrams()
+        assert word_ngrams.is_approximate()
+        assert word_ngrams.unigram_counter() == \
+            dict(Counter(w for words in lines for w in words))
+
+        bounds = word_ngrams.error_bounds()
+        for order, estimated in ((2, word_ngrams.bigram_counter()),
+                                 (3, word_ngrams.trigram_counter())):
+            expected = true_counts(lines, order)
+            epsilon, _, n_ngrams = bounds[order]
+            assert n_ngrams == sum(expected.values())
+
+            # no heavy hitter is missed, and no count is underestimated
+            for ngram, count in expected.items():
+                if count >= min_count:
+                    assert estimated[ngram] >= count
+            assert all(count >= min_count for count in estimated.values())
+            assert all(count >= expected[ngram]
+                       for ngram, count in estimated.items())
+
+            errors = [count - expected[ngram]
+                      for ngram, count in estimated.items()]
+            assert np.mean(np.array(errors) <= epsilon * n_ngrams) > 0.9
+
+
+def test_merge_approximate():
+    word_ngrams_list = list()
+    for lines_ in (lines[:100], lines[100:]):
+        counter = WordNgramCounter(memory_budget=1 << 20, min_count=1)
+        for words in lines_:
+            counter.add(words)
+        word_ngrams_list.append(counter.word_ngrams())
+    merged = WordNgrams.merge(word_ngrams_list, min_count=2)
+
+    assert merged.unigram_counter() == \
+        dict(Counter(w for words in lines for w in words))
+
+    # the trigrams split across the two objects are found, too
+    estimated = merged.trigram_counter()
+    expected = true_counts(lines, 3)
+    assert all(estimated[ngram] >= count
+               for ngram, count in expected.items() if count >= 2)
+    assert all(count >= 2 for count in estimated.values())
+    assert merged.error_bounds()[3][2] == sum(expected.values())
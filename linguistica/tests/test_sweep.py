@@ -0,0 +1,59 @@
+# -*- encoding: utf8 -*-
+
+import pytest
+
+import linguistica as lxa
+from linguistica import sweep
+
+stems = ['jump', 'walk', 'talk', 'stalk', 'wall', 'play', 'pray', 'call',
+         'fall', 'kick', 'lick', 'pick', 'park', 'bark', 'mark', 'work']
+suffixes = ['', 's', 'ed', 'ing', 'er', 'ers']
+wordlist = sorted(stem + suffix for stem in stems for suffix in suffixes) + \
+    ['the', 'then', 'there', 'unpick', 'unmark']
+
+grid = {'min_stem_length': [2, 3, 4], 'max_affix_length': [1, 2, 4],
+        'min_sig_count': [1, 3], 'suffixing': [1, 0]}
+
+
+def test_run():
+    lxa_object = lxa.from_wordlist(wordlist)
+    rows = lxa_object.sweep(grid)
+    assert len(rows) == 3 * 3 * 2 * 2
+
+    for row in rows:
+        parameters = {parameter: row[parameter] for parameter in grid}
+        expected = lxa.from_wordlist(wordlist, **parameters)
+        assert row['stems'] == len(expected.stems())
+        assert row['signatures'] == len(expected.signatures())
+        assert row['affixes'] == len(expected.affixes())
+        assert row['words_in_signatures'] == \
+            len(expected.words_in_signatures())
+
+    # the same in parallel, and the parameters are not changed
+    parallel_rows = lxa_object.sweep(grid, n_jobs=2)
+    assert [{key: value for key, value in row.items() if key != 'seconds'}
+            for row in parallel_rows] == \
+        [{key: value for key, value in row.items() if key != 'seconds'}
+         for row in rows]
+    assert lxa_object.parameters() == lxa.from_wordlist(wordlist).parameters()
+
+    with pytest.raises(KeyError):
+        lxa_object.sweep({'n_neighbors': [5, 9]})
+
+
+def test_main(tmpdir, capsys):
+    wordlist_file = tmpdir.join('wordlist.txt')
+    wordlist_file.write_text(u'\n'.join(wordlist) + u'\n', encoding='utf8')
+
+    sweep.main([str(wordlist_file), '--wordlist', '--min-stem-length', '3',
+                '4', '--min-sig-count', '2'])
+    out, _ = capsys.readouterr()
+    lines = out.splitlines()
+    assert lines[0].split('\t')[:4] == ['max_affix_length', 'min_sig_count',
+                                        'min_stem_length', 'suffixing']
+    assert len(lines) == 3
+
+    output_file = tmpdir.join('table.tsv')
+    sweep.main([str(wordlist_file), '--wordlist', '--max-affix-length', '2',
+                '3', '--output', str(output_file)])
+    assert output_file.read_text(encoding='utf8').count('\n') == 3
@@ -3,6 +3,7 @@
 import os
 
 import linguistica as lxa
+from linguistica import trie
 from linguistica.datasets import brown as corpus_path
 
 data_dir = os.path.join(os.path.dirname(__file__), 'data')
@@ -44,3 +45,30 @@ def test_predecessors():
     expected_object_path = os.path.join(data_dir, 'predecessors.txt')
     expected_object = eval(open(expected_object_path).read())
     assert test_object == expected_object
+
+
+def test_find_breaks():
+    wordlist = ['jump', 'jumped', 'jumper', 'jumps', 'walk', 'walked',
+                'walks', 'wall']
+    assert trie.lcp_array(wordlist) == [0, 4, 5, 4, 0, 4, 4, 3]
+    assert sorted(trie.lcp_intervals(trie.lcp_array(wordlist))) == \
+        [(0, 0, 7), (3, 4, 7), (4, 0, 3), (4, 4, 6), (5, 1, 2)]
+    assert trie.find_breaks(wordlist, 3) == \
+        {0: {4}, 1: {4, 5}, 2: {4, 5}, 3: {4}, 4: {3, 4}, 5: {3, 4},
+         6: {3, 4}, 7: {3}}
+    assert trie.find_breaks(wordlist, 5) == \
+        {0: set(), 1: {5}, 2: {5}, 3: set(), 4: set(), 5: set(), 6: set(),
+         7: set()}
+
+    # only the first run of words with a prefix counts if not sorted
+    wordlist = ['jumps', 'jumped', 'walk', 'jumper', 'jump']
+    assert trie.find_breaks(wordlist, 3) == \
+        {0: {4}, 1: {4}, 2: set(), 3: set(), 4: set()}
+
+
+def test_break_words():
+    wordlist = ['jumped', 'jump', 'walks', '']
+    break_dict = {0: {5, 4}, 1: {4}, 2: set(), 3: {0}}
+    assert trie.break_words(wordlist, break_dict) == \
+        {'jumped': ['jump', 'e', 'd'], 'jump': ['jump'], 'walks': ['walks'],
+         '': []}
@@ -0,0 +1,69 @@
+# -*- encoding: utf8 -*-
+
+import pickle
+
+import linguistica as lxa
+from linguistica import trie
+from linguistica.trie_store import (BrokenWordsView, PieceTrie,
+                                    SuccessorsView)
+from linguistica.util import NULL
+
+wordlist = ['jump', 'jumped', 'jumper', 'jumps', 'walk', 'walked', 'walks',
+            'wall', 'walls', u'café', u'cafés', 'the']
+
+
+def test_piece_trie():
+    broken_words = trie.break_words(wordlist,
+                                    trie.find_breaks(wordlist, 3))
+    piece_trie = PieceTrie(wordlist, broken_words)
+
+    node = piece_trie.index('jump')
+    assert piece_trie.label(node) == 'jump'
+    assert piece_trie.successors(node) == [NULL, 'e', 's']
+    assert [piece_trie.label(child)
+            for child in piece_trie.children(node)] == ['jumpe', 'jumps']
+    assert piece_trie.index('jum') == -1
+    assert piece_trie.index(3) == -1
+
+    successors = SuccessorsView(piece_trie)
+    assert successors == trie.get_successors(wordlist, broken_words)
+    assert successors['wal'] == {'k', 'l'}
+    assert 'ed' in successors['walk']
+    assert 'e' not in successors['walk']
+    assert NULL not in successors['wal']
+    assert 'wa' not in successors
+
+    successors = pickle.loads(pickle.dumps(successors))
+    assert successors == trie.get_successors(wordlist, broken_words)
+
+
+def test_predecessors():
+    reversed_wordlist = sorted(word[::-1] for word in wordlist)
+    broken_words = trie.break_words(reversed_wordlist,
+                                    trie.find_breaks(reversed_wordlist, 3))
+    expected = trie.reverse_direction(
+        trie.get_successors(reversed_wordlist, broken_words))
+
+    predecessors = SuccessorsView(PieceTrie(reversed_wordlist, broken_words),
+                                  reverse=True)
+    assert predecessors == expected
+    assert dict(predecessors.items()) == expected
+
+    lxa_object = lxa.from_wordlist(wordlist, min_stem_length=3)
+    assert lxa_object.predecessors() == expected
+
+
+def test_broken_words_view():
+    reversed_wordlist = sorted(word[::-1] for word in wordlist)
+    broken_words = trie.break_words(reversed_wordlist,
+                                    trie.find_breaks(reversed_wordlist, 2))
+    expected = trie.reverse_direction(broken_words, is_list=True)
+
+    broken_words_view = BrokenWordsView(broken_words)
+    assert broken_words_view == expected
+    assert broken_words_view['jumped'] == ['jump', 'ed']
+    assert 'jumped' in broken_words_view
+    assert 'depmuj' not in broken_words_view
+
+    lxa_object = lxa.from_wordlist(wordlist, min_stem_length=2)
+    assert lxa_object.broken_words_right_to_left() == expected
@@ -1,8 +1,29 @@
 # -*- encoding: utf8 -*-
 
-from linguistica.util import vprint
+from linguistica.util import (Tokenizer, fix_punctuations, vprint)
 
 
 def test_vprint():
     assert vprint(False, 'x') is None
     assert vprint(True, 'x') is None
+
+
+def test_tokenizer():
+    lines = [u'The cat (a big one) sat on the mat.',
+             u'  Did\tthe dog see it?Yes;no: maybe!  ',
+             u'ΟΔΟΣ.ΟΔΟΣ',
+             u'']
+    for line in lines:
+        expected_object = fix_punctuations(line).strip().lower().split()
+        assert Tokenizer()(line) == expected_object
+
+        expected_object = fix_punctuations(line).strip().split()
+        assert Tokenizer(keep_case=True)(line) == expected_object
+
+
+def test_tokenizer_punctuations():
+    line = u'Self-taught, e.g. here'
+    assert Tokenizer(punctuations=u'-')(line) == \
+        [u'self', u'-', u'taught,', u'e.g.', u'here']
+    assert Tokenizer(punctuations=u'')(line) == \
+        [u'self-taught,', u'e.g.', u'here']
@@ -0,0 +1,141 @@
+# -*- encoding: utf8 -*-
+
+import os
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+import linguistica as lxa
+from linguistica import (lexicon, wordlist_file)
+from linguistica.cache import (ResultCache, main)
+from linguistica.wordlist_file import (SUFFIX, CompiledWordlist, compiled_key,
+                                       parse_wordlist, read_wordlist_file)
+
+lines = [u'# comment', u'', u'ABANDON 18 AH0 B AE1 N D AH0 N',
+         u'Abandoned 26 AH0 B AE1 N D AH0 N D', u'cat', u'dogs 3',
+         u'café 2 K AE0 F EY1']
+
+
+def write_wordlist(file_path, lines_):
+    with open(file_path, 'w', encoding='utf8') as f:
+        f.write(u'\n'.join(lines_) + u'\n')
+
+
+def test_parse_wordlist():
+    word_freq_dict, words_to_phones = parse_wordlist(lines)
+    assert list(word_freq_dict) == ['abandon', 'abandoned', 'cat', 'dogs',
+                                    u'café']
+    assert word_freq_dict['cat'] == 1
+    assert word_freq_dict['dogs'] == 3
+    assert words_to_phones['dogs'] == ['d', 'o', 'g', 's']
+    assert words_to_phones[u'café'] == ['K', 'AE0', 'F', 'EY1']
+
+    word_freq_dict, _ = parse_wordlist(lines, keep_case=True)
+    assert 'ABANDON' in word_freq_dict
+
+
+def test_compiled_wordlist(tmpdir):
+    word_freq_dict, words_to_phones = parse_wordlist(lines)
+    file_path = os.path.join(str(tmpdir), 'words.lxw')
+    CompiledWordlist.from_dicts(word_freq_dict, words_to_phones).save(
+        file_path)
+
+    wordlist = CompiledWordlist.load(file_path)
+    assert wordlist.words() == list(word_freq_dict)
+    assert wordlist.word_unigram_counter() == word_freq_dict
+    assert wordlist.words_to_phones() == words_to_phones
+    assert dict(wordlist.words_to_phones().items()) == words_to_phones
+    assert 'cats' not in wordlist.words_to_phones()
+
+    empty_path = os.path.join(str(tmpdir), 'empty.lxw')
+    CompiledWordlist.from_dicts(dict(), dict()).save(empty_path)
+    assert CompiledWordlist.load(empty_path).word_unigram_counter() == dict()
+
+
+def test_read_wordlist_file(tmpdir):
+    file_path = os.path.join(str(tmpdir), 'words.txt')
+    cache = ResultCache(os.path.join(str(tmpdir), 'cache'))
+    write_wordlist(file_path, lines)
+    compiled_path = cache.get_file(compiled_key(file_path), SUFFIX)
+    assert compiled_path is None
+
+    wordlist = read_wordlist_file(file_path, cache=cache)
+    compiled_path = cache.get_file(compiled_key(file_path), SUFFIX)
+    assert os.path.isfile(compiled_path)
+    assert not os.path.exists(file_path + SUFFIX)
+    assert wordlist.word_unigram_counter() == parse_wordlist(lines)[0]
+
+    # read from the compiled form, until the file changes
+    inode = os.stat(compiled_path).st_ino
+    read_wordlist_file(file_path, cache=cache)
+    assert os.stat(compiled_path).st_ino == inode
+
+    write_wordlist(file_path, lines + [u'walks 5'])
+    os.utime(file_path, (0, 0))
+    wordlist = read_wordlist_file(file_path, cache=cache)
+    assert wordlist.word_unigram_counter()['walks'] == 5
+    assert wordlist.words_to_phones()['walks'] == list('walks')
+
+    wordlist = read_wordlist_file(file_path, keep_case=True, cache=cache)
+    assert 'ABANDON' in wordlist.word_unigram_counter()
+    assert len(cache.entries()) == 2
+    assert cache.entries()[0]['module'] == 'wordlist'
+    assert cache.entries()[0]['file_path'] == file_path
+
+
+def test_read_wordlist_file_next_to_file(tmpdir):
+    file_path = os.path.join(str(tmpdir), 'words.txt')
+    write_wordlist(file_path, lines)
+
+    umask = os.umask(0o022)
+    try:
+        read_wordlist_file(file_path, next_to_file=True)
+    finally:
+        os.umask(umask)
+    assert os.stat(file_path + SUFFIX).st_mode & 0o777 == 0o644
+
+    os.utime(file_path + SUFFIX, (0, 0))
+    wordlist = read_wordlist_file(file_path, next_to_file=True)
+    assert os.stat(file_path + SUFFIX).st_mtime == 0
+    assert wordlist.word_unigram_counter() == parse_wordlist(lines)[0]
+
+
+def test_read_wordlist_file_unwritable(tmpdir, monkeypatch):
+    file_path = os.path.join(str(tmpdir), 'words.txt')
+    write_wordlist(file_path, lines)
+
+    # no cache directory can be made under a file
+    monkeypatch.setattr(
+        wordlist_file, 'ResultCache',
+        lambda: ResultCache(os.path.join(file_path, 'cache')))
+    wordlist = read_wordlist_file(file_path)
+    assert wordlist.word_unigram_counter() == parse_wordlist(lines)[0]
+    assert wordlist.words_to_phones() == parse_wordlist(lines)[1]
+
+
+def test_read_wordlist_compiled(tmpdir, capsys, monkeypatch):
+    file_path = os.path.join(str(tmpdir), 'words.txt')
+    cache_dir = os.path.join(str(tmpdir), 'cache')
+    write_wordlist(file_path, lines)
+
+    compiled = lxa.read_wordlist(file_path, cache_dir=cache_dir)
+    parsed = lxa.read_wordlist(file_path, compile_wordlist=False)
+    assert compiled.word_unigram_counter() == parsed.word_unigram_counter()
+    assert compiled.words_to_phones() == parsed.words_to_phones()
+    assert compiled.phone_bigram_counter() == parsed.phone_bigram_counter()
+    assert not os.path.exists(file_path + SUFFIX)
+
+    main(['info', '--dir', cache_dir])
+    out, _ = capsys.readouterr()
+    assert '2 entries' in out  # the compiled wordlist and the results
+    assert 'wordlist' in out
+
+    main(['clear', '--dir', cache_dir])
+    assert not os.listdir(cache_dir)
+
+    # without a cache directory, nothing is compiled or written
+    def read_wordlist_file_(*args, **kwargs):
+        raise AssertionError('compiled without cache_dir')
+
+    monkeypatch.setattr(lexicon, 'read_wordlist_file', read_wordlist_file_)
+    lxa_object = lxa.read_wordlist(file_path)
+    assert lxa_object.word_unigram_counter() == parsed.word_unigram_counter()
+    assert sorted(os.listdir(str(tmpdir))) == ['cache', 'words.txt']
@@ -1,66 +1,108 @@
 # -*- encoding: utf8 -*-
 
+from linguistica.trie_store import (BrokenWordsView, PieceTrie,
+                                    SuccessorsView)
 from linguistica.util import NULL
 
 
 def find_breaks(wordlist, min_stem_length):
-    prefixes_found = set()
+    """
+    Return the dict of the index of each word in *wordlist* to the set of
+    the lengths of its prefixes (of at least *min_stem_length* letters)
+    which it shares with a word next to it, or with a run of words around
+    such a word which all begin with the prefix.
+
+    The longest-common-prefix array of the words is computed once, and the
+    runs of words sharing each prefix are its lcp-intervals, which are
+    enumerated with a stack in one pass. If *wordlist* is not sorted,
+    a prefix may be shared by several runs, of which only the first counts.
+    """
+    breaks = [set() for _ in range(len(wordlist))]
+
+    # prefixes to the first (lb, rb, length) interval of the words in
+    # wordlist[lb: rb + 1] which all begin with them
+    prefixes_to_intervals = dict()
+
+    for length, lb, rb in lcp_intervals(lcp_array(wordlist)):
+        if length < min_stem_length:
+            continue
+
+        prefix = wordlist[lb][: length]
+        if prefix not in prefixes_to_intervals or \
+                lb < prefixes_to_intervals[prefix][0]:
+            prefixes_to_intervals[prefix] = (lb, rb, length)
+
+    for lb, rb, length in prefixes_to_intervals.values():
+        for j in range(lb, rb + 1):
+            breaks[j].add(length)
 
-    breaks = dict()
-    for i in range(len(wordlist)):
-        breaks[i] = set()
+    return dict(enumerate(breaks))
 
-    previous_word = wordlist[0]
+
+def lcp_array(wordlist):
+    """
+    Return the list of the lengths of the longest common prefixes of each
+    word in *wordlist* and the word before it (0 for the first word).
+    """
+    lcps = [0] * len(wordlist)
 
     for i in range(1, len(wordlist)):
-        this_word = wordlist[i]
-        m = common_prefix_length(previous_word, this_word)
+        lcps[i] = common_prefix_length(wordlist[i - 1], wordlist[i])
 
-        if m < min_stem_length:
-            previous_word = this_word
-            continue
+    return lcps
 
-        common_prefix = this_word[: m]
 
-        if common_prefix in prefixes_found:
-            previous_word = this_word
-            continue
+def lcp_intervals(lcps):
+    """
+    Generate the (length, lb, rb) tuples of the lcp-intervals of the
+    longest-common-prefix array *lcps*: the maximal runs of words
+    wordlist[lb: rb + 1] (at least two) with a common prefix of *length*
+    letters, where *length* is the smallest of ``lcps[lb + 1: rb + 1]``.
+    """
+    stack = [(-1, 0)]  # (length, lb) of the intervals still open
 
-        for j in range(i - 1, -1, -1):
-            if wordlist[j].startswith(common_prefix):
-                breaks[j].add(m)
-            else:
-                break
-        for j in range(i, len(wordlist)):
-            if wordlist[j].startswith(common_prefix):
-                breaks[j].add(m)
-            else:
-                break
+    for i in range(1, len(lcps) + 1):
+        lcp = lcps[i] if i < len(lcps) else -1
+        lb = i - 1
 
-        prefixes_found.add(common_prefix)
-        previous_word = this_word
+        while lcp < stack[-1][0]:
+            length, lb = stack.pop()
+            yield length, lb, i - 1
 
-    return breaks
+        if lcp > stack[-1][0]:
+            stack.append((lcp, lb))
 
 
 def break_words(wordlist, break_dict):
+    """
+    Return the dict of each word in *wordlist* to the list of its pieces,
+    with the word sliced once at each of its breaks in *break_dict* (as made
+    by ``find_breaks``) which is inside the word.
+    """
     broken_words = dict()
 
     for i, this_word in enumerate(wordlist):
-        broken_words[this_word] = list()
-        break_list = sorted(break_dict[i])
-
-        if not break_list:
-            broken_words[this_word].append(this_word)
-        else:
-            this_piece = ''
-            for x in range(len(this_word)):
-                this_piece += this_word[x]
-                if x + 1 in break_list:
-                    broken_words[this_word].append(this_piece)
-                    this_piece = ''
-            if this_piece:
-                broken_words[this_word].append(this_piece)
+        break_set = break_dict[i]
+
+        if not break_set:
+            broken_words[this_word] = [this_word]
+            continue
+
+        word_length = len(this_word)
+        offsets = sorted(break_set)
+        if offsets[0] <= 0 or offsets[-1] >= word_length:
+            offsets = [offset for offset in offsets
+                       if 0 < offset < word_length]
+
+        pieces = list()
+        start = 0
+        for end in offsets:
+            pieces.append(this_word[start: end])
+            start = end
+        if start < word_length:
+            pieces.append(this_word[start:])
+
+        broken_words[this_word] = pieces
 
     return broken_words
 
@@ -96,14 +138,11 @@ def get_successors(wordlist, broken_words):
 
 
 def common_prefix_length(s1, s2):
-    # ensure that s1 is not longer than s2
-    length = len(s1)
-    if length > len(s2):
-        return common_prefix_length(s2, s1)
-
-    for i in range(length):
-        if s1[i] != s2[i]:
-            return i
+    length = 0
+    for c1, c2 in zip(s1, s2):
+        if c1 != c2:
+            break
+        length += 1
     return length
 
 
@@ -152,18 +191,18 @@ def run(wordlist=None, min_stem_length=4):
                                              breaks_right_to_left)
 
     # --------------------------------------------------------------------------
-    # Compute successors and predecessors
+    # Compute successors and predecessors, as views of tries
 
-    successors = get_successors(wordlist, broken_words_left_to_right)
-    predecessors = get_successors(reversed_wordlist,
-                                  broken_words_right_to_left)
+    successors = SuccessorsView(PieceTrie(wordlist,
+                                          broken_words_left_to_right))
+    predecessors = SuccessorsView(PieceTrie(reversed_wordlist,
+                                            broken_words_right_to_left),
+                                  reverse=True)
 
     # --------------------------------------------------------------------------
-    # Reverse direction to right-to-left
+    # Read the right-to-left words and pieces reversed back, as they are read
 
-    broken_words_right_to_left = reverse_direction(broken_words_right_to_left,
-                                                   is_list=True)
-    predecessors = reverse_direction(predecessors)
+    broken_words_right_to_left = BrokenWordsView(broken_words_right_to_left)
 
     return (broken_words_left_to_right, broken_words_right_to_left,
             successors, predecessors)
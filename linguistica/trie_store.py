@@ -0,0 +1,267 @@
+# -*- encoding: utf8 -*-
+
+try:
+    from collections.abc import (ItemsView, Mapping, Set)
+except ImportError:  # Python 2
+    from collections import (ItemsView, Mapping, Set)
+
+import numpy as np
+import six
+
+from linguistica.signature_store import StringTable
+from linguistica.util import NULL
+
+
+def _reversed(string):
+    """
+    Return *string* reversed, unless it is ``NULL`` (or not a string).
+    """
+    if isinstance(string, six.string_types) and string != NULL:
+        return string[::-1]
+    return string
+
+
+class PieceTrie:
+    """
+    A compact trie of the words of a wordlist as broken into pieces
+    (see ``trie.break_words``).
+
+    Its nodes are the distinct prefixes of the words which end at a break
+    between pieces (or at the end of a word), and each node is a child of
+    the nodes of the prefixes one piece shorter. The ids of the nodes are
+    their ranks in sorted order. A node is kept as the id of a word in a
+    ``StringTable`` of the wordlist and the length of the prefix, and the
+    children of the nodes as compressed sparse rows of node ids in NumPy
+    arrays, so that no string is kept for any prefix.
+    """
+
+    def __init__(self, wordlist=(), broken_words=None):
+        words = StringTable(wordlist)
+
+        # temporary list of the prefixes of the words at the end of each
+        # piece, word by word, and the number of pieces of each word
+        prefixes = list()
+        n_pieces = np.zeros(len(words), dtype=np.int64)
+
+        for i, word in enumerate(words):
+            prefix = ''
+            for piece in broken_words[word]:
+                prefix += piece
+                prefixes.append(prefix)
+            n_pieces[i] = len(broken_words[word])
+
+        # the nodes are the distinct prefixes, each kept as its first word
+        distinct, first, nodes = np.unique(
+            np.array(prefixes, dtype='U'), return_index=True,
+            return_inverse=True)
+        del prefixes
+        n_nodes = len(distinct)
+        ends = np.cumsum(n_pieces)[n_pieces > 0]
+        starts = ends - n_pieces[n_pieces > 0]
+
+        self.words = words
+        self.node_words = np.repeat(np.arange(len(words), dtype=np.int32),
+                                    n_pieces)[first]
+        self.node_lengths = np.char.str_len(distinct).astype(np.int32)
+        self.is_word = np.zeros(n_nodes, dtype=bool)
+        self.is_word[nodes[ends - 1]] = True
+
+        # each prefix after the first of a word is a child of the one before,
+        # and the (parent, child) pairs are sorted and made distinct as one
+        # number each
+        is_child = np.ones(len(nodes), dtype=bool)
+        is_child[starts] = False
+        pairs = np.unique(nodes[np.flatnonzero(is_child) - 1] * n_nodes +
+                          nodes[is_child])
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        if n_nodes:
+            np.cumsum(np.bincount(pairs // n_nodes, minlength=n_nodes),
+                      out=self.indptr[1:])
+            self.indices = (pairs % n_nodes).astype(np.int32)
+        else:
+            self.indices = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.node_words)
+
+    def label(self, node):
+        """
+        Return the prefix of *node*.
+        """
+        return self.words[self.node_words[node]][: self.node_lengths[node]]
+
+    def index(self, prefix):
+        """
+        Return the id of the node of *prefix*, or -1 if there is none.
+        """
+        if not isinstance(prefix, six.string_types):
+            return -1
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.label(middle) < prefix:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(self) and self.label(low) == prefix:
+            return low
+        return -1
+
+    def children(self, node):
+        """
+        Return the sorted array of the ids of the children of *node*.
+        """
+        return self.indices[self.indptr[node]: self.indptr[node + 1]]
+
+    def successors(self, node):
+        """
+        Return the list of the pieces after *node*, with ``NULL`` first if
+        the prefix of *node* is a word.
+        """
+        length = self.node_lengths[node]
+        pieces = [self.label(child)[length:]
+                  for child in self.children(node).tolist()]
+        if self.is_word[node]:
+            pieces.insert(0, NULL)
+        return pieces
+
+    def nbytes(self):
+        """
+        Return the number of bytes of the arrays and strings of the trie.
+        """
+        arrays = [self.words.offsets, self.node_words, self.node_lengths,
+                  self.is_word, self.indptr, self.indices]
+        return sum(array.nbytes for array in arrays) + len(self.words.data)
+
+
+class PiecesView(Set):
+    """
+    A read-only set of the pieces after the node *node* of *trie*
+    (reversed, if *reverse*), with ``NULL`` if the prefix is a word.
+    """
+
+    def __init__(self, trie, node, reverse=False):
+        self._trie = trie
+        self._node = node
+        self._reverse = reverse
+
+    def __len__(self):
+        trie = self._trie
+        return int(trie.indptr[self._node + 1] - trie.indptr[self._node] +
+                   trie.is_word[self._node])
+
+    def __iter__(self):
+        for piece in self._trie.successors(self._node):
+            yield _reversed(piece) if self._reverse else piece
+
+    def __contains__(self, piece):
+        trie = self._trie
+        if not isinstance(piece, six.string_types):
+            return False
+        if piece == NULL:
+            return bool(trie.is_word[self._node])
+        if self._reverse:
+            piece = piece[::-1]
+
+        child = trie.index(trie.label(self._node) + piece)
+        children = trie.children(self._node)
+        i = np.searchsorted(children, child)
+        return child >= 0 and i < len(children) and children[i] == child
+
+    def __repr__(self):
+        return '{' + ', '.join(repr(piece) for piece in self) + '}'
+
+
+class SuccessorsItemsView(ItemsView):
+
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class SuccessorsView(Mapping):
+    """
+    A read-only dict-like view of the prefixes of the nodes of *trie* to the
+    set-like views of their successors (as ``trie.get_successors`` makes
+    them). If *reverse*, the trie is of reversed words, and the prefixes and
+    pieces are reversed, for predecessors.
+    """
+
+    def __init__(self, trie, reverse=False):
+        self._trie = trie
+        self._reverse = reverse
+
+    def _key(self, label):
+        return _reversed(label) if self._reverse else label
+
+    def __getitem__(self, key):
+        node = self._trie.index(self._key(key))
+        if node < 0:
+            raise KeyError(key)
+        return PiecesView(self._trie, node, self._reverse)
+
+    def __iter__(self):
+        for node in range(len(self._trie)):
+            yield self._key(self._trie.label(node))
+
+    def __len__(self):
+        return len(self._trie)
+
+    def __contains__(self, key):
+        return self._trie.index(self._key(key)) >= 0
+
+    def _items(self):
+        for node in range(len(self._trie)):
+            yield (self._key(self._trie.label(node)),
+                   PiecesView(self._trie, node, self._reverse))
+
+    def items(self):
+        return SuccessorsItemsView(self)
+
+    def __repr__(self):
+        return '{' + ', '.join('{!r}: {!r}'.format(key, value)
+                               for key, value in self.items()) + '}'
+
+
+class BrokenWordsItemsView(ItemsView):
+
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class BrokenWordsView(Mapping):
+    """
+    A read-only dict-like view of *broken_words* (as ``trie.break_words``
+    makes it) of reversed words, with the words and their pieces reversed
+    back only as they are read, for the right-to-left direction.
+    """
+
+    def __init__(self, broken_words):
+        self._broken_words = broken_words
+
+    def _pieces(self, pieces):
+        return [_reversed(piece) for piece in reversed(pieces)]
+
+    def __getitem__(self, word):
+        return self._pieces(self._broken_words[_reversed(word)])
+
+    def __iter__(self):
+        for word in self._broken_words:
+            yield _reversed(word)
+
+    def __len__(self):
+        return len(self._broken_words)
+
+    def __contains__(self, word):
+        return _reversed(word) in self._broken_words
+
+    def _items(self):
+        for word, pieces in self._broken_words.items():
+            yield _reversed(word), self._pieces(pieces)
+
+    def items(self):
+        return BrokenWordsItemsView(self)
+
+    def __repr__(self):
+        return '{' + ', '.join('{!r}: {!r}'.format(key, value)
+                               for key, value in self.items()) + '}'
@@ -3,6 +3,7 @@
 from __future__ import print_function, unicode_literals
 
 import os
+import re
 from itertools import groupby
 from time import strftime
 from pprint import pformat
@@ -35,6 +36,8 @@ SEP_NGRAM = '\t'        # separator between words in an ngram
 
 NULL = 'NULL'
 
+PUNCTUATIONS = '.,;!?:)('  # split off from words as word tokens of their own
+
 # ------------------------------------------------------------------------------
 # parameters, with the "factory settings"
 
@@ -47,6 +50,18 @@ NULL = 'NULL'
 # manifold:  max_word_types, n_neighbors, n_eigenvectors, min_context_count
 # (See the individual programs for what these parameters mean.)
 
+# The same as a dict, also with the parameters for the word counts which all
+# programs depend on ("ngram"). The cache of results (in the "cache" module)
+# is keyed by these.
+MODULE_PARAMETERS = {'ngram': ('max_word_tokens', 'keep_case'),
+                     'signature': ('min_stem_length', 'max_affix_length',
+                                   'min_sig_count', 'suffixing'),
+                     'phon': (),
+                     'trie': ('min_stem_length',),
+                     'manifold': ('max_word_types', 'n_neighbors',
+                                  'n_eigenvectors', 'min_context_count'),
+                     }
+
 PARAMETERS = {'max_word_tokens': 0,  # zero means all word tokens
               'min_stem_length': 4,
               'max_affix_length': 4,
@@ -86,8 +101,13 @@ PARAMETERS_HINTS = {'max_word_tokens': '0 = all word tokens',
                     }
 
 
+_WHITESPACE_RE = re.compile(r'\s', re.UNICODE)
+
+# the only character whose lowercase form depends on the letters around it
+_FINAL_SIGMA = '\u03a3'
+
+
 def fix_punctuations(line):
-    import re
     line = line.replace('.', ' . ')
     line = line.replace(',', ' , ')
     line = line.replace(';', ' ; ')
@@ -96,7 +116,45 @@ def fix_punctuations(line):
     line = line.replace(':', ' : ')
     line = line.replace(')', ' ) ')
     line = line.replace('(', ' ( ')
-    return re.sub('\s', ' ', line)
+    return _WHITESPACE_RE.sub(' ', line)
+
+
+class Tokenizer:
+    """
+    Split a line of text into word tokens in one pass of a precompiled
+    regular expression.
+
+    Each character in *punctuations* is a word token of its own, and all
+    whitespace separates word tokens. Unless *keep_case* is true, word tokens
+    are lowercased. With the default *punctuations*, the word tokens are the
+    same as those of ``fix_punctuations(line).strip()`` followed by
+    ``lower()`` (if applicable) and ``split()``.
+    """
+
+    def __init__(self, punctuations=PUNCTUATIONS, keep_case=False):
+        self.punctuations = punctuations
+        self.keep_case = keep_case
+
+        if punctuations:
+            escaped = ''.join(re.escape(char) for char in punctuations)
+            pattern = r'[{0}]|[^\s{0}]+'.format(escaped)
+        else:
+            pattern = r'\S+'
+        self._findall = re.compile(pattern, re.UNICODE).findall
+
+    def __call__(self, line):
+        if self.keep_case:
+            return self._findall(line)
+        elif _FINAL_SIGMA in line:
+            # lowercase each word token on its own, so that a sigma is
+            # lowercased in the context of its word token only
+            return [token.lower() for token in self._findall(line)]
+        else:
+            return self._findall(line.lower())
+
+    def __reduce__(self):
+        # the compiled pattern is rebuilt, e.g., in a worker process
+        return self.__class__, (self.punctuations, self.keep_case)
 
 
 def double_sorted(input_object, key=lambda x: x, reverse=False,
@@ -0,0 +1,352 @@
+# -*- encoding: utf8 -*-
+
+try:
+    from collections.abc import (ItemsView, Mapping)
+except ImportError:  # Python 2
+    from collections import (ItemsView, Mapping)
+import json
+import mmap
+import os
+import struct
+from io import open  # not using built-in open(), for py2+3 cross compatibility
+
+import numpy as np
+
+from linguistica.cache import (WORDLIST_SUFFIX as SUFFIX, ResultCache,
+                               make_key, write_atomically)
+from linguistica.util import ENCODING
+
+FORMAT_VERSION = 1
+MAGIC = b'LXAWORDS'
+
+ALIGNMENT = 8  # in bytes, for the arrays of a compiled wordlist
+
+
+def parse_wordlist(lines, keep_case=False):
+    """
+    Parse the *lines* of a wordlist file, where each line has a word,
+    optionally followed by its count and its phones (all separated by
+    whitespace). Empty lines and lines starting with '#' are skipped.
+
+    :param keep_case: whether to keep the case of the words
+    :return: a tuple of the dict of words to counts (1 by default) and the
+        dict of words to lists of phones (the letters by default)
+    """
+    word_freq_dict = dict()
+    words_to_phones = dict()
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        line_split = line.split()
+        word = line_split[0]
+
+        if not keep_case:
+            word = word.lower()
+
+        try:
+            freq = int(line_split[1])
+        except (ValueError, IndexError):
+            freq = 1
+
+        phones = line_split[2:]
+        if not phones:
+            phones = list(word)
+
+        word_freq_dict[word] = freq
+        words_to_phones[word] = phones
+
+    return word_freq_dict, words_to_phones
+
+
+class CompiledWordlist:
+    """
+    A wordlist with phones in a binary form which is read with memory
+    mapping.
+
+    Word ids follow the order of the words in the source file. The words
+    and the distinct phones are kept as newline-separated UTF-8 text (no
+    word or phone has whitespace in it). The counts are a NumPy array by
+    word id, and the phones of the words are one flat array of phone ids
+    with per-word offsets.
+    """
+
+    def __init__(self, words_text, counts, phones_text, phone_ids,
+                 phone_offsets, source=None):
+        self.words_text = words_text
+        self.counts = counts
+        self.phones_text = phones_text
+        self.phone_ids = phone_ids
+        self.phone_offsets = phone_offsets
+        self.source = source or dict()
+
+        self._words = None
+        self._phones = None
+
+    @classmethod
+    def from_dicts(cls, word_freq_dict, words_to_phones, source=None):
+        """
+        Compile the dicts of words to counts and to phones
+        (as ``parse_wordlist()`` makes them).
+        """
+        words = list(word_freq_dict)
+        phones = sorted({phone for word in words
+                         for phone in words_to_phones[word]})
+        phone_ids = {phone: i for i, phone in enumerate(phones)}
+
+        lengths = [len(words_to_phones[word]) for word in words]
+        phone_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=phone_offsets[1:])
+
+        return cls('\n'.join(words).encode('utf8'),
+                   np.array([word_freq_dict[word] for word in words],
+                            dtype=np.int64),
+                   '\n'.join(phones).encode('utf8'),
+                   np.array([phone_ids[phone] for word in words
+                             for phone in words_to_phones[word]],
+                            dtype=np.int32),
+                   phone_offsets, source)
+
+    def words(self):
+        """
+        Return the list of the words, by word id.
+        """
+        if self._words is None:
+            self._words = _split_text(self.words_text)
+        return self._words
+
+    def phones(self):
+        """
+        Return the sorted list of the distinct phones, by phone id.
+        """
+        if self._phones is None:
+            self._phones = _split_text(self.phones_text)
+        return self._phones
+
+    def word_unigram_counter(self):
+        """
+        Return the dict of words to their counts.
+        """
+        return dict(zip(self.words(), self.counts.tolist()))
+
+    def words_to_phones(self):
+        """
+        Return a read-only dict-like view of words to their lists of phones.
+        """
+        return PhonesView(self)
+
+    def save(self, file_path):
+        """
+        Write the compiled wordlist to *file_path*, through a temporary file
+        in the same directory so that no reader ever sees a partial file.
+        """
+        write_atomically(file_path, self.write)
+
+    def write(self, f):
+        """
+        Write the compiled wordlist to the binary file object *f*.
+        """
+        sections = [('words_text', self.words_text, None),
+                    ('counts', self.counts, 'int64'),
+                    ('phones_text', self.phones_text, None),
+                    ('phone_ids', self.phone_ids, 'int32'),
+                    ('phone_offsets', self.phone_offsets, 'int64')]
+
+        header = {'version': FORMAT_VERSION, 'source': self.source,
+                  'sections': dict()}
+        blobs = list()
+        position = 0
+        for name, data, dtype in sections:
+            if dtype is None:
+                blob = data
+            else:
+                blob = np.asarray(data).astype(
+                    np.dtype(dtype).newbyteorder('<')).tobytes()
+            header['sections'][name] = [position, len(blob), dtype]
+            padding = -len(blob) % ALIGNMENT
+            blobs.append(blob + b'\0' * padding)
+            position += len(blob) + padding
+
+        header_bytes = json.dumps(header, sort_keys=True).encode('utf8')
+        header_bytes += b' ' * (-(len(MAGIC) + 8 + len(header_bytes)) %
+                                ALIGNMENT)
+
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Read the compiled wordlist at *file_path* with memory mapping,
+        or return None if it is not one of this format version.
+        """
+        with open(file_path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header_length, = struct.unpack('<Q', f.read(8))
+            try:
+                header = json.loads(f.read(header_length).decode('utf8'))
+            except ValueError:
+                return None
+            if header.get('version') != FORMAT_VERSION:
+                return None
+            start = len(MAGIC) + 8 + header_length
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        arrays = dict()
+        for name, (position, size, dtype) in header['sections'].items():
+            offset = start + position
+            if dtype is None:
+                arrays[name] = mapped[offset: offset + size]
+            else:
+                dtype = np.dtype(dtype).newbyteorder('<')
+                arrays[name] = np.frombuffer(
+                    mapped, dtype=dtype, count=size // dtype.itemsize,
+                    offset=offset)
+
+        return cls(source=header['source'], **arrays)
+
+
+def _split_text(text):
+    """
+    Return the list of the newline-separated strings of the UTF-8 *text*.
+    """
+    if not text:
+        return list()
+    return bytes(text).decode('utf8').split('\n')
+
+
+class PhonesItemsView(ItemsView):
+
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class PhonesView(Mapping):
+    """
+    A read-only dict-like view of the words of the ``CompiledWordlist``
+    *wordlist* to their lists of phones.
+    """
+
+    def __init__(self, wordlist):
+        self._wordlist = wordlist
+        self._word_ids = None
+        self._phone_ids = None  # lists of the arrays, for slicing
+        self._phone_offsets = None
+
+    def _ids(self):
+        if self._word_ids is None:
+            self._word_ids = {word: i for i, word
+                              in enumerate(self._wordlist.words())}
+        return self._word_ids
+
+    def _phones_of(self, word_id, phones):
+        if self._phone_ids is None:
+            self._phone_ids = self._wordlist.phone_ids.tolist()
+            self._phone_offsets = self._wordlist.phone_offsets.tolist()
+        start, end = self._phone_offsets[word_id: word_id + 2]
+        return [phones[i] for i in self._phone_ids[start: end]]
+
+    def __getitem__(self, word):
+        return self._phones_of(self._ids()[word], self._wordlist.phones())
+
+    def __iter__(self):
+        return iter(self._wordlist.words())
+
+    def __len__(self):
+        return len(self._wordlist.counts)
+
+    def __contains__(self, word):
+        return word in self._ids()
+
+    def _items(self):
+        phones = self._wordlist.phones()
+        for word_id, word in enumerate(self._wordlist.words()):
+            yield word, self._phones_of(word_id, phones)
+
+    def items(self):
+        return PhonesItemsView(self)
+
+
+def _source_info(file_path, encoding, keep_case):
+    stat = os.stat(file_path)
+    return {'path': os.path.abspath(file_path), 'size': stat.st_size,
+            'mtime': stat.st_mtime, 'encoding': encoding,
+            'keep_case': bool(keep_case)}
+
+
+def compiled_key(file_path, encoding=ENCODING, keep_case=False):
+    """
+    Return the ``cache.ResultCache`` key of the compiled form of the
+    wordlist file at *file_path*.
+    """
+    return make_key('wordlist', os.path.abspath(file_path),
+                    {'encoding': encoding, 'keep_case': bool(keep_case),
+                     'format_version': FORMAT_VERSION})
+
+
+def _load_current(file_path, source):
+    try:
+        wordlist = CompiledWordlist.load(file_path)
+    except (IOError, OSError, ValueError, struct.error):
+        return None
+    if wordlist is not None and wordlist.source == source:
+        return wordlist
+    return None
+
+
+def read_wordlist_file(file_path, encoding=ENCODING, keep_case=False,
+                       cache=None, next_to_file=False):
+    """
+    Return the ``CompiledWordlist`` of the wordlist file at *file_path*.
+
+    The compiled form is kept as an entry of the ``cache.ResultCache``
+    *cache* (default: one in ``cache.CACHE_DIR``), so that
+    ``linguistica cache info|prune|clear`` covers it, or, if *next_to_file*
+    is true, next to the file (*file_path* plus ``SUFFIX``). It is read if
+    it was compiled from the file as it is now (same size and modification
+    time) with the same *encoding* and *keep_case*; otherwise, the file is
+    parsed and compiled again, and the compiled form is written. If the
+    cache or the file's directory cannot be written to, the wordlist
+    compiled in memory is returned all the same.
+    """
+    source = _source_info(file_path, encoding, keep_case)
+    key = compiled_key(file_path, encoding, keep_case)
+
+    if next_to_file:
+        compiled_path = os.path.abspath(file_path) + SUFFIX
+    else:
+        try:
+            if cache is None:
+                cache = ResultCache()
+            compiled_path = cache.get_file(key, SUFFIX)
+        except (IOError, OSError):
+            cache = None
+            compiled_path = None
+
+    if compiled_path is not None:
+        wordlist = _load_current(compiled_path, source)
+        if wordlist is not None:
+            return wordlist
+
+    with open(file_path, encoding=encoding) as f:
+        word_freq_dict, words_to_phones = parse_wordlist(f, keep_case)
+    wordlist = CompiledWordlist.from_dicts(word_freq_dict, words_to_phones,
+                                           source)
+
+    try:
+        if next_to_file:
+            wordlist.save(compiled_path)
+        elif cache is not None:
+            cache.put_file(key, SUFFIX, wordlist.write,
+                           {'module': 'wordlist',
+                            'file_path': source['path']})
+    except (IOError, OSError):
+        pass  # not kept, but still usable
+
+    return wordlist